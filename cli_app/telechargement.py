@@ -18,6 +18,8 @@ from __future__ import annotations
 import atexit
 import base64
 import datetime
+import errno
+import json
 import logging
 import os
 import pathlib
@@ -26,7 +28,10 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from urllib.parse import urlparse
 
@@ -38,6 +43,12 @@ VENV_PYTHON = VENV_DIR / VENV_BIN / ("python.exe" if sys.platform == "win32" els
 LOG_DIR = SCRIPT_DIR / "logs"
 OUTPUT_DIR = SCRIPT_DIR / "downloads"
 ARCHIVE_FILE = SCRIPT_DIR / "archive.txt"
+ARCHIVE_LOCK_FILE = SCRIPT_DIR / "archive.lock"             # verrou des écritures (partagé avec les autres CLI)
+# Fichier final de chaque vidéo téléchargée (« ID<TAB>chemin relatif à downloads/ »), lu par --compact-archive
+FILES_INDEX = SCRIPT_DIR / "archive_files.txt"
+# Ajouts à l'archive groupés : écrits au plus tard ARCHIVE_FLUSH_INTERVAL s après le premier, ou dès ARCHIVE_FLUSH_BATCH
+ARCHIVE_FLUSH_INTERVAL = 2.0
+ARCHIVE_FLUSH_BATCH = 64
 COOKIE_FILE = SCRIPT_DIR / "cookies.txt"
 COOKIE_FILE_ENCRYPTED = SCRIPT_DIR / "cookies.enc"          # cookies chiffrés (recommandé)
 # Variable d'environnement : YT_COOKIES_PASSWORD (mot de passe) ou YT_COOKIES_KEY (clé Fernet base64)
@@ -54,6 +65,25 @@ CREDIT_BOX_WIDTH = 72           # largeur du bloc crédit
 OUTPUT_TEMPLATE = "%(uploader)s/%(playlist,Uploads)s/%(playlist_index)02d - %(title)s.%(ext)s"
 # EJS : ejs:npm (Deno) = scripts à jour ; sinon ejs:github
 REMOTE_COMPONENTS = ["ejs:npm", "ejs:github"]
+# Téléchargements en parallèle (1 = une seule instance, vidéo par vidéo) ; surcharge : --workers N
+MAX_WORKERS = 1
+# Analyse de la chaîne : comptages des sections en parallèle, délai max (s) par requête HTTP
+ANALYZE_WORKERS = 6
+ANALYZE_TIMEOUT = 30.0
+# Analyse : vidéos absentes de l'archive comptées par section (« N nouvelles / total ») ; parcourt toutes
+# les pages des playlists au lieu du nombre annoncé. Activé par --count-new
+COUNT_NEW = False
+# Débit total max en Mo/s (0 = illimité) ; surchargé par --rate-limit X. --rate-shared : limite commune à la machine
+RATE_LIMIT_MBPS = 0.0
+# Fichier d'état du limiteur partagé (même chemin que gui_app/src/core/ratelimit.py)
+RATE_STATE_FILE = pathlib.Path(tempfile.gettempdir()) / "yt_dlp_ratelimit.json"
+# Réglage auto des fragments parallèles / blocs HTTP par format (--auto-tune) ; mesures par classe d'hôte
+AUTO_TUNE = False
+FRAGMENT_STATS_FILE = SCRIPT_DIR / "fragment_stats.json"
+# Flux vidéo et audio d'un format fusionné téléchargés en même temps (--parallel-streams)
+PARALLEL_STREAMS = False
+# Vidéo présente dans plusieurs sections (onglets / playlists) : téléchargée une fois, liée ailleurs (--dedup)
+DEDUP_SECTIONS = False
 
 LOG_FILE_GENERAL = LOG_DIR / "yt_download.log"
 log_session = LOG_DIR / f"yt_{datetime.datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}.log"
@@ -334,10 +364,14 @@ class _OneLineTerminalHandler(logging.StreamHandler):
                 display_name = _truncate_display_name(path, PROGRESS_FN_MAX + 20)
                 print(f"  {CYAN}⊙ Vidéo déjà sur le disque : {display_name}{RESET}")
                 return
+            if record.levelno >= logging.ERROR:
+                job_errors = getattr(_hook_state, "job_errors", None)
+                if job_errors is not None:
+                    job_errors.append(msg)
             label = _extract_already_in_archive(msg)
             if label is not None:
+                # Compté par _TunedYoutubeDL.in_download_archive (ou le pré-filtre), pas d'après ce message
                 _flush_terminal_warning_line()
-                self._counters["skipped"] += 1
                 max_len = PROGRESS_FN_MAX + 20
                 display = label if len(label) <= max_len else "..." + label[-max_len + 3 :]
                 print(f"  {CYAN}⊙ Vidéo déjà en archive : {display}{RESET}")
@@ -362,15 +396,178 @@ counters = {
     "error": 0,
     "skipped": 0,  # vidéos ignorées cette session (déjà en archive)
 }
+# Verrou des compteurs / clés terminées (workers parallèles, --workers N)
+_counters_lock = threading.RLock()
+# État du progress hook par thread : chaque worker suit sa propre vidéo (pending_finished_key, job_errors)
+_hook_state = threading.local()
+
+# ---------- ARCHIVE (index en mémoire de archive.txt) ----------
+class _ArchiveIndex:
+    """
+    Index de archive.txt passé tel quel comme download_archive à yt-dlp (in, add, len) : appartenance en O(1),
+    add() met l'entrée en attente, flush() écrit le lot sous verrou (ARCHIVE_LOCK_FILE) après relecture
+    des lignes ajoutées par les autres processus. refresh() ne lit que les lignes ajoutées depuis la lecture
+    précédente (GUI, autre CLI) ; relecture complète si le fichier a été remplacé, tronqué ou supprimé.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._entries: set[str] = set()
+        self._offset = 0
+        self._identity: tuple[int, int] | None = None
+        self._pending: dict[str, None] = {}
+        self._timer: threading.Timer | None = None
+        # Écritures, entrées écrites, doublons écartés (écrits entre-temps ailleurs), attente du verrou (s)
+        self.writes = 0
+        self.written = 0
+        self.duplicates = 0
+        self.lock_wait_total = 0.0
+        self.lock_wait_max = 0.0
+
+    def refresh(self) -> None:
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._entries, self._offset, self._identity = set(), 0, None
+                return
+            if (st.st_dev, st.st_ino) != self._identity or st.st_size < self._offset:
+                self._entries, self._offset, self._identity = set(), 0, (st.st_dev, st.st_ino)
+            if st.st_size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+            # Dernière ligne sans fin de ligne : prise en compte (comme yt-dlp) mais relue au prochain refresh
+            self._offset += data.rfind(b"\n") + 1
+            self._entries.update(line.strip() for line in data.decode("utf-8", errors="replace").splitlines() if line.strip())
+
+    def __contains__(self, entry: object) -> bool:
+        return entry in self._entries or entry in self._pending
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._pending)
+
+    def count(self) -> int:
+        self.refresh()
+        return len(self._entries)
+
+    def add(self, entry: str) -> None:
+        """Appelé par yt-dlp après un téléchargement : entrée mise en attente, écrite par lot."""
+        entry = entry.strip()
+        with self._lock:
+            if not entry or entry in self:
+                return
+            self._pending[entry] = None
+            if len(self._pending) >= ARCHIVE_FLUSH_BATCH:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(ARCHIVE_FLUSH_INTERVAL, self._flush_quietly)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> int:
+        """Écrit les entrées en attente absentes du fichier, sous verrou inter-processus ; retourne le nombre écrit."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            pending, self._pending = list(self._pending), {}
+            started = time.monotonic()
+
+            def write(_lock_file: Any) -> tuple[list[str], float]:
+                waited = time.monotonic() - started
+                self.refresh()
+                new = [e for e in pending if e not in self._entries]
+                if new:
+                    data = "".join(f"{e}\n" for e in new).encode("utf-8")
+                    with open(self.path, "a+b") as f:
+                        if f.seek(0, os.SEEK_END):
+                            f.seek(-1, os.SEEK_END)
+                            if f.read(1) != b"\n":
+                                data = b"\n" + data
+                        f.write(data)
+                    self._entries.update(new)
+                return new, waited
 
+            try:
+                new, waited = _locked_state_file(write, ARCHIVE_LOCK_FILE)
+            except BaseException:
+                self._pending = dict.fromkeys([*pending, *self._pending])
+                raise
+            self.writes += 1
+            self.written += len(new)
+            self.duplicates += len(pending) - len(new)
+            self.lock_wait_total += waited
+            self.lock_wait_max = max(self.lock_wait_max, waited)
+            return len(new)
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except OSError as e:
+            general_logger.warning(f"ARCHIVE | écriture reportée | {e}")
+
+    def stats_summary(self) -> str:
+        return (
+            f"{self.written} entrée(s) en {self.writes} écriture(s), {self.duplicates} doublon(s) écarté(s), "
+            f"attente du verrou {self.lock_wait_total * 1000:.1f} ms (max {self.lock_wait_max * 1000:.1f} ms)"
+        )
+
+    def reset_stats(self) -> None:
+        self.writes = self.written = self.duplicates = 0
+        self.lock_wait_total = self.lock_wait_max = 0.0
+
+    def compact(self, drop: Any = None) -> tuple[int, int, int]:
+        """
+        Réécrit le fichier sans doublons ni lignes vides (première occurrence, ordre conservé), en un passage
+        sous verrou ; drop(entry) écarte une entrée distincte s'il retourne True. Remplacement atomique.
+        Retourne (conservées, doublons, écartées).
+        """
+        self.flush()
+
+        def rewrite(_lock_file: Any) -> tuple[int, int, int]:
+            if not self.path.exists():
+                return 0, 0, 0
+            seen: set[str] = set()
+            kept = duplicates = dropped = 0
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                with open(self.path, "rb") as src, open(tmp, "wb") as out:
+                    for raw in src:
+                        entry = raw.decode("utf-8", errors="replace").strip()
+                        if not entry:
+                            continue
+                        if entry in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(entry)
+                        if drop is not None and drop(entry):
+                            dropped += 1
+                            continue
+                        out.write(entry.encode("utf-8") + b"\n")
+                        kept += 1
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            return kept, duplicates, dropped
+
+        with self._lock:
+            result = _locked_state_file(rewrite, ARCHIVE_LOCK_FILE)
+            self.refresh()
+            return result
+
+
+_archive = _ArchiveIndex(ARCHIVE_FILE)
+atexit.register(_archive._flush_quietly)
 # Nombre d'entrées dans l'archive au démarrage (pour le résumé final)
-archive_total_at_start = 0
-if ARCHIVE_FILE.exists():
-    try:
-        text = ARCHIVE_FILE.read_text(encoding="utf-8")
-        archive_total_at_start = sum(1 for line in text.splitlines() if line.strip())
-    except Exception:
-        pass
+archive_total_at_start = _archive.count()
 
 file_logger = logging.getLogger("yt_dlp_file")
 file_logger.setLevel(logging.DEBUG)
@@ -534,6 +731,313 @@ if "--encrypt-cookies" in sys.argv:
         sys.exit(1)
     sys.exit(0)
 
+# ---------- LIMITE DE DÉBIT (token bucket) ----------
+# Seau local ou commun (RATE_STATE_FILE, partagé avec la GUI et les autres instances) ; octets/s
+# reserve / synced : octets déjà retirés du seau commun (dépensés sans fichier), dernière synchronisation
+_rate_limit = {"rate": 0.0, "shared": False, "tokens": 0.0, "ts": 0.0, "reserve": 0.0, "synced": 0.0}
+_rate_lock = threading.Lock()
+_rate_samples: deque[tuple[float, int]] = deque()
+_rate_active_jobs = 0
+RATE_WINDOW = 3.0
+# Mode partagé : débit retiré d'un coup du seau commun (s) ; relecture du fichier au moins toutes les 0,5 s
+RATE_RESERVE_SECONDS = 0.1
+RATE_SYNC_INTERVAL = 0.5
+# Windows : attente max (s) d'un verrou de fichier d'état avant abandon (même valeur que core/locking.py)
+LOCK_TIMEOUT = 60.0
+
+def _locked_state_file(action: Any, path: pathlib.Path = RATE_STATE_FILE) -> Any:
+    """Exécute action(f) sur path (RATE_STATE_FILE par défaut) sous verrou exclusif inter-processus (fcntl / msvcrt)."""
+    with open(path, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+            # LK_LOCK réessaie 10 s puis lève EDEADLOCK : nouvel essai jusqu'à LOCK_TIMEOUT, autres erreurs propagées
+            f.seek(0)
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    if e.errno not in (errno.EACCES, getattr(errno, "EDEADLOCK", errno.EDEADLK)):
+                        raise
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Verrou {path} non obtenu après {LOCK_TIMEOUT:.0f} s") from e
+            try:
+                return action(f)
+            finally:
+                f.flush()
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            return action(f)
+        finally:
+            f.flush()
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _read_rate_state(f: Any) -> dict[str, Any]:
+    f.seek(0)
+    try:
+        state = json.loads(f.read().decode("utf-8") or "{}")
+    except (ValueError, UnicodeDecodeError):
+        state = {}
+    return state if isinstance(state, dict) else {}
+
+def _write_rate_state(f: Any, state: dict[str, Any]) -> None:
+    f.seek(0)
+    f.truncate()
+    f.write(json.dumps(state).encode("utf-8"))
+
+def _format_rate(rate: float) -> str:
+    if rate >= 1024 * 1024:
+        return f"{rate / (1024 * 1024):.1f} Mo/s"
+    return f"{rate / 1024:.0f} ko/s"
+
+def _setup_rate_limit(mbps: float | None, shared: bool) -> None:
+    """Configure le limiteur : mbps None en mode partagé = adopter la limite déjà définie sur la machine."""
+    _rate_limit["shared"] = shared
+    _rate_limit["rate"] = (mbps or 0.0) * 1024 * 1024
+    _rate_limit["tokens"], _rate_limit["ts"] = 0.0, time.monotonic()
+    _rate_limit["reserve"] = 0.0
+    if not shared:
+        return
+
+    def apply(f: Any) -> None:
+        state = _read_rate_state(f)
+        if mbps is None:
+            _rate_limit["rate"] = float(state.get("rate") or 0)
+        else:
+            state["rate"] = _rate_limit["rate"]
+            state["tokens"] = min(float(state.get("tokens") or 0), _rate_limit["rate"])
+            _write_rate_state(f, state)
+    _locked_state_file(apply)
+
+def _measured_rate() -> float:
+    now = time.monotonic()
+    while _rate_samples and now - _rate_samples[0][0] > RATE_WINDOW:
+        _rate_samples.popleft()
+    return sum(n for _, n in _rate_samples) / RATE_WINDOW
+
+def _throttle(nbytes: int) -> None:
+    """Consomme nbytes dans le seau ; dort si le seau est à découvert (débit total ≤ limite)."""
+    with _rate_lock:
+        _rate_samples.append((time.monotonic(), nbytes))
+        if not _rate_limit["shared"]:
+            rate = _rate_limit["rate"]
+            if rate <= 0:
+                return
+            now = time.monotonic()
+            tokens = min(rate, _rate_limit["tokens"] + rate * (now - _rate_limit["ts"])) - nbytes
+            _rate_limit["tokens"], _rate_limit["ts"] = tokens, now
+            delay = -tokens / rate if tokens < 0 else 0.0
+        elif nbytes <= _rate_limit["reserve"] and time.monotonic() - _rate_limit["synced"] < RATE_SYNC_INTERVAL:
+            # Octets pris dans la réserve locale : pas de verrou ni de réécriture du fichier d'état
+            _rate_limit["reserve"] -= nbytes
+            delay = 0.0
+        else:
+            def consume(f: Any) -> float:
+                now = time.time()
+                state = _read_rate_state(f)
+                rate = _rate_limit["rate"] = float(state.get("rate") or 0)
+                peers = state.get("peers") if isinstance(state.get("peers"), dict) else {}
+                peers = {p: v for p, v in peers.items() if isinstance(v, list) and len(v) == 3 and now - v[1] < 30}
+                peers[str(os.getpid())] = [float(_rate_active_jobs), now, _measured_rate()]
+                state["peers"] = peers
+                wait = 0.0
+                if rate > 0:
+                    # Retrait : octets non couverts par la réserve, plus de quoi la remettre à RATE_RESERVE_SECONDS
+                    take = max(0.0, nbytes + rate * RATE_RESERVE_SECONDS - _rate_limit["reserve"])
+                    _rate_limit["reserve"] += take - nbytes
+                    last = float(state.get("ts") or now)
+                    tokens = min(rate, float(state.get("tokens") or 0) + rate * max(0.0, now - last)) - take
+                    state["tokens"], state["ts"] = tokens, now
+                    wait = -tokens / rate if tokens < 0 else 0.0
+                else:
+                    _rate_limit["reserve"] = 0.0
+                _write_rate_state(f, state)
+                return wait
+            _rate_limit["synced"] = time.monotonic()
+            delay = _locked_state_file(consume)
+    if delay > 0:
+        time.sleep(delay)
+
+def _rate_job(delta: int) -> None:
+    """Nombre de jobs actifs publié dans l'état partagé (part de débit vue par les autres processus)."""
+    global _rate_active_jobs
+    with _rate_lock:
+        _rate_active_jobs += delta
+
+def _parse_rate_args() -> tuple[float | None, bool]:
+    """--rate-limit X (Mo/s, ou --rate-limit=X) et --rate-shared ; sinon RATE_LIMIT_MBPS."""
+    args = sys.argv[1:]
+    shared = "--rate-shared" in args
+    mbps: float | None = None
+    for i, arg in enumerate(args):
+        value = None
+        if arg == "--rate-limit" and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith("--rate-limit="):
+            value = arg.split("=", 1)[1]
+        if value is not None:
+            try:
+                mbps = max(0.0, float(value.replace(",", ".")))
+            except ValueError:
+                print(f"  {YELLOW}⚠ --rate-limit invalide ({value}) : {RATE_LIMIT_MBPS} Mo/s utilisé.{RESET}")
+    if mbps is None and not shared:
+        mbps = RATE_LIMIT_MBPS
+    return mbps, shared
+
+# ---------- RÉGLAGE FRAGMENTS / BLOCS (--auto-tune) ----------
+# Même logique que gui_app/src/core/fragtune.py : débit par connexion mesuré → fragments et taille de bloc
+FRAGMENT_TARGET_RATE = 16 * 1024 * 1024   # débit total visé pour un format fragmenté
+FRAGMENT_MAX = 8
+FRAGMENT_DEFAULT = 4
+CHUNK_SECONDS = 8.0                       # bloc ≈ 8 s de transfert à la vitesse d'une connexion
+CHUNK_MIN = 1 << 20
+CHUNK_MAX = 64 << 20
+CHUNK_DEFAULT = 10 << 20
+FRAGMENT_EWMA_ALPHA = 0.3
+FRAGMENT_MIN_SAMPLE = 2 << 20
+_FRAGMENTED_PROTOCOLS = ("http_dash_segments", "m3u8_native", "m3u8", "ism", "f4m")
+_fragment_stats: dict[str, dict[str, float]] = {}
+_fragment_stats_lock = threading.Lock()
+
+def _host_class(info: dict[str, Any]) -> str:
+    """Domaine (sans shard rrN---sn-xxx) + protocole du format."""
+    url = info.get("fragment_base_url") or info.get("manifest_url") or info.get("url") or ""
+    host = urlparse(url).hostname or "?"
+    return ".".join(host.split(".")[-2:]) + "/" + str(info.get("protocol") or "https")
+
+def _load_fragment_stats() -> None:
+    try:
+        data = json.loads(FRAGMENT_STATS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    if isinstance(data, dict):
+        _fragment_stats.update({k: v for k, v in data.items() if isinstance(v, dict)})
+
+def _save_fragment_stats() -> None:
+    if not AUTO_TUNE:
+        return
+    with _fragment_stats_lock:
+        data = dict(_fragment_stats)
+    try:
+        FRAGMENT_STATS_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    except OSError as e:
+        file_logger.warning("Statistiques fragments non enregistrées : %s", e)
+
+def _tune_format(ydl: Any, info: dict[str, Any]) -> None:
+    """Applique fragments parallèles / taille de bloc au format info (instance ydl propre au thread)."""
+    cls = _host_class(info)
+    with _fragment_stats_lock:
+        speed = _fragment_stats.get(cls, {}).get("speed")
+    fragmented = str(info.get("protocol") or "").startswith(_FRAGMENTED_PROTOCOLS)
+    if speed:
+        fragments = min(FRAGMENT_MAX, max(1, -(-int(FRAGMENT_TARGET_RATE) // int(speed)))) if fragmented else 1
+        chunk = int(min(CHUNK_MAX, max(CHUNK_MIN, speed * CHUNK_SECONDS))) >> 20 << 20
+    else:
+        fragments = FRAGMENT_DEFAULT if fragmented else 1
+        chunk = CHUNK_DEFAULT
+    ydl.params["concurrent_fragment_downloads"] = fragments
+    info["downloader_options"] = {**(info.get("downloader_options") or {}), "http_chunk_size": chunk}
+    info["_fragment_tuning"] = (cls, fragments)
+    measured = f"{speed / (1024 * 1024):.2f} Mo/s par connexion" if speed else "pas encore de mesure"
+    file_logger.info(
+        "Réglage fragments : format %s (%s) → %d fragment(s) en parallèle, blocs de %d Mo (%s)",
+        info.get("format_id", "?"), cls, fragments, chunk >> 20, measured,
+    )
+
+def _observe_fragment_speed(d: dict[str, Any]) -> None:
+    """progress_hook « finished » : débit moyen ramené à une connexion, moyenne glissante par classe d'hôte."""
+    tuning = (d.get("info_dict") or {}).get("_fragment_tuning")
+    elapsed = d.get("elapsed")
+    total = d.get("total_bytes") or d.get("downloaded_bytes")
+    if not tuning or not elapsed or not total or total < FRAGMENT_MIN_SAMPLE:
+        return
+    cls, fragments = tuning
+    per_connection = total / elapsed / max(1, fragments)
+    with _fragment_stats_lock:
+        entry = _fragment_stats.setdefault(cls, {})
+        previous = entry.get("speed")
+        entry["speed"] = per_connection if not previous else previous + FRAGMENT_EWMA_ALPHA * (per_connection - previous)
+        entry["samples"] = entry.get("samples", 0) + 1
+        average = entry["speed"]
+    file_logger.info(
+        "Mesure fragments : %s %.2f Mo/s par connexion (%d fragment(s)) → moyenne %.2f Mo/s",
+        cls, per_connection / (1024 * 1024), fragments, average / (1024 * 1024),
+    )
+
+class _StreamDownload(threading.Thread):
+    """Un flux (vidéo ou audio) d'un format fusionné téléchargé en arrière-plan (--parallel-streams)."""
+
+    def __init__(self, download: Any, name: str) -> None:
+        super().__init__(name=name, daemon=True)
+        self._download = download
+        self.outcome: Any = None
+        self.exception: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            self.outcome = self._download()
+        except BaseException as e:
+            self.exception = e
+
+class _TunedYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    YoutubeDL de téléchargement : réglage des fragments par format si AUTO_TUNE (--auto-tune),
+    flux .fNNN lancés ensemble si PARALLEL_STREAMS (--parallel-streams), attendus avant la fusion.
+    """
+
+    def __init__(self, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        self._streams: list[_StreamDownload] = []
+
+    def dl(self, name: str, info: dict[str, Any], subtitle: bool = False, test: bool = False) -> Any:
+        if AUTO_TUNE and not subtitle and not test and info.get("url"):
+            _tune_format(self, info)
+        format_id = info.get("format_id")
+        if PARALLEL_STREAMS and not subtitle and not test and format_id and f".f{format_id}." in pathlib.Path(name).name:
+            parent_dl = super().dl
+            stream = _StreamDownload(lambda: parent_dl(name, info), f"{threading.current_thread().name}-f{format_id}")
+            self._streams.append(stream)
+            stream.start()
+            return True, True
+        return super().dl(name, info, subtitle=subtitle, test=test)
+
+    def _join_streams(self) -> None:
+        """Attend les flux lancés ; l'échec d'un flux fait échouer la vidéo (pas de fusion)."""
+        streams, self._streams = self._streams, []
+        for stream in streams:
+            stream.join()
+        for stream in streams:
+            if stream.exception is not None:
+                raise yt_dlp.utils.PostProcessingError(f"unable to download video data: {stream.exception}")
+            if not stream.outcome or not stream.outcome[0]:
+                raise yt_dlp.utils.PostProcessingError("unable to download video data: flux incomplet")
+
+    def in_download_archive(self, info_dict: dict[str, Any]) -> bool:
+        # Appelé une fois par vidéo écartée par yt-dlp (elle n'est plus traitée ensuite)
+        archived = super().in_download_archive(info_dict)
+        if archived:
+            with _counters_lock:
+                counters["skipped"] += 1
+        return archived
+
+    def post_process(self, filename: str, info: dict[str, Any], files_to_move: dict[str, Any] | None = None) -> Any:
+        self._join_streams()
+        info = super().post_process(filename, info, files_to_move)
+        _record_final_file(info)
+        return info
+
+    def process_info(self, info_dict: dict[str, Any]) -> Any:
+        try:
+            return super().process_info(info_dict)
+        finally:
+            streams, self._streams = self._streams, []
+            for stream in streams:
+                stream.join()
+
 # ---------- PROGRESS HOOK ----------
 # Longueur max affichée pour garder la barre sur une seule ligne (évite retours à la ligne)
 PROGRESS_FN_MAX = 55
@@ -594,15 +1098,48 @@ def _truncate_display_name(fn: str | None, max_len: int = PROGRESS_FN_MAX) -> st
         name = "..." + name[-max_len + 3:]
     return name
 
-# Clé pour laquelle on a reçu un "finished" (fragment) mais pas encore affiché "Vidéo terminée"
-_pending_finished_key: str | None = None
+# Clé pour laquelle on a reçu un "finished" (fragment) mais pas encore affiché "Vidéo terminée" (par thread)
+def _get_pending_key() -> str | None:
+    return getattr(_hook_state, "pending_finished_key", None)
+
+def _set_pending_key(key: str | None) -> None:
+    _hook_state.pending_finished_key = key
+
+# --parallel-streams : flux de chaque vidéo (fichier .fNNN → octets reçus, total) et flux terminés, tous threads
+_streams_progress: dict[str, dict[str, tuple[int, int]]] = {}
+_streams_finished: dict[str, set[str]] = {}
+
+def _combined_streams_percent(fn: str, key: str, d: dict[str, Any], percent: str) -> str:
+    """Pourcentage cumulé des flux d'une vidéo téléchargés en parallèle."""
+    downloaded = d.get("downloaded_bytes")
+    total = d.get("total_bytes") or d.get("total_bytes_estimate")
+    if downloaded is None or not total:
+        return percent
+    with _counters_lock:
+        streams = _streams_progress.setdefault(key, {})
+        streams[fn] = (downloaded, total)
+        done = sum(s[0] for s in streams.values())
+        size = sum(s[1] for s in streams.values())
+    return f"{min(100.0, 100.0 * done / size):.1f}%"
+
+def _stream_finished(key: str, fn: str) -> bool:
+    """Flux terminé ; True quand les deux flux de la vidéo le sont."""
+    with _counters_lock:
+        finished = _streams_finished.setdefault(key, set())
+        finished.add(fn)
+        if len(finished) < 2:
+            return False
+        _streams_finished.pop(key, None)
+        _streams_progress.pop(key, None)
+        return True
 
 def _emit_video_finished(key: str) -> None:
     """Affiche une fois 'Vidéo terminée' et log pour la clé donnée."""
-    if not key or key in _finished_video_keys:
-        return
-    _finished_video_keys.add(key)
-    counters["ok"] += 1
+    with _counters_lock:
+        if not key or key in _finished_video_keys:
+            return
+        _finished_video_keys.add(key)
+        counters["ok"] += 1
     _flush_terminal_warning_line()
     final_display = str(pathlib.Path(key).with_suffix(".mp4"))
     display_fn = _truncate_display_name(final_display, PROGRESS_FN_MAX + 20)
@@ -610,16 +1147,17 @@ def _emit_video_finished(key: str) -> None:
     general_logger.info(f"OK | {final_display}")
 
 def progress_hook(d: dict[str, Any]) -> None:
-    global _pending_finished_key
     status = d.get("status")
     fn = d.get("filename", "?")
     key = _video_base_key(fn)
+    pending_key = _get_pending_key()
 
     if status == "downloading":
         # Si on passe à une autre vidéo, la précédente (pending) est complète
-        if _pending_finished_key is not None and key != _pending_finished_key:
-            _emit_video_finished(_pending_finished_key)
-            _pending_finished_key = None
+        if pending_key is not None and key != pending_key:
+            _emit_video_finished(pending_key)
+            _set_pending_key(None)
+            pending_key = None
         percent = (d.get("_percent_str") or "0.0%").strip()
         try:
             pct = int(float(percent.replace("%", "").replace(",", ".")) // PROGRESS_PERCENT_STEP)
@@ -628,44 +1166,72 @@ def progress_hook(d: dict[str, Any]) -> None:
         filled = min(pct, PROGRESS_BAR_LENGTH)
         bar = "█" * filled + "░" * (PROGRESS_BAR_LENGTH - filled)
         # Fragments : afficher "1/2" puis "2/2" pour éviter deux lignes "100% audio" (webm + m4a)
-        if _is_fragment_path(fn):
-            label = "2/2" if _pending_finished_key == key else "1/2"
+        if _is_fragment_path(fn) and PARALLEL_STREAMS and key:
+            # Flux simultanés : une seule barre, sur le total des deux
+            percent = _combined_streams_percent(fn, key, d, percent)
+            try:
+                pct = int(float(percent.replace("%", "")) // PROGRESS_PERCENT_STEP)
+            except ValueError:
+                pass
+            filled = min(pct, PROGRESS_BAR_LENGTH)
+            bar = "█" * filled + "░" * (PROGRESS_BAR_LENGTH - filled)
+            label = "vidéo+audio"
+        elif _is_fragment_path(fn):
+            label = "2/2" if pending_key == key else "1/2"
         else:
             label = _progress_label(fn)
+        downloaded = d.get("downloaded_bytes")
+        if downloaded is not None and (_rate_limit["rate"] > 0 or _rate_limit["shared"]):
+            # Octets reçus depuis le dernier appel pour ce fichier (par thread) → limiteur global
+            seen = getattr(_hook_state, "seen_bytes", None)
+            if seen is None:
+                seen = _hook_state.seen_bytes = {}
+            previous = seen.get(fn)
+            seen[fn] = downloaded
+            if previous is not None and downloaded > previous:
+                _throttle(downloaded - previous)
+            # Débit effectif total (toutes vidéos en cours de ce processus)
+            label = f"{_format_rate(_measured_rate())}  {label}"
         line_content = f"  ⏳ [{bar}] {percent}  {label}"
         line_content = (line_content[:PROGRESS_LINE_WIDTH]).ljust(PROGRESS_LINE_WIDTH)
         print(f"\r{CYAN}{line_content}{RESET}", end="")
         sys.stdout.flush()
 
     elif status == "finished":
+        if AUTO_TUNE:
+            _observe_fragment_speed(d)
         if key is None or key in _finished_video_keys:
             return
         if not _is_video_output_path(fn):
             return
-        if _is_fragment_path(fn):
+        if _is_fragment_path(fn) and PARALLEL_STREAMS:
+            # Flux simultanés (threads différents) : "Vidéo terminée" quand les deux sont reçus
+            if _stream_finished(key, fn):
+                _emit_video_finished(key)
+        elif _is_fragment_path(fn):
             # Fragment (vidéo ou audio) : afficher "Vidéo terminée" seulement après le dernier fragment
-            if _pending_finished_key == key:
+            if pending_key == key:
                 _emit_video_finished(key)
-                _pending_finished_key = None
+                _set_pending_key(None)
             else:
                 # Premier fragment terminé : toujours passer à la ligne pour garder la 1re étape visible.
                 # (Sinon, si le flux vidéo est en .webm, on n'ajoutait pas de newline et "100% audio" écrasait "100% vidéo"/"100% audio".)
                 print()
-                _pending_finished_key = key
+                _set_pending_key(key)
         else:
             # Fichier final (.mp4 etc.) : si pending a la même clé, c'est le fragment de cette vidéo → ne compter qu'une fois
-            if _pending_finished_key is not None:
-                if _pending_finished_key == key:
-                    _pending_finished_key = None
-                else:
-                    _emit_video_finished(_pending_finished_key)
-                    _pending_finished_key = None
+            if pending_key is not None:
+                if pending_key != key:
+                    _emit_video_finished(pending_key)
+                _set_pending_key(None)
             _emit_video_finished(key)
 
     elif status == "error":
         _flush_terminal_warning_line()
         print(f"  {RED}✖ Échec : {_truncate_display_name(fn)}{RESET}")
-        counters["error"] += 1
+        with _counters_lock:
+            counters["error"] += 1
+        _hook_state.job_error_counted = True
         general_logger.warning(f"ERREUR | {fn}")
 
 # ---------- YT-DLP OPTIONS ----------
@@ -680,54 +1246,493 @@ extract_opts = {
 # cookiefile ajouté à la volée via _get_cookiefile_path() au moment de l'utilisation
 
 def _archive_entry_count() -> int:
-    """Retourne le nombre d'entrées dans l'archive (fichier archive.txt)."""
-    if not ARCHIVE_FILE.exists():
-        return 0
+    """Retourne le nombre d'entrées distinctes dans l'archive (seuls les ajouts récents sont relus)."""
     try:
-        text = ARCHIVE_FILE.read_text(encoding="utf-8")
-        return sum(1 for line in text.splitlines() if line.strip())
+        return _archive.count()
     except Exception:
         return 0
 
 
-def _count_entries(ydl: Any, url: str) -> int:
-    """Retourne le nombre d'entrées (vidéos) pour une URL playlist/onglet."""
+def _count_entries(ydl: Any, url: str, count_new: bool = False) -> tuple[int, bool, int | None]:
+    """
+    Nombre d'entrées (vidéos) d'une URL playlist/onglet, s'il est exact, et nombre de vidéos absentes de
+    l'archive (None si count_new est faux). Sans count_new : playlist_count annoncé par la première page
+    (estimation), sinon parcours de toutes les pages ; avec : toutes les pages, IDs comparés à _archive.
+    """
     try:
         info = ydl.extract_info(url, download=False, process=False)
-        if not info:
-            return 0
-        entries = info.get("entries")
+        entries = info.get("entries") if info else None
         if entries is None:
-            return 0
-        return len(list(entries))
+            return 0, True, 0 if count_new else None
+        if not count_new:
+            announced = info.get("playlist_count")
+            if isinstance(announced, int) and announced >= 0:
+                return announced, False, None
+            return sum(1 for _ in entries), True, None
+        total = new = 0
+        for entry in entries:
+            total += 1
+            video_id = entry.get("id") if isinstance(entry, dict) else None
+            if not (video_id and f"youtube {video_id}" in _archive):
+                new += 1
+        return total, True, new
     except Exception:
-        return -1  # erreur (cookies, etc.)
+        return -1, False, None  # erreur (cookies, etc.)
+
+
+def _playlist_sections(ydl: Any, channel_base: str) -> list[tuple[str, str]]:
+    """Playlists personnalisées de la chaîne : [(libellé, url)] dans l'ordre de l'onglet /playlists."""
+    found: list[tuple[str, str]] = []
+    try:
+        info = ydl.extract_info(channel_base + "/playlists", download=False, process=False)
+        entries = list(info.get("entries") or []) if info else []
+    except Exception as e:
+        extract_logger.debug("Playlists non récupérées : %s", e)
+        return found
+    for entry in entries:
+        if not entry or not isinstance(entry, dict):
+            continue
+        pl_url = entry.get("url") or entry.get("id")
+        if not pl_url:
+            continue
+        if isinstance(pl_url, str) and not pl_url.startswith("http"):
+            pl_url = f"https://www.youtube.com/playlist?list={pl_url}"
+        pl_title = (entry.get("title") or "Sans nom").strip() or "Sans nom"
+        found.append((f'Playlist "{pl_title}"', pl_url))
+    return found
+
+
+def _analyze_channel(channel_base: str, count_new: bool = False) -> list[dict[str, Any]]:
+    """
+    Sections de la chaîne ({"label", "url", "count", "exact", "new"}) : onglets puis playlists, dans cet ordre.
+    Comptages par ANALYZE_WORKERS threads (un YoutubeDL par thread) ; durée notée dans le log de session.
+    """
+    started = time.monotonic()
+    if count_new:
+        # Archive relue une fois : les threads de comptage ne font que des lectures du set
+        _archive.refresh()
+    opts_extract = dict(extract_opts)
+    opts_extract["socket_timeout"] = ANALYZE_TIMEOUT
+    cookiefile_path = _get_cookiefile_path()
+    if cookiefile_path:
+        opts_extract["cookiefile"] = cookiefile_path
+    local = threading.local()
+    instances: list[Any] = []
+    instances_lock = threading.Lock()
+
+    def thread_ydl() -> Any:
+        if getattr(local, "ydl", None) is None:
+            local.ydl = yt_dlp.YoutubeDL(opts_extract)
+            with instances_lock:
+                instances.append(local.ydl)
+        return local.ydl
+
+    pending: list[tuple[str, str, Any]] = []
+    try:
+        with ThreadPoolExecutor(max_workers=ANALYZE_WORKERS, thread_name_prefix="yt-count") as pool:
+            for tab_label, path in [
+                ("Vidéos (uploads, hors playlists)", "/videos"),
+                ("Shorts", "/shorts"),
+                ("Directs (Live)", "/streams"),
+            ]:
+                url = channel_base + path
+                pending.append((tab_label, url, pool.submit(lambda u: _count_entries(thread_ydl(), u, count_new), url)))
+            # Liste des playlists pendant le comptage des onglets
+            for pl_label, pl_url in _playlist_sections(thread_ydl(), channel_base):
+                pending.append((pl_label, pl_url, pool.submit(lambda u: _count_entries(thread_ydl(), u, count_new), pl_url)))
+            sections: list[dict[str, Any]] = []
+            for label, url, future in pending:
+                count, exact, new = future.result()
+                sections.append({"label": label, "url": url, "count": count, "exact": exact, "new": new})
+    finally:
+        for ydl in instances:
+            ydl.close()
+    extract_logger.info(
+        "Analyse %s : %d section(s) en %.1f s (%d comptage(s) en parallèle)",
+        channel_base, len(sections), time.monotonic() - started, ANALYZE_WORKERS,
+    )
+    return sections
 
 
 def _reset_session_state() -> None:
     """Réinitialise l'état d'une session (compteurs, clés vidéo, archive) pour une nouvelle itération en boucle."""
-    global archive_total_at_start, _filtered_warning_count, _pending_finished_key
+    global archive_total_at_start, _filtered_warning_count
     counters["ok"] = 0
     counters["error"] = 0
     counters["skipped"] = 0
     _finished_video_keys.clear()
-    _pending_finished_key = None
+    _duplicate_jobs.clear()
+    _final_files.clear()
+    _streams_progress.clear()
+    _streams_finished.clear()
+    _set_pending_key(None)
     _filtered_warning_count = 0
-    archive_total_at_start = 0
-    if ARCHIVE_FILE.exists():
+    archive_total_at_start = _archive_entry_count()
+
+
+def _parse_workers_arg() -> int:
+    """Nombre de téléchargements parallèles : --workers N (ou --workers=N), sinon MAX_WORKERS."""
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        value = None
+        if arg == "--workers" and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith("--workers="):
+            value = arg.split("=", 1)[1]
+        if value is not None:
+            try:
+                return max(1, int(value))
+            except ValueError:
+                print(f"  {YELLOW}⚠ --workers invalide ({value}) : {MAX_WORKERS} utilisé.{RESET}")
+    return max(1, MAX_WORKERS)
+
+
+def _expand_jobs(urls: list[str]) -> list[tuple[str, str | None, dict[str, Any]]]:
+    """Expansion à plat des sections : (URL vidéo, ID vidéo, contexte playlist) par vidéo, dans l'ordre.
+    Le contexte (playlist, playlist_index…) garde le même nommage que OUTPUT_TEMPLATE en séquentiel."""
+    opts = dict(extract_opts)
+    cookiefile_path = _get_cookiefile_path()
+    if cookiefile_path:
+        opts["cookiefile"] = cookiefile_path
+    jobs: list[tuple[str, str | None, dict[str, Any]]] = []
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        for url in urls:
+            try:
+                info = ydl.extract_info(url, download=False, process=False)
+            except Exception as e:
+                extract_logger.debug("Expansion impossible (%s) : %s", url, e)
+                info = None
+            entries = info.get("entries") if info else None
+            if entries is None:
+                jobs.append((url, (info or {}).get("id"), {}))
+                continue
+            entries = [e for e in entries if e and isinstance(e, dict)]
+            for i, entry in enumerate(entries, start=1):
+                entry_url = entry.get("url") or entry.get("id")
+                if not entry_url:
+                    continue
+                if not str(entry_url).startswith("http"):
+                    entry_url = f"https://www.youtube.com/watch?v={entry_url}"
+                jobs.append((entry_url, entry.get("id"), {
+                    "playlist_count": info.get("playlist_count") or len(entries),
+                    "playlist": info.get("title") or info.get("id"),
+                    "playlist_id": info.get("id"),
+                    "playlist_title": info.get("title"),
+                    "playlist_uploader": info.get("uploader"),
+                    "playlist_uploader_id": info.get("uploader_id"),
+                    "playlist_channel": info.get("channel"),
+                    "playlist_channel_id": info.get("channel_id"),
+                    "playlist_webpage_url": info.get("webpage_url"),
+                    "n_entries": len(entries),
+                    "playlist_index": i,
+                    "playlist_autonumber": i,
+                }))
+    return jobs
+
+
+# ---------- DÉDOUBLONNAGE ENTRE SECTIONS ----------
+# ID vidéo → contextes playlist des doublons écartés ; fichier final (champs du modèle, chemin) des vidéos concernées
+_duplicate_jobs: dict[str, list[dict[str, Any]]] = {}
+_final_files: dict[str, tuple[dict[str, Any], str]] = {}
+_final_files_lock = threading.Lock()
+_files_index_lock = threading.Lock()
+
+
+def _skip_archived(jobs: list[tuple[str, str | None, dict[str, Any]]]) -> list[tuple[str, str | None, dict[str, Any]]]:
+    """Pré-filtre : vidéos déjà dans l'archive écartées avant tout appel à yt-dlp, comptées « en archive »."""
+    archive = _archive
+    if not archive.count():
+        return jobs
+    kept = [job for job in jobs if not (job[1] and "youtube.com/" in job[0] and f"youtube {job[1]}" in archive)]
+    skipped = len(jobs) - len(kept)
+    if skipped:
+        with _counters_lock:
+            counters["skipped"] += skipped
+        print(f"  {CYAN}⊙ {skipped} vidéo(s) déjà en archive, écartée(s) avant extraction{RESET}")
+        # Liens créés d'après le fichier téléchargé pendant le run : rien à lier pour une vidéo déjà en archive
+        kept_ids = {job[1] for job in kept}
+        archived_ids = [job[1] for job in jobs if job[1] not in kept_ids]
+        shared = len(archived_ids) - len(set(archived_ids))
+        if DEDUP_SECTIONS and shared:
+            print(f"  {CYAN}⊙ {shared} emplacement(s) de vidéos en archive dans d'autres sections : non lié(s){RESET}")
+    return kept
+
+
+def _dedup_jobs(jobs: list[tuple[str, str | None, dict[str, Any]]]) -> list[tuple[str, str | None, dict[str, Any]]]:
+    """Union des sections par ID vidéo : premier job conservé (ordre des sections), doublons notés pour les liens."""
+    kept = []
+    seen: set[str] = set()
+    for job in jobs:
+        video_id = job[1]
+        if video_id and video_id in seen:
+            _duplicate_jobs.setdefault(video_id, []).append(job[2])
+            continue
+        if video_id:
+            seen.add(video_id)
+        kept.append(job)
+    return kept
+
+
+def _record_final_file(info: dict[str, Any]) -> None:
+    """
+    Fichier final d'une vidéo (appelé après le post-traitement) : noté dans FILES_INDEX pour --compact-archive,
+    et gardé pour les liens si la vidéo a des doublons dans d'autres sections.
+    """
+    video_id = info.get("id")
+    if not video_id or not info.get("filepath"):
+        return
+    line = f"{video_id}\t{_files_index_key(info['filepath'])}\n"
+    try:
+        with _files_index_lock, open(FILES_INDEX, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError:
+        pass
+    if video_id not in _duplicate_jobs:
+        return
+    fields = {k: v for k, v in info.items() if isinstance(v, (str, int, float)) and not k.startswith("__")}
+    with _final_files_lock:
+        _final_files[video_id] = (fields, info["filepath"])
+
+
+def _link_duplicates() -> tuple[int, int]:
+    """
+    Autres emplacements des vidéos dédoublonnées : lien physique au chemin qu'aurait produit OUTPUT_TEMPLATE
+    pour cette section, sinon copie (copy_file_range : reflink selon le système de fichiers). Retourne (liens, échecs).
+    """
+    linked = failed = 0
+    with yt_dlp.YoutubeDL({"outtmpl": (OUTPUT_DIR / OUTPUT_TEMPLATE).as_posix(), "quiet": True}) as ydl:
+        for video_id, (fields, path) in _final_files.items():
+            src = pathlib.Path(path)
+            if not src.is_file():
+                continue
+            for extra_info in _duplicate_jobs.get(video_id, []):
+                # Extension du fichier réel (fusion) plutôt que celle du format d'origine
+                target = pathlib.Path(ydl.prepare_filename({**fields, **extra_info})).with_suffix(src.suffix)
+                if target.exists():
+                    continue
+                try:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    try:
+                        os.link(src, target)
+                    except OSError:
+                        _copy_file(src, target)
+                    linked += 1
+                except OSError as e:
+                    failed += 1
+                    general_logger.warning(f"LIEN | {target} | {e}")
+    return linked, failed
+
+
+def _copy_file(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """copy_file_range (copie côté noyau) si disponible, sinon shutil.copyfile ; pas de fichier partiel en cas d'erreur."""
+    try:
+        if hasattr(os, "copy_file_range"):
+            with open(src, "rb") as fin, open(dst, "wb") as fout:
+                try:
+                    while os.copy_file_range(fin.fileno(), fout.fileno(), 64 * 1024 * 1024):
+                        pass
+                    return
+                except OSError:
+                    pass
+        shutil.copyfile(src, dst)
+    except BaseException:
+        dst.unlink(missing_ok=True)
+        raise
+
+
+def _download_parallel(urls: list[str], ydl_opts: dict[str, Any], max_workers: int) -> None:
+    """Expansion à plat (archive pré-filtrée, dédoublonnée si DEDUP_SECTIONS) puis max_workers instances YoutubeDL (une par thread)."""
+    jobs = _skip_archived(_expand_jobs(urls))
+    if DEDUP_SECTIONS and len(urls) > 1:
+        total = len(jobs)
+        jobs = _dedup_jobs(jobs)
+        if len(jobs) < total:
+            print(f"  {CYAN}●{RESET} {total - len(jobs)} doublon(s) entre sections : téléchargé(s) une fois, lié(s) en fin de run")
+    if max_workers > 1:
+        print(f"  {GREEN}●{RESET} {len(jobs)} vidéo(s) — {max_workers} téléchargement(s) en parallèle\n")
+    else:
+        print(f"  {GREEN}●{RESET} {len(jobs)} vidéo(s) à télécharger\n")
+    local = threading.local()
+    instances: list[Any] = []
+    instances_lock = threading.Lock()
+
+    def run_job(job: tuple[str, str | None, dict[str, Any]]) -> None:
+        url, _video_id, extra_info = job
+        if getattr(local, "ydl", None) is None:
+            local.ydl = _TunedYoutubeDL(ydl_opts)
+            with instances_lock:
+                instances.append(local.ydl)
+        _hook_state.job_errors = []
+        _hook_state.job_error_counted = False
+        _hook_state.seen_bytes = {}
+        _rate_job(1)
         try:
-            text = ARCHIVE_FILE.read_text(encoding="utf-8")
-            archive_total_at_start = sum(1 for line in text.splitlines() if line.strip())
-        except Exception:
-            pass
+            local.ydl.extract_info(url, download=True, extra_info=dict(extra_info))
+        except Exception as e:
+            _hook_state.job_errors.append(str(e))
+        finally:
+            _rate_job(-1)
+        errors = _hook_state.job_errors
+        _hook_state.job_errors = None
+        pending_key = _get_pending_key()
+        _set_pending_key(None)
+        if errors and not _hook_state.job_error_counted:
+            _flush_terminal_warning_line()
+            print(f"  {RED}✖ Échec : {_truncate_display_name(url)}{RESET}")
+            with _counters_lock:
+                counters["error"] += 1
+            general_logger.warning(f"ERREUR | {url} | {errors[-1]}")
+        elif pending_key is not None and not errors:
+            _emit_video_finished(pending_key)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yt-dl") as pool:
+            for future in [pool.submit(run_job, job) for job in jobs]:
+                future.result()
+    finally:
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+
+# ---------- MAINTENANCE DE L'ARCHIVE (--compact-archive) ----------
+# Fichiers finaux cherchés dans downloads/ ; ID lu dans FILES_INDEX, sinon dans le nom ou les métadonnées
+# (purl / comment écrits par FFmpegMetadata quand ffmpeg est trouvé)
+MEDIA_EXTENSIONS = {".mp4", ".mkv", ".webm", ".mov", ".m4a", ".mp3", ".opus", ".ogg", ".flac"}
+TAG_SCAN_BYTES = 1024 * 1024
+_URL_ID_RE = re.compile(rb"(?:youtube\.com/(?:watch\?v=|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})")
+_NAME_ID_RE = re.compile(r"\[([A-Za-z0-9_-]{11})\]")
+
+def _files_index_key(path: str | os.PathLike[str]) -> str:
+    """Chemin relatif à downloads/ (absolu s'il est ailleurs), séparateurs « / » : clé de FILES_INDEX."""
+    path = os.path.abspath(path)
+    try:
+        return pathlib.Path(path).relative_to(os.path.abspath(OUTPUT_DIR)).as_posix()
+    except ValueError:
+        return pathlib.Path(path).as_posix()
+
+def _load_files_index() -> dict[str, str]:
+    """{chemin relatif: ID} d'après FILES_INDEX ; la dernière ligne d'un chemin l'emporte."""
+    index: dict[str, str] = {}
+    try:
+        with open(FILES_INDEX, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                video_id, sep, path = line.rstrip("\n").partition("\t")
+                if sep and video_id and path:
+                    index[path] = video_id
+    except FileNotFoundError:
+        pass
+    return index
+
+def _file_video_id(path: pathlib.Path) -> str | None:
+    """ID YouTube d'un fichier : [ID] dans le nom, sinon URL dans les métadonnées (début ou fin du fichier)."""
+    match = _NAME_ID_RE.search(path.stem)
+    if match:
+        return match.group(1)
+    try:
+        with open(path, "rb") as f:
+            match = _URL_ID_RE.search(f.read(TAG_SCAN_BYTES))
+            if match is None:
+                size = f.seek(0, os.SEEK_END)
+                if size > TAG_SCAN_BYTES:
+                    f.seek(max(TAG_SCAN_BYTES, size - TAG_SCAN_BYTES))
+                    match = _URL_ID_RE.search(f.read())
+    except OSError:
+        return None
+    return match.group(1).decode("ascii") if match else None
+
+def _run_archive_maintenance(drop_missing: bool) -> None:
+    """
+    --compact-archive : doublons retirés de archive.txt, entrées sans fichier dans downloads/ signalées
+    (retirées avec --drop-missing, après confirmation), fichiers hors archive listés. Détail dans
+    logs/archive_reconcile_*.txt. Retrait refusé si aucun fichier n'est identifié ou si certains n'ont pas d'ID.
+    """
+    print(_section_title("Archive"))
+    print(f"  {DIM}Analyse de {OUTPUT_DIR}…{RESET}")
+    recorded = _load_files_index()
+    files: dict[str, str] = {}
+    unidentified: list[str] = []
+    for directory, _dirs, names in os.walk(OUTPUT_DIR):
+        for name in names:
+            path = pathlib.Path(directory, name)
+            if path.suffix.lower() in MEDIA_EXTENSIONS:
+                video_id = recorded.get(_files_index_key(path)) or _file_video_id(path)
+                if video_id is None:
+                    unidentified.append(str(path))
+                else:
+                    files.setdefault(video_id, str(path))
+    LOG_DIR.mkdir(exist_ok=True)
+    report_path = LOG_DIR / f"archive_reconcile_{datetime.datetime.now():%Y%m%d_%H%M%S}.txt"
+    missing: set[str] = set()
+    untracked = 0
+    dropped = 0
+    with open(report_path, "w", encoding="utf-8") as out:
+        out.write(f"Archive : {ARCHIVE_FILE}\nFichiers : {OUTPUT_DIR}\n\n")
+
+        def note_missing(entry: str) -> bool:
+            if entry.startswith("youtube ") and entry[len("youtube "):] not in files:
+                missing.add(entry)
+                out.write(f"SANS FICHIER\t{entry}\n")
+            return False
+
+        # Premier passage : doublons retirés, entrées sans fichier seulement notées
+        kept, duplicates, _ = _archive.compact(note_missing)
+        drop_requested = drop_missing
+        if drop_missing and missing:
+            if not files or unidentified:
+                print(f"  {RED}✖ Retrait refusé :{RESET} {len(files)} fichier(s) identifié(s), {len(unidentified)} sans ID lisible")
+                print(f"  {DIM}Une entrée « sans fichier » pourrait être celle d'un fichier présent.{RESET}")
+                drop_missing = False
+            else:
+                try:
+                    answer = input(f"  {YELLOW}Retirer {len(missing)} entrée(s) sans fichier de archive.txt ? Ces vidéos pourront être retéléchargées (o = oui) : {RESET}")
+                except EOFError:
+                    answer = ""
+                drop_missing = answer.strip().lower() in ("o", "oui")
+            if drop_missing:
+                kept, _, dropped = _archive.compact(lambda entry: entry in missing)
+        for video_id, path in files.items():
+            if f"youtube {video_id}" not in _archive:
+                untracked += 1
+                out.write(f"HORS ARCHIVE\t{path}\n")
+        for path in unidentified:
+            out.write(f"SANS ID\t{path}\n")
+    general_logger.info(
+        "ARCHIVE | compactage | conservées=%d doublons=%d sans_fichier=%d retirées=%d hors_archive=%d",
+        kept, duplicates, len(missing), dropped, untracked,
+    )
+    print(f"  {GREEN}✔ Entrées conservées :{RESET}  {kept}")
+    print(f"  {YELLOW}● Doublons retirés :{RESET}  {duplicates}")
+    print(f"  {YELLOW}● Sans fichier dans downloads/ :{RESET}  {len(missing)}" + (f"  ({dropped} retirée(s))" if drop_missing else f"  {DIM}(conservées){RESET}" if drop_requested else f"  {DIM}(--drop-missing pour les retirer){RESET}"))
+    print(f"  {YELLOW}● Fichiers hors archive :{RESET}  {untracked}")
+    print(f"  {DIM}Fichiers sans ID lisible :{RESET}  {len(unidentified)}")
+    print(f"\n  {DIM}Détail : {report_path}{RESET}\n")
 
 
 # ---------- BOUCLE PRINCIPALE ----------
 def main() -> None:
     """Point d'entrée : mode (chaîne / une vidéo), choix, téléchargement, résumé, relance."""
     try:
+        if "--compact-archive" in sys.argv[1:]:
+            _run_archive_maintenance("--drop-missing" in sys.argv[1:])
+            return
         channel_base = DEFAULT_CHANNEL_URL.rstrip("/")
         first_round = True
+        max_workers = _parse_workers_arg()
+        rate_mbps, rate_shared = _parse_rate_args()
+        _setup_rate_limit(rate_mbps, rate_shared)
+        global AUTO_TUNE
+        AUTO_TUNE = AUTO_TUNE or "--auto-tune" in sys.argv[1:]
+        if AUTO_TUNE:
+            _load_fragment_stats()
+        global PARALLEL_STREAMS
+        PARALLEL_STREAMS = PARALLEL_STREAMS or "--parallel-streams" in sys.argv[1:]
+        global DEDUP_SECTIONS
+        DEDUP_SECTIONS = DEDUP_SECTIONS or "--dedup" in sys.argv[1:]
+        global COUNT_NEW
+        COUNT_NEW = COUNT_NEW or "--count-new" in sys.argv[1:]
         # Tour par tour : effacer → mode → (chaîne + analyse + menu ou URL) → téléchargement → résumé → relance ?
         while True:
             _clear_terminal()
@@ -780,41 +1785,7 @@ def main() -> None:
 
                 print(_section_title("Analyse de la chaîne"))
                 print(f"  {DIM}{channel_base}{RESET}\n")
-                sections = []  # liste de {"label": str, "url": str, "count": int}
-
-                opts_extract = dict(extract_opts)
-                cookiefile_path = _get_cookiefile_path()
-                if cookiefile_path:
-                    opts_extract["cookiefile"] = cookiefile_path
-                with yt_dlp.YoutubeDL(opts_extract) as ydl:
-                    # Onglets principaux
-                    for tab_label, path in [
-                        ("Vidéos (uploads, hors playlists)", "/videos"),
-                        ("Shorts", "/shorts"),
-                        ("Directs (Live)", "/streams"),
-                    ]:
-                        url = channel_base + path
-                        n = _count_entries(ydl, url)
-                        sections.append({"label": tab_label, "url": url, "count": n})
-
-                    # Playlists personnalisées de la chaîne
-                    playlists_url = channel_base + "/playlists"
-                    try:
-                        info = ydl.extract_info(playlists_url, download=False, process=False)
-                        entries = list(info.get("entries") or []) if info else []
-                        for entry in entries:
-                            if not entry or not isinstance(entry, dict):
-                                continue
-                            pl_url = entry.get("url") or entry.get("id")
-                            if not pl_url:
-                                continue
-                            if isinstance(pl_url, str) and not pl_url.startswith("http"):
-                                pl_url = f"https://www.youtube.com/playlist?list={pl_url}"
-                            pl_title = (entry.get("title") or "Sans nom").strip() or "Sans nom"
-                            pl_count = _count_entries(ydl, pl_url)
-                            sections.append({"label": f'Playlist "{pl_title}"', "url": pl_url, "count": pl_count})
-                    except Exception as e:
-                        extract_logger.debug("Playlists non récupérées : %s", e)
+                sections = _analyze_channel(channel_base, COUNT_NEW)
 
                 # Message unique si l'analyse a échoué (ex. cookies invalides)
                 if sections and all(s["count"] < 0 for s in sections[:3]):
@@ -826,13 +1797,22 @@ def main() -> None:
                     print(_section_title("Contenu disponible"))
                     print(f"  {BOX_TOP}")
                     for i, s in enumerate(sections, start=1):
-                        count_str = f"{s['count']} vidéo(s)" if s["count"] >= 0 else "?"
+                        # « ~ » : nombre annoncé par YouTube (playlists), pas compté
+                        total_str = f"{'' if s['exact'] else '~'}{s['count']}"
+                        if s["count"] < 0:
+                            count_str = "?"
+                        elif s["new"] is not None:
+                            count_str = f"{s['new']} nouvelle(s) / {total_str}"
+                        else:
+                            count_str = f"{total_str} vidéo(s)"
                         print(_menu_line(f"{CYAN}[{i:2}]{RESET} {s['label']}  {DIM}({count_str}){RESET}"))
                     print(f"  {BOX_SEP}")
                     print(_menu_line(f"{CYAN}[ 0]{RESET} Tout télécharger (onglets + playlists)"))
+                    if COUNT_NEW:
+                        print(_menu_line(f"{CYAN}[ n]{RESET} Sections avec nouveautés (vidéos hors archive)"))
                     print(_menu_line(f"{CYAN}[ q]{RESET} Quitter sans télécharger"))
                     print(f"  {BOX_BOT}\n")
-                    print(f"  {DIM}Ex. : 1   ou   1,3   ou   0 pour tout{RESET}\n")
+                    print(f"  {DIM}Ex. : 1   ou   1,3   ou   0 pour tout{'   ou   n pour les nouveautés' if COUNT_NEW else ''}{RESET}\n")
 
                     try:
                         choice = input(f"  {YELLOW}Votre choix : {RESET}").strip().lower()
@@ -846,6 +1826,11 @@ def main() -> None:
                     # Construire la liste des URL à télécharger
                     if choice == "0":
                         urls_to_download = [s["url"] for s in sections]
+                    elif choice == "n" and COUNT_NEW:
+                        urls_to_download = [s["url"] for s in sections if s["new"]]
+                        if not urls_to_download:
+                            print(f"\n  {GREEN}✔ Aucune vidéo nouvelle : tout est déjà dans l'archive.{RESET}\n")
+                            continue
                     else:
                         for part in choice.replace(",", " ").split():
                             part = part.strip()
@@ -869,26 +1854,40 @@ def main() -> None:
                 "yes_playlist": True,
                 "ignoreerrors": True,
                 "continuedl": True,
-                "download_archive": str(ARCHIVE_FILE),
-                "embed_metadata": True,
-                "embed_thumbnail": True,
+                "download_archive": _archive,
                 "merge_output_format": "mp4",
                 "quiet": True,
                 "logger": file_logger,
             }
+            if shutil.which("ffmpeg"):
+                # Métadonnées et miniature intégrées, comme --embed-metadata / --embed-thumbnail (les clés embed_*
+                # ne sont lues que par la ligne de commande yt-dlp) ; pas de miniature de playlist. Sans ffmpeg,
+                # ces post-processeurs feraient échouer chaque vidéo
+                ydl_opts["outtmpl"] = {"default": ydl_opts["outtmpl"], "pl_thumbnail": ""}
+                ydl_opts["writethumbnail"] = True
+                ydl_opts["postprocessors"] = [
+                    {"key": "FFmpegMetadata", "add_metadata": True, "add_chapters": True},
+                    {"key": "EmbedThumbnail", "already_have_thumbnail": False},
+                ]
             cookiefile_path = _get_cookiefile_path()
             if cookiefile_path:
                 ydl_opts["cookiefile"] = cookiefile_path
 
             # ---------- EXECUTION ----------
             general_logger.info(f"Début | URLs={urls_to_download}")
+            _archive.reset_stats()
             print(_section_title("Téléchargement"))
             print(f"  {GREEN}●{RESET} {len(urls_to_download)} groupe(s) sélectionné(s)")
             print(f"  {DIM}Dossier : {OUTPUT_DIR}{RESET}")
             print(f"  {DIM}Archive : {ARCHIVE_FILE}{RESET}\n")
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download(urls_to_download)
+            # Expansion à plat même en séquentiel (un worker) : vidéos archivées écartées avant yt-dlp
+            _download_parallel(urls_to_download, ydl_opts, max_workers)
+            _save_fragment_stats()
+            _archive.flush()
+            if _archive.writes:
+                general_logger.info(f"ARCHIVE | {_archive.stats_summary()}")
+            links_done, links_failed = _link_duplicates() if _final_files else (0, 0)
 
             general_logger.info("Fin | ok=%d skipped=%d error=%d", counters["ok"], counters["skipped"], counters["error"])
 
@@ -902,7 +1901,11 @@ def main() -> None:
             print(f"  {GREEN}✔ Téléchargées :{RESET}  {counters['ok']}")
             print(f"  {YELLOW}⊙ En archive (session) :{RESET}  {counters['skipped']}")
             print(f"  {RED}✖ Échecs :{RESET}  {counters['error']}")
+            if links_done or links_failed:
+                print(f"  {CYAN}● Doublons liés (autres sections) :{RESET}  {links_done}" + (f"  {RED}({links_failed} échec(s)){RESET}" if links_failed else ""))
             print(f"  {DIM}En archive (total actuel) :{RESET}  {archive_total_current}")
+            if _archive.writes:
+                print(f"  {DIM}Écritures archive : {_archive.stats_summary()}{RESET}")
             print(_separator("═", 50))
             print(f"\n  {GREEN}Terminé.{RESET}  {DIM}Log : {LOG_FILE_GENERAL}  |  Session : {log_session}{RESET}\n")
 
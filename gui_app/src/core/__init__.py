@@ -8,8 +8,9 @@ from .paths import (
 )
 from .urls import normalize_channel_url, is_youtube_video_url
 from .cookies import get_cookiefile_path, has_cookies_source, cookies_file_valid
-from .channel import get_channel_sections
+from .channel import get_channel_sections, iter_channel_sections
 from .download import run_download, DownloadResult, get_error_advice
+from .aio import download_stream, download_async, DownloadEvent
 
 __all__ = [
     "SCRIPT_DIR",
@@ -24,7 +25,11 @@ __all__ = [
     "has_cookies_source",
     "cookies_file_valid",
     "get_channel_sections",
+    "iter_channel_sections",
     "run_download",
     "DownloadResult",
     "get_error_advice",
+    "download_stream",
+    "download_async",
+    "DownloadEvent",
 ]
@@ -0,0 +1,137 @@
+"""API asyncio : téléchargement en arrière-plan, événements consommés par `async for`, annulation."""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import threading
+from concurrent.futures import Executor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterator
+
+from .download import DownloadResult, run_download
+from .ratelimit import RateLimiter
+
+# Délai (s) entre deux tentatives de dépôt d'un événement quand la file est pleine (permet de voir l'annulation)
+_PUT_RETRY = 0.5
+
+
+@dataclass
+class DownloadEvent:
+    """
+    kind = "progress" : message / percent / status tels que reçus par progress_callback
+    ("downloading", "finished", "video_done", "already_in_archive", "error", "info", "pipeline_stats", "rate", "concurrency"...).
+    kind = "result" : dernier événement du flux, result contient le DownloadResult du run.
+    """
+    kind: str
+    message: str = ""
+    percent: float = 0.0
+    status: str = ""
+    result: DownloadResult | None = None
+
+
+async def download_stream(
+    urls: list[str],
+    *,
+    max_workers: int = 1,
+    extract_workers: int = 0,
+    queue_depth: int = 4,
+    backend: str = "thread",
+    rate_limit: float | RateLimiter | None = None,
+    priorities: dict[str, float] | None = None,
+    adaptive: bool = False,
+    auto_tune: bool = False,
+    parallel_components: bool = False,
+    resume: bool = False,
+    retry: bool = False,
+    postprocess_workers: int = 0,
+    single_pass: bool = False,
+    stream_remux: bool = False,
+    scratch_dir: str | pathlib.Path | None = None,
+    dedup: bool = False,
+    executor: Executor | None = None,
+    max_pending_events: int = 256,
+) -> AsyncIterator[DownloadEvent]:
+    """
+    Lance run_download dans executor (par défaut celui de la boucle) et produit ses événements.
+    File bornée à max_pending_events : si le consommateur ne suit pas, les workers attendent.
+    Annuler la tâche (ou fermer le générateur) interrompt les téléchargements en cours ;
+    le générateur ne rend la main qu'une fois run_download terminé.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue[DownloadEvent | None] = asyncio.Queue(maxsize=max(1, max_pending_events))
+    cancel_event = threading.Event()
+
+    def on_progress(msg: str, percent: float, status: str) -> None:
+        # Thread worker : dépôt bloquant (backpressure) tant que le run n'est pas annulé
+        event = DownloadEvent("progress", msg, percent, status)
+        while not cancel_event.is_set():
+            future = asyncio.run_coroutine_threadsafe(events.put(event), loop)
+            try:
+                future.result(timeout=_PUT_RETRY)
+                return
+            except FutureTimeout:
+                if not future.cancel():
+                    return
+            except RuntimeError:
+                # Boucle fermée
+                return
+
+    task = loop.run_in_executor(
+        executor,
+        partial(
+            run_download,
+            urls,
+            progress_callback=on_progress,
+            max_workers=max_workers,
+            extract_workers=extract_workers,
+            queue_depth=queue_depth,
+            backend=backend,
+            rate_limit=rate_limit,
+            priorities=priorities,
+            adaptive=adaptive,
+            auto_tune=auto_tune,
+            parallel_components=parallel_components,
+            resume=resume,
+            retry=retry,
+            postprocess_workers=postprocess_workers,
+            single_pass=single_pass,
+            stream_remux=stream_remux,
+            scratch_dir=scratch_dir,
+            dedup=dedup,
+            cancel_event=cancel_event,
+        ),
+    )
+
+    def on_done(_: Any) -> None:
+        # Sentinel de fin : put_nowait impossible si la file est pleine, on passe par une tâche
+        loop.create_task(events.put(None))
+
+    task.add_done_callback(on_done)
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        yield DownloadEvent("result", result=await task)
+    finally:
+        if not task.done():
+            cancel_event.set()
+            # Vider la file pour débloquer les workers et attendre la fin effective du run
+            while not task.done():
+                try:
+                    events.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                await asyncio.wait({task}, timeout=_PUT_RETRY)
+            task.exception()
+
+
+async def download_async(urls: list[str], **kwargs: Any) -> DownloadResult:
+    """Comme run_download, sans événements intermédiaires ; annulable."""
+    result = DownloadResult(ok=0, skipped=0, error=0)
+    async for event in download_stream(urls, **kwargs):
+        if event.result is not None:
+            result = event.result
+    return result
@@ -0,0 +1,474 @@
+"""
+Archive des vidéos téléchargées : archive.txt (format texte de yt-dlp, ajout seul) et son index.
+IDs YouTube (11 caractères base64url = 64 bits) packés sur 8 octets dans archive.idx : tableau trié, mappé
+en mémoire (pages partagées entre processus par le cache disque) et consulté par dichotomie. Seules les
+lignes ajoutées depuis la construction de l'index sont relues. Les ajouts sont groupés et écrits sous verrou
+inter-processus (archive.lock), après dédoublonnage contre les lignes écrites entre-temps par les autres
+processus (GUI, CLI, workers).
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import pathlib
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator
+
+from .locking import locked_file
+from .paths import ARCHIVE_FILE
+
+# Préfixe des lignes d'archive yt-dlp pour les vidéos YouTube (« youtube <id> », cf. make_archive_id)
+YOUTUBE_EXTRACTOR = "youtube"
+# Ajouts lus après l'index (entrées récentes, en mémoire) au-delà desquels l'index est reconstruit
+MAX_RECENT = 65536
+# Écritures groupées : entrées en attente écrites au plus tard FLUSH_INTERVAL s après la première, ou dès FLUSH_BATCH
+FLUSH_INTERVAL = 2.0
+FLUSH_BATCH = 64
+
+# En-tête de archive.idx : signature, octets de archive.txt couverts, st_dev / st_ino de archive.txt,
+# nombre d'IDs packés ; suivi des IDs (uint64 triés) puis des autres entrées en texte
+_INDEX_HEADER = struct.Struct("<8sQQQQ")
+_INDEX_MAGIC = b"YTARCIX1"
+_YOUTUBE_PREFIX = YOUTUBE_EXTRACTOR + " "
+_B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+_B64_INDEX = {c: i for i, c in enumerate(_B64)}
+
+
+def archive_entry(video_id: str, extractor: str = YOUTUBE_EXTRACTOR) -> str:
+    """Ligne d'archive d'une vidéo, au format de yt-dlp."""
+    return f"{extractor.lower()} {video_id}"
+
+
+def pack_video_id(video_id: str) -> int | None:
+    """ID YouTube → entier 64 bits (le 11e caractère ne porte que 4 bits) ; None si l'ID n'a pas cette forme."""
+    if len(video_id) != 11:
+        return None
+    value = 0
+    try:
+        for c in video_id[:10]:
+            value = value << 6 | _B64_INDEX[c]
+        last = _B64_INDEX[video_id[10]]
+    except KeyError:
+        return None
+    if last & 3:
+        return None
+    return value << 4 | last >> 2
+
+
+def unpack_video_id(value: int) -> str:
+    chars = [_B64[(value & 15) << 2]]
+    value >>= 4
+    for _ in range(10):
+        chars.append(_B64[value & 63])
+        value >>= 6
+    return "".join(reversed(chars))
+
+
+def _pack_entry(entry: str) -> int | None:
+    return pack_video_id(entry[len(_YOUTUBE_PREFIX):]) if entry.startswith(_YOUTUBE_PREFIX) else None
+
+
+class _PackedIds:
+    """Tableau trié d'IDs packés : vue sur le mmap de archive.idx, ou array en mémoire (index non écrit)."""
+
+    def __init__(self, values: memoryview | array | None = None, mm: mmap.mmap | None = None) -> None:
+        self._values = values if values is not None else array("Q")
+        self._mm = mm
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_left(self._values, value)
+        return i < len(self._values) and self._values[i] == value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def position(self, value: int) -> int:
+        """Rang de value dans le tableau, -1 s'il est absent."""
+        i = bisect_left(self._values, value)
+        return i if i < len(self._values) and self._values[i] == value else -1
+
+    def snapshot(self) -> array:
+        """Copie (itérable après la fermeture du mmap)."""
+        return array("Q", self._values)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._values.release()  # type: ignore[union-attr]
+            self._mm.close()
+            self._mm = None
+        self._values = array("Q")
+
+
+class ArchiveStore:
+    """
+    Index de archive.txt, utilisable tel quel comme download_archive de yt-dlp (in, add, len) : add() ajoute
+    la ligne au fichier (réécriture seulement par compact()) puis à l'index. Entrées = IDs packés de archive.idx + ajouts
+    récents (entiers) + autres entrées (autre extracteur, ID non standard). refresh() ne lit que la fin du
+    fichier ajoutée depuis la lecture précédente ; index reconstruit si archive.txt a été remplacé, tronqué
+    ou supprimé, ou quand les ajouts récents dépassent MAX_RECENT. Une instance par fichier et par
+    processus : get_archive().
+    """
+
+    def __init__(self, path: pathlib.Path | None = None, index_path: pathlib.Path | None = None) -> None:
+        self.path = path or ARCHIVE_FILE
+        self.index_path = index_path or self.path.with_suffix(".idx")
+        self.lock_path = self.path.with_suffix(".lock")
+        self._lock = threading.RLock()
+        # Entrées ajoutées pas encore écrites (visibles par __contains__), écriture programmée par _timer
+        self._pending: dict[str, None] = {}
+        self._timer: threading.Timer | None = None
+        # Statistiques d'écriture : lots écrits, entrées écrites, doublons écartés, attente du verrou (s)
+        self.writes = 0
+        self.written = 0
+        self.duplicates = 0
+        self.lock_wait_total = 0.0
+        self.lock_wait_max = 0.0
+        self.last_wait = 0.0
+        self._packed = _PackedIds()
+        self._recent: set[int] = set()
+        self._other: set[str] = set()
+        # Fichier lu jusqu'à _offset (fin de la dernière ligne complète) ; _identity = (st_dev, st_ino)
+        self._offset = 0
+        self._identity: tuple[int, int] | None = None
+
+    def refresh(self) -> None:
+        """Prend en compte les lignes ajoutées par d'autres processus depuis la dernière lecture."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return
+            if (st.st_dev, st.st_ino) != self._identity or st.st_size < self._offset:
+                self._reset()
+                self._identity = (st.st_dev, st.st_ino)
+                if not self._load_index(st.st_size):
+                    self._rebuild()
+            if st.st_size > self._offset:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read(st.st_size - self._offset)
+                # Dernière ligne sans fin de ligne (fichier édité, écriture en cours) : prise en compte comme
+                # yt-dlp, mais relue au prochain refresh
+                self._offset += data.rfind(b"\n") + 1
+                self._add_lines(data.decode("utf-8", errors="replace").splitlines())
+            if len(self._recent) > MAX_RECENT:
+                self._rebuild()
+
+    def _reset(self) -> None:
+        self._packed.close()
+        self._recent = set()
+        self._other = set()
+        self._offset = 0
+        self._identity = None
+
+    def _add_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            value = _pack_entry(line)
+            if value is None:
+                self._other.add(line)
+            elif value not in self._packed:
+                self._recent.add(value)
+
+    def _load_index(self, size: int) -> bool:
+        """Reprend archive.idx s'il a été construit pour ce fichier ; False sinon (à reconstruire)."""
+        try:
+            with open(self.index_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        header_size = _INDEX_HEADER.size
+        if len(mm) < header_size:
+            mm.close()
+            return False
+        magic, covered, dev, ino, n = _INDEX_HEADER.unpack_from(mm)
+        end = header_size + 8 * n
+        if magic != _INDEX_MAGIC or (dev, ino) != self._identity or covered > size or len(mm) < end:
+            mm.close()
+            return False
+        self._packed.close()
+        self._packed = _PackedIds(memoryview(mm)[header_size:end].cast("Q"), mm)
+        self._other = set(mm[end:].decode("utf-8").splitlines())
+        self._offset = covered
+        return True
+
+    def _rebuild(self) -> None:
+        """Relit archive.txt en entier, trie les IDs packés et réécrit archive.idx (repli en mémoire si impossible)."""
+        values = array("Q")
+        other: set[str] = set()
+        covered = 0
+        try:
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        # Ligne incomplète : hors de l'index, relue par refresh()
+                        break
+                    covered += len(raw)
+                    line = raw.decode("utf-8", errors="replace").strip()
+                    if not line:
+                        continue
+                    value = _pack_entry(line)
+                    if value is None:
+                        other.add(line)
+                    else:
+                        values.append(value)
+        except FileNotFoundError:
+            pass
+        unique = array("Q")
+        last = None
+        for value in sorted(values):
+            if value != last:
+                unique.append(value)
+                last = value
+        del values
+        self._packed.close()
+        self._packed = _PackedIds(unique)
+        self._recent = set()
+        self._other = other
+        self._offset = covered
+        if self._write_index(unique, other, covered):
+            self._load_index(covered)
+
+    def _write_index(self, values: array, other: set[str], covered: int) -> bool:
+        dev, ino = self._identity or (0, 0)
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, covered, dev, ino, len(values)))
+                values.tofile(f)
+                f.write("".join(f"{e}\n" for e in sorted(other)).encode("utf-8"))
+            # Sous Windows, échoue si un autre processus a l'index ouvert : index gardé en mémoire
+            os.replace(tmp, self.index_path)
+            return True
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return False
+
+    def __contains__(self, entry: object) -> bool:
+        if not isinstance(entry, str):
+            return False
+        value = _pack_entry(entry)
+        with self._lock:
+            if entry in self._pending:
+                return True
+            if value is None:
+                return entry in self._other
+            return value in self._recent or value in self._packed
+
+    def __len__(self) -> int:
+        return len(self._packed) + len(self._recent) + len(self._other) + len(self._pending)
+
+    def __iter__(self) -> Iterator[str]:
+        """Entrées distinctes : IDs de l'index (ordre du tableau), puis ajouts récents et autres entrées."""
+        with self._lock:
+            packed = self._packed.snapshot()
+            recent = sorted(self._recent)
+            other = sorted({*self._other, *self._pending})
+        for values in (packed, recent):
+            for value in values:
+                yield _YOUTUBE_PREFIX + unpack_video_id(value)
+        yield from other
+
+    def count(self) -> int:
+        """Nombre d'entrées distinctes, après lecture des éventuels ajouts."""
+        self.refresh()
+        return len(self)
+
+    def has_video(self, video_id: str, extractor: str = YOUTUBE_EXTRACTOR) -> bool:
+        return archive_entry(video_id, extractor) in self
+
+    def add(self, entry: str) -> None:
+        """Nouvelle entrée (appelé par yt-dlp après un téléchargement) : mise en attente, écrite par lot."""
+        entry = entry.strip()
+        with self._lock:
+            if not entry or entry in self:
+                return
+            self._pending[entry] = None
+            if len(self._pending) >= FLUSH_BATCH:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(FLUSH_INTERVAL, self._flush_quietly)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def add_many(self, entries: Iterable[str]) -> int:
+        """Ajoute en une écriture les entrées absentes ; retourne le nombre d'entrées écrites."""
+        with self._lock:
+            for entry in entries:
+                entry = entry.strip()
+                if entry and entry not in self:
+                    self._pending[entry] = None
+            return self.flush()
+
+    def flush(self) -> int:
+        """
+        Écrit les entrées en attente sous verrou inter-processus, après relecture des lignes ajoutées par
+        les autres processus (doublons écartés) ; retourne le nombre d'entrées écrites.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            pending, self._pending = list(self._pending), {}
+            started = time.monotonic()
+            try:
+                with locked_file(self.lock_path):
+                    waited = time.monotonic() - started
+                    self.refresh()
+                    new = [e for e in pending if e not in self]
+                    if new:
+                        self._append(new)
+                        self._add_lines(new)
+            except BaseException:
+                # Rien d'écrit : entrées remises en attente
+                self._pending = dict.fromkeys([*pending, *self._pending])
+                raise
+            self.writes += 1
+            self.written += len(new)
+            self.duplicates += len(pending) - len(new)
+            self.lock_wait_total += waited
+            self.lock_wait_max = max(self.lock_wait_max, waited)
+            self.last_wait = waited
+            return len(new)
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except OSError:
+            # Disque indisponible : nouvel essai au prochain ajout ou à la fin du run
+            pass
+
+    def _append(self, entries: list[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(f"{e}\n" for e in entries).encode("utf-8")
+        with open(self.path, "a+b") as f:
+            if f.seek(0, os.SEEK_END):
+                # Fichier terminé par une ligne incomplète (édition à la main) : ne pas y coller l'entrée
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.writes = self.written = self.duplicates = 0
+            self.lock_wait_total = self.lock_wait_max = self.last_wait = 0.0
+
+    def merge_stats(self, stats: tuple[int, int, int, float, float]) -> None:
+        """Statistiques d'un processus worker (backend processus), cumulées à celles du parent."""
+        writes, written, duplicates, wait_total, wait_max = stats
+        with self._lock:
+            self.writes += writes
+            self.written += written
+            self.duplicates += duplicates
+            self.lock_wait_total += wait_total
+            self.lock_wait_max = max(self.lock_wait_max, wait_max)
+
+    def take_stats(self) -> tuple[int, int, int, float, float]:
+        """Statistiques accumulées depuis le dernier appel, puis remises à zéro."""
+        with self._lock:
+            stats = (self.writes, self.written, self.duplicates, self.lock_wait_total, self.lock_wait_max)
+            self.reset_stats()
+            return stats
+
+    def stats_summary(self) -> str:
+        return (
+            f"Archive : {self.written} entrée(s) en {self.writes} écriture(s), {self.duplicates} doublon(s) écarté(s), "
+            f"attente du verrou {self.lock_wait_total * 1000:.1f} ms au total (max {self.lock_wait_max * 1000:.1f} ms)"
+        )
+
+    def compact(self, drop: Callable[[str], bool] | None = None) -> tuple[int, int, int]:
+        """
+        Réécrit archive.txt sans doublons ni lignes vides (première occurrence, ordre conservé), en un seul
+        passage sous verrou ; drop(entry) est appelé une fois par entrée distincte et l'écarte s'il retourne
+        True. Mémoire bornée : un bit par ID de l'index packé, ensembles seulement pour les ajouts récents et
+        les autres entrées. Fichier remplacé atomiquement. Retourne (conservées, doublons, écartées).
+        """
+        self.flush()
+        with self._lock, locked_file(self.lock_path):
+            self.refresh()
+            if not self.path.exists():
+                return 0, 0, 0
+            packed = self._packed
+            seen_bits = bytearray((len(packed) + 7) // 8)
+            seen: set[int | str] = set()
+            kept = duplicates = dropped = 0
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                with open(self.path, "rb") as src, open(tmp, "wb") as out:
+                    for raw in src:
+                        entry = raw.decode("utf-8", errors="replace").strip()
+                        if not entry:
+                            continue
+                        value = _pack_entry(entry)
+                        pos = packed.position(value) if value is not None else -1
+                        if pos >= 0:
+                            bit = 1 << (pos & 7)
+                            if seen_bits[pos >> 3] & bit:
+                                duplicates += 1
+                                continue
+                            seen_bits[pos >> 3] |= bit
+                        else:
+                            key = entry if value is None else value
+                            if key in seen:
+                                duplicates += 1
+                                continue
+                            seen.add(key)
+                        if drop is not None and drop(entry):
+                            dropped += 1
+                            continue
+                        out.write(entry.encode("utf-8") + b"\n")
+                        kept += 1
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            # Nouveau fichier (autre st_ino) : index reconstruit, ici comme dans les autres processus
+            self.refresh()
+        return kept, duplicates, dropped
+
+    def import_text(self, path: pathlib.Path) -> int:
+        """Fusionne une archive texte (yt-dlp, autre poste) ; retourne le nombre d'entrées ajoutées."""
+        with open(path, encoding="utf-8") as f:
+            return self.add_many(line for line in f)
+
+    def export_text(self, path: pathlib.Path) -> int:
+        """Écrit les entrées distinctes au format texte de yt-dlp ; retourne leur nombre."""
+        self.refresh()
+        tmp = path.with_name(path.name + ".tmp")
+        count = 0
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self:
+                f.write(entry + "\n")
+                count += 1
+        os.replace(tmp, path)
+        return count
+
+
+_stores: dict[pathlib.Path, ArchiveStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_archive(path: pathlib.Path | None = None) -> ArchiveStore:
+    """Index partagé du fichier d'archive (ARCHIVE_FILE par défaut), mis à jour des ajouts récents."""
+    path = path or ARCHIVE_FILE
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ArchiveStore(path)
+    store.refresh()
+    return store
@@ -1,13 +1,37 @@
 """Analyse des chaînes YouTube (onglets / playlists) pour la GUI."""
 from __future__ import annotations
 
+import json
 import logging
-from typing import Any
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Iterator
+from urllib.parse import urlparse
 
 import yt_dlp  # type: ignore[import-untyped]
 
-from .paths import LOG_DIR, REMOTE_COMPONENTS
+from .archive import ArchiveStore
+from .locking import locked_file
+from .paths import LOG_DIR, REMOTE_COMPONENTS, SCRIPT_DIR
 from .cookies import get_cookiefile_path
+from .urls import normalize_channel_url
+
+# Comptages de sections en parallèle (un YoutubeDL par thread) ; délai max (s) par requête HTTP
+COUNT_WORKERS = 6
+COUNT_TIMEOUT = 30.0
+# Onglets principaux de la chaîne, dans l'ordre du menu
+CHANNEL_TABS = (
+    ("Vidéos (uploads, hors playlists)", "/videos"),
+    ("Shorts", "/shorts"),
+    ("Directs (Live)", "/streams"),
+)
+
+# Cache disque des analyses par chaîne : durée de validité par défaut (s), entrées oubliées au-delà de CACHE_MAX_AGE
+CACHE_FILE = SCRIPT_DIR / "channel_cache.json"
+CACHE_TTL = 6 * 3600
+CACHE_MAX_AGE = 30 * 86400
 
 # Logger pour l'analyse (fichier seul, pas de flood dans la GUI)
 _extract_logger: logging.Logger | None = None
@@ -29,67 +53,216 @@ def _get_extract_logger() -> logging.Logger:
     return _extract_logger
 
 
-def _count_entries(ydl: Any, url: str) -> int:
-    """Retourne le nombre d'entrées (vidéos) pour une URL playlist/onglet. -1 en cas d'erreur."""
+def _count_entries(
+    ydl: Any,
+    url: str,
+    archive: ArchiveStore | None = None,
+    walk: bool = False,
+) -> tuple[int, bool, int | None]:
+    """
+    Nombre d'entrées (vidéos) d'une URL playlist/onglet, s'il est exact, et nombre de vidéos absentes de
+    archive (None si non compté). playlist_count annoncé par la première page si présent et walk faux
+    (estimation, vidéos masquées comprises, new = None) ; sinon parcours de toutes les pages, IDs comparés
+    à archive au passage. (-1, False, None) en cas d'erreur.
+    """
     try:
         info = ydl.extract_info(url, download=False, process=False)
-        if not info:
-            return 0
-        entries = info.get("entries")
+        entries = info.get("entries") if info else None
         if entries is None:
-            return 0
-        return len(list(entries))
+            return 0, True, None if archive is None else 0
+        announced = info.get("playlist_count")
+        if not walk and isinstance(announced, int) and announced >= 0:
+            return announced, False, None
+        if archive is None:
+            return sum(1 for _ in entries), True, None
+        total = new = 0
+        for entry in entries:
+            total += 1
+            video_id = entry.get("id") if isinstance(entry, dict) else None
+            if not (video_id and archive.has_video(video_id)):
+                new += 1
+        return total, True, new
     except Exception:
-        return -1
+        return -1, False, None
 
 
-def get_channel_sections(channel_base: str) -> list[dict[str, Any]]:
-    """
-    Analyse la chaîne YouTube et retourne la liste des sections (onglets + playlists).
-    Chaque section : {"label": str, "url": str, "count": int}.
-    count = -1 en cas d'erreur d'extraction (ex. cookies invalides).
-    """
-    sections: list[dict[str, Any]] = []
-    opts = {
+def _extract_opts() -> dict[str, Any]:
+    opts: dict[str, Any] = {
         "extract_flat": "entries",
         "quiet": True,
         "no_warnings": True,
         "remote_components": REMOTE_COMPONENTS,
         "logger": _get_extract_logger(),
+        "socket_timeout": COUNT_TIMEOUT,
     }
     cookiefile_path = get_cookiefile_path()
     if cookiefile_path:
         opts["cookiefile"] = cookiefile_path
+    return opts
 
-    base = channel_base.rstrip("/")
 
-    with yt_dlp.YoutubeDL(opts) as ydl:
-        for tab_label, path in [
-            ("Vidéos (uploads, hors playlists)", "/videos"),
-            ("Shorts", "/shorts"),
-            ("Directs (Live)", "/streams"),
-        ]:
-            url = base + path
-            n = _count_entries(ydl, url)
-            sections.append({"label": tab_label, "url": url, "count": n})
+class _ThreadYDL:
+    """Un YoutubeDL par thread du pool de comptage (instance non partageable entre threads), fermés ensemble."""
 
-        # Playlists personnalisées de la chaîne
-        playlists_url = base + "/playlists"
-        try:
-            info = ydl.extract_info(playlists_url, download=False, process=False)
-            entries = list(info.get("entries") or []) if info else []
-            for entry in entries:
-                if not entry or not isinstance(entry, dict):
+    def __init__(self, opts: dict[str, Any]) -> None:
+        self._opts = opts
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: list[Any] = []
+
+    def get(self) -> Any:
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = yt_dlp.YoutubeDL(self._opts)
+            with self._lock:
+                self._all.append(ydl)
+        return ydl
+
+    def count(self, url: str, archive: ArchiveStore | None = None, walk: bool = False) -> tuple[int, bool, int | None]:
+        return _count_entries(self.get(), url, archive, walk)
+
+    def close(self) -> None:
+        with self._lock:
+            for ydl in self._all:
+                ydl.close()
+            self._all.clear()
+
+
+def _playlist_sections(ydl: Any, base: str) -> list[tuple[str, str]]:
+    """Playlists personnalisées de la chaîne : [(libellé, url)] dans l'ordre de l'onglet /playlists."""
+    found: list[tuple[str, str]] = []
+    try:
+        info = ydl.extract_info(base + "/playlists", download=False, process=False)
+        entries = list(info.get("entries") or []) if info else []
+    except Exception:
+        return found
+    for entry in entries:
+        if not entry or not isinstance(entry, dict):
+            continue
+        pl_url = entry.get("url") or entry.get("id")
+        if not pl_url:
+            continue
+        if isinstance(pl_url, str) and not pl_url.startswith("http"):
+            pl_url = f"https://www.youtube.com/playlist?list={pl_url}"
+        pl_title = (entry.get("title") or "Sans nom").strip() or "Sans nom"
+        found.append((f'Playlist "{pl_title}"', pl_url))
+    return found
+
+
+def iter_channel_sections(channel_base: str, archive: ArchiveStore | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Analyse la chaîne YouTube section par section : chaque section (onglet ou playlist) est produite dès
+    que son nombre est connu, dans l'ordre d'achèvement des comptages (COUNT_WORKERS en parallèle).
+    Chaque section : {"label": str, "url": str, "count": int, "exact": bool, "new": int | None, "position": int}.
+    count = -1 en cas d'erreur d'extraction (ex. cookies invalides) ; exact = False pour un nombre annoncé
+    par YouTube (playlists) plutôt que compté ; new = vidéos absentes de archive (None sans archive) ;
+    position = rang dans la liste finale (onglets puis playlists). Avec archive, une playlist est produite
+    une première fois avec le nombre annoncé (new = None), puis à nouveau (même url) une fois ses pages
+    parcourues. Analyse complète enregistrée dans le cache une fois toutes les sections produites.
+    """
+    started = time.monotonic()
+    base = channel_base.rstrip("/")
+    ydls = _ThreadYDL(_extract_opts())
+    pool = ThreadPoolExecutor(max_workers=COUNT_WORKERS, thread_name_prefix="yt-count")
+    sections: dict[str, dict[str, Any]] = {}
+    try:
+        counting: dict[Future[tuple[int, bool, int | None]], tuple[int, str, str]] = {}
+        # Parcours complets (nouvelles vidéos) lancés après un nombre annoncé
+        walking: set[Future[Any]] = set()
+        for position, (tab_label, path) in enumerate(CHANNEL_TABS):
+            url = base + path
+            counting[pool.submit(ydls.count, url, archive)] = (position, tab_label, url)
+        # Liste des playlists pendant le comptage des onglets
+        listing = pool.submit(lambda: _playlist_sections(ydls.get(), base))
+        waiting: set[Future[Any]] = {*counting, listing}
+        while waiting:
+            done, waiting = wait(waiting, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future is listing:
+                    for position, (pl_label, pl_url) in enumerate(future.result(), start=len(CHANNEL_TABS)):
+                        pl_future = pool.submit(ydls.count, pl_url, archive)
+                        counting[pl_future] = (position, pl_label, pl_url)
+                        waiting.add(pl_future)
                     continue
-                pl_url = entry.get("url") or entry.get("id")
-                if not pl_url:
+                position, label, url = counting[future]
+                count, exact, new = future.result()
+                if future in walking and count < 0:
+                    # Parcours en échec : le nombre annoncé déjà produit est gardé
                     continue
-                if isinstance(pl_url, str) and not pl_url.startswith("http"):
-                    pl_url = f"https://www.youtube.com/playlist?list={pl_url}"
-                pl_title = (entry.get("title") or "Sans nom").strip() or "Sans nom"
-                pl_count = _count_entries(ydl, pl_url)
-                sections.append({"label": f'Playlist "{pl_title}"', "url": pl_url, "count": pl_count})
-        except Exception:
-            pass
-
-    return sections
+                if archive is not None and not exact and count >= 0:
+                    walk_future = pool.submit(ydls.count, url, archive, True)
+                    counting[walk_future] = (position, label, url)
+                    walking.add(walk_future)
+                    waiting.add(walk_future)
+                section = {
+                    "label": label,
+                    "url": url,
+                    "count": count,
+                    "exact": exact,
+                    "new": new,
+                    "position": position,
+                }
+                sections[url] = section
+                yield section
+    finally:
+        # Itération abandonnée : comptages pas encore commencés annulés
+        pool.shutdown(wait=True, cancel_futures=True)
+        ydls.close()
+    ordered = sorted(sections.values(), key=lambda s: s["position"])
+    _get_extract_logger().info(
+        "Analyse %s : %d section(s) en %.1f s (%d comptage(s) en parallèle)",
+        base,
+        len(ordered),
+        time.monotonic() - started,
+        COUNT_WORKERS,
+    )
+    # Analyse ratée (onglets principaux en erreur : cookies, réseau) : le cache garde la précédente
+    if not all(s["count"] < 0 for s in ordered[: len(CHANNEL_TABS)]):
+        try:
+            save_cached_sections(base, ordered)
+        except OSError as e:
+            _get_extract_logger().info("Cache d'analyse non écrit : %s", e)
+
+
+def get_channel_sections(channel_base: str, archive: ArchiveStore | None = None) -> list[dict[str, Any]]:
+    """
+    Analyse la chaîne YouTube et retourne la liste des sections (onglets + playlists), dans l'ordre du menu.
+    Sections comme iter_channel_sections() (dernière version de chacune).
+    """
+    sections = {s["url"]: s for s in iter_channel_sections(channel_base, archive)}
+    return sorted(sections.values(), key=lambda s: s["position"])
+
+
+def _cache_key(channel_base: str) -> str:
+    """URL de chaîne normalisée : hôte www.youtube.com, @handle sans casse (les IDs /channel/UC… la gardent)."""
+    url = normalize_channel_url(channel_base).rstrip("/")
+    path = urlparse(url).path
+    return "https://www.youtube.com" + (path.lower() if path.startswith("/@") else path)
+
+
+def _read_cache() -> dict[str, Any]:
+    try:
+        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_cached_sections(channel_base: str) -> tuple[list[dict[str, Any]], float] | None:
+    """Dernière analyse enregistrée de la chaîne et son âge (s), quelle que soit sa validité ; None si aucune."""
+    entry = _read_cache().get(_cache_key(channel_base))
+    if not isinstance(entry, dict) or not isinstance(entry.get("sections"), list):
+        return None
+    return entry["sections"], max(0.0, time.time() - float(entry.get("time", 0)))
+
+
+def save_cached_sections(channel_base: str, sections: list[dict[str, Any]]) -> None:
+    """Enregistre l'analyse (fusion avec le fichier sous verrou : autres instances), entrées trop anciennes retirées."""
+    now = time.time()
+    with locked_file(CACHE_FILE.with_suffix(".lock")):
+        data = _read_cache()
+        data = {k: v for k, v in data.items() if isinstance(v, dict) and now - float(v.get("time", 0)) < CACHE_MAX_AGE}
+        data[_cache_key(channel_base)] = {"time": now, "sections": sections}
+        tmp = CACHE_FILE.with_name(CACHE_FILE.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, CACHE_FILE)
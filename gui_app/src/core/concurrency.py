@@ -0,0 +1,157 @@
+"""Contrôleur de concurrence adaptatif (AIMD) : plus de jobs tant que le débit progresse, moins au premier blocage."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from .ratelimit import format_rate
+
+# Fenêtre (s) de mesure du débit agrégé entre deux décisions
+EVAL_INTERVAL = 10.0
+# Hausse relative minimale du débit pour garder un job ajouté (sinon retour au palier)
+GAIN_THRESHOLD = 0.10
+# Fenêtres d'attente avant un nouvel essai après un job ajouté sans gain
+HOLD_WINDOWS = 6
+# Occupation moyenne des créneaux (0..1) au-delà de laquelle un job de plus peut être essayé
+SATURATION = 0.8
+# Pause (s) après un signal bot / HTTP 429, doublée à chaque signal consécutif, plafonnée
+COOLDOWN_BASE = 30.0
+COOLDOWN_MAX = 300.0
+# Signaux rapprochés (plusieurs workers touchés par le même blocage) = un seul signal
+SIGNAL_DEBOUNCE = 5.0
+
+
+class AdaptiveConcurrency:
+    """
+    Créneaux de jobs entre 1 et max_workers (acquire / release autour de chaque vidéo).
+    Hausse additive : quand les créneaux sont occupés, +1 job à chaque fenêtre tant que le débit agrégé
+    progresse d'au moins GAIN_THRESHOLD ; un +1 sans gain est annulé (palier tenu HOLD_WINDOWS fenêtres).
+    Baisse multiplicative : signal bot / 429 → limite ÷ 2 et pause avant tout nouveau job.
+    Chaque décision passe par log(message, changed) ; changed = la limite a bougé.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        *,
+        initial: int = 1,
+        log: Callable[[str, bool], None] | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.limit = min(max(1, initial), self.max_workers)
+        self.active = 0
+        self._log = log or (lambda _msg, _changed: None)
+        self._cancel = cancel_event or threading.Event()
+        self._cond = threading.Condition()
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        # Intégrale des créneaux occupés sur la fenêtre (occupation moyenne)
+        self._busy_since = self._window_start
+        self._busy_integral = 0.0
+        self._hold = 0
+        self._last_rate = 0.0
+        self._last_increase = False
+        self._cooldown_until = 0.0
+        self._signal_streak = 0
+        self._last_signal = 0.0
+
+    def acquire(self) -> bool:
+        """Attend un créneau libre (et la fin d'une éventuelle pause) ; False si le run est annulé."""
+        with self._cond:
+            while True:
+                if self._cancel.is_set():
+                    return False
+                now = time.monotonic()
+                self._evaluate(now)
+                if now >= self._cooldown_until and self.active < self.limit:
+                    self._account_busy(now)
+                    self.active += 1
+                    return True
+                wait = self._cooldown_until - now if now < self._cooldown_until else 0.5
+                self._cond.wait(min(max(wait, 0.05), 0.5))
+
+    def release(self) -> None:
+        with self._cond:
+            self._account_busy(time.monotonic())
+            self.active = max(0, self.active - 1)
+            self._cond.notify_all()
+
+    def record_bytes(self, nbytes: int) -> None:
+        with self._cond:
+            self._window_bytes += nbytes
+            self._evaluate(time.monotonic())
+
+    def _account_busy(self, now: float) -> None:
+        self._busy_integral += self.active * (now - self._busy_since)
+        self._busy_since = now
+
+    def on_signal(self, reason: str) -> None:
+        """Blocage côté serveur (bot-check, HTTP 429) : baisse multiplicative + pause."""
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_signal < SIGNAL_DEBOUNCE:
+                return
+            self._last_signal = now
+            self._signal_streak += 1
+            previous = self.limit
+            self.limit = max(1, self.limit // 2)
+            cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** (self._signal_streak - 1))
+            self._cooldown_until = now + cooldown
+            self._last_increase = False
+            self._hold = HOLD_WINDOWS
+            self._reset_window(now)
+            self._log(
+                f"AIMD : {reason} → {previous} → {self.limit} job(s), pause {cooldown:.0f}s "
+                f"(signal n°{self._signal_streak})",
+                True,
+            )
+            self._cond.notify_all()
+
+    def _reset_window(self, now: float) -> None:
+        self._window_start = now
+        self._window_bytes = 0
+        self._busy_since = now
+        self._busy_integral = 0.0
+
+    def _evaluate(self, now: float) -> None:
+        """Fin de fenêtre : décision additive (appelé sous self._cond)."""
+        elapsed = now - self._window_start
+        if elapsed < EVAL_INTERVAL:
+            return
+        if now < self._cooldown_until:
+            self._reset_window(now)
+            return
+        rate = self._window_bytes / elapsed
+        self._account_busy(now)
+        occupancy = self._busy_integral / (elapsed * self.limit)
+        previous_rate, previous_limit = self._last_rate, self.limit
+        if self._last_signal and now - self._last_signal > EVAL_INTERVAL + COOLDOWN_MAX:
+            # Longtemps sans blocage : les pauses repartent de COOLDOWN_BASE
+            self._signal_streak = 0
+        can_probe = occupancy >= SATURATION and self.limit < self.max_workers
+        if self._last_increase and rate < previous_rate * (1 + GAIN_THRESHOLD):
+            self.limit -= 1
+            self._last_increase = False
+            self._hold = HOLD_WINDOWS
+            decision = "job ajouté sans gain, retour au palier"
+        elif self._last_increase and can_probe:
+            self.limit += 1
+            decision = "débit en hausse, +1 job"
+        elif not self._last_increase and can_probe and self._hold <= 0:
+            self.limit += 1
+            self._last_increase = True
+            decision = "créneaux occupés, essai +1 job"
+        else:
+            self._hold -= 1
+            self._last_increase = False
+            decision = "palier"
+        self._last_rate = rate
+        self._log(
+            f"AIMD : débit {format_rate(rate)} (préc. {format_rate(previous_rate)}), occupation {occupancy:.0%} → "
+            f"limite {previous_limit} → {self.limit} ({decision})",
+            self.limit != previous_limit,
+        )
+        self._reset_window(now)
+        self._cond.notify_all()
@@ -10,6 +10,8 @@ import tempfile
 from .paths import COOKIE_FILE, COOKIE_FILE_ENCRYPTED
 
 _cookies_temp_path: pathlib.Path | None = None
+# Signature de cookies.enc au moment du déchiffrement (nouveau déchiffrement si le fichier change)
+_cookies_temp_sig: tuple[int, int] | None = None
 
 
 def encrypt_cookies_to_file(password: str) -> str | None:
@@ -111,12 +113,31 @@ def _cleanup_cookies_temp() -> None:
     _cookies_temp_path = None
 
 
+def _file_signature(path: pathlib.Path) -> tuple[int, int]:
+    """(date de modification ns, taille) ; (0, 0) si le fichier n'existe pas."""
+    try:
+        st = path.stat()
+    except OSError:
+        return 0, 0
+    return st.st_mtime_ns, st.st_size
+
+
+def cookies_signature() -> tuple[tuple[int, int], tuple[int, int]]:
+    """Signature de cookies.txt et cookies.enc : change dès que l'un des deux est remplacé ou modifié."""
+    return _file_signature(COOKIE_FILE), _file_signature(COOKIE_FILE_ENCRYPTED)
+
+
 def get_cookiefile_path() -> str | None:
     """Retourne le chemin du fichier cookies à passer à yt-dlp (plain cookies.txt ou déchiffré à la volée)."""
-    global _cookies_temp_path
+    global _cookies_temp_path, _cookies_temp_sig
     if COOKIE_FILE_ENCRYPTED.exists() and (os.environ.get("YT_COOKIES_PASSWORD") or os.environ.get("YT_COOKIES_KEY")):
+        sig = _file_signature(COOKIE_FILE_ENCRYPTED)
+        if _cookies_temp_path is not None and sig != _cookies_temp_sig:
+            # cookies.enc remplacé depuis le dernier déchiffrement
+            _cleanup_cookies_temp()
         if _cookies_temp_path is None:
             _cookies_temp_path = _decrypt_cookies_to_temp()
+            _cookies_temp_sig = sig
         if _cookies_temp_path is not None and _cookies_temp_path.exists():
             if cookies_file_valid(_cookies_temp_path):
                 return str(_cookies_temp_path)
@@ -0,0 +1,115 @@
+"""Dédoublonnage inter-sections : une vidéo présente dans plusieurs sections est téléchargée une fois, puis liée."""
+from __future__ import annotations
+
+import os
+import pathlib
+import threading
+from typing import TYPE_CHECKING, Any, Callable
+
+import yt_dlp  # type: ignore[import-untyped]
+
+from .mover import _copy
+
+if TYPE_CHECKING:
+    from .download import VideoJob
+
+# Champs de info conservés pour recalculer le nom de fichier des autres emplacements (valeurs simples)
+_FIELD_TYPES = (str, int, float)
+
+
+def dedup_jobs(jobs: list[VideoJob]) -> tuple[list[VideoJob], dict[str, list[VideoJob]]]:
+    """
+    Union des sections par ID vidéo : premier job de chaque vidéo conservé (ordre des sections),
+    les suivants regroupés par ID. Les jobs sans ID (URL seule) sont toujours conservés.
+    """
+    kept: list[VideoJob] = []
+    duplicates: dict[str, list[VideoJob]] = {}
+    seen: set[str] = set()
+    for job in jobs:
+        if job.video_id and job.video_id in seen:
+            duplicates.setdefault(job.video_id, []).append(job)
+            continue
+        if job.video_id:
+            seen.add(job.video_id)
+        kept.append(job)
+    return kept, duplicates
+
+
+def link_fields(info: dict[str, Any]) -> dict[str, Any]:
+    """Champs de info utiles au modèle de sortie (sans listes, formats ni champs internes)."""
+    return {k: v for k, v in info.items() if isinstance(v, _FIELD_TYPES) and not k.startswith("__")}
+
+
+class LinkPlanner:
+    """
+    Emplacements supplémentaires des vidéos dédoublonnées : record() note le fichier final de chaque
+    vidéo téléchargée, link_all() (fin de run, fichiers déplacés) crée un lien physique par doublon au
+    chemin que yt-dlp aurait produit dans cette section (copie copy_file_range, reflink selon le système
+    de fichiers, si le lien est impossible).
+    """
+
+    def __init__(
+        self,
+        duplicates: dict[str, list[VideoJob]],
+        outtmpl: str,
+        *,
+        log: Callable[[str], None] | None = None,
+    ) -> None:
+        self.duplicates = duplicates
+        self._outtmpl = outtmpl
+        self._log = log or (lambda _msg: None)
+        self._lock = threading.Lock()
+        self._finals: dict[str, tuple[dict[str, Any], str]] = {}
+        self.linked = 0
+        self.copied = 0
+        self.failed: list[str] = []
+
+    def record(self, info: dict[str, Any], path: str | pathlib.Path) -> None:
+        video_id = info.get("id")
+        if video_id not in self.duplicates:
+            return
+        with self._lock:
+            self._finals[video_id] = (link_fields(info), str(path))
+
+    def link_all(self) -> None:
+        """Un lien (ou une copie) par doublon dont la vidéo a été téléchargée ; chemins existants laissés tels quels."""
+        with self._lock:
+            finals = dict(self._finals)
+        if not finals:
+            return
+        with yt_dlp.YoutubeDL({"outtmpl": self._outtmpl, "quiet": True}) as ydl:
+            for video_id, (fields, path) in finals.items():
+                src = pathlib.Path(path)
+                if not src.is_file():
+                    continue
+                for job in self.duplicates[video_id]:
+                    target = pathlib.Path(ydl.prepare_filename({**fields, **job.extra_info}))
+                    # Extension du fichier réel (fusion, remux) plutôt que celle du format d'origine
+                    target = target.with_suffix(src.suffix)
+                    if target.exists():
+                        continue
+                    try:
+                        self._link(src, target)
+                    except OSError as e:
+                        self.failed.append(str(target))
+                        self._log(f"⚠ Lien impossible : {target} ({e})")
+        if self.linked or self.copied or self.failed:
+            self._log(
+                f"Doublons entre sections : {self.linked} lien(s), {self.copied} copie(s), {len(self.failed)} échec(s)"
+            )
+
+    def _link(self, src: pathlib.Path, target: pathlib.Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src, target)
+            self.linked += 1
+            return
+        except OSError:
+            # Autre volume ou liens non supportés
+            pass
+        try:
+            _copy(src, target)
+        except BaseException:
+            target.unlink(missing_ok=True)
+            raise
+        self.copied += 1
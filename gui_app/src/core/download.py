@@ -1,16 +1,19 @@
 """Téléchargement des vidéos via yt-dlp (avec progression et résultat)."""
 from __future__ import annotations
 
+import functools
 import logging
+import os
 import pathlib
 import re
-from dataclasses import dataclass
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from typing import Any, Callable
 
 import yt_dlp  # type: ignore[import-untyped]
 
 from .paths import (
-    ARCHIVE_FILE,
     LOG_DIR,
     OUTPUT_DIR,
     OUTPUT_TEMPLATE,
@@ -18,13 +21,29 @@ from .paths import (
     ensure_dirs,
     ensure_windows_path_in_env,
 )
+from .archive import get_archive
 from .cookies import get_cookiefile_path
+from .concurrency import AdaptiveConcurrency
+from .dedup import LinkPlanner, dedup_jobs
+from .fragtune import FragmentTuner
+from .jobstore import DONE, ERROR, JobStore
+from .mover import FileMover
+from .postproc import PostProcessPool
+from .ratelimit import RateLimiter
+from .reconcile import record_file
+from .retry import BOT_COOKIE, PERMANENT, POLL_INTERVAL, TRANSIENT, RetryScheduler
+from .singlepass import detach_embed_pps, ffmpeg_available, use_single_pass
+from .streamremux import StreamRemuxError, can_stream, stream_remux
+from .urls import is_youtube_video_url
 
 # Messages utilisateur pour les erreurs gérées (comme dans cli_app)
 BOT_COOKIE_MSG = "Bot/cookies : mettez à jour cookies.txt (ou « Importer depuis Firefox » dans Prérequis)."
 COOKIES_INVALID_MSG = "Cookies expirés/invalides : mettez à jour cookies.txt (export depuis le navigateur ou import depuis Firefox)."
 NO_TITLE_MSG = "Métadonnées incomplètes (fallback titre)."
 SIG_EJS_RUNTIME_MSG = "Problème technique yt-dlp (signature/EJS/runtime). Vérifiez Deno et mettez à jour yt-dlp."
+RATE_LIMITED_MSG = "Trop de requêtes (HTTP 429) : YouTube limite temporairement l'accès."
+# Attente du verrou de l'archive (s) au-delà de laquelle les statistiques sont aussi affichées dans le journal
+ARCHIVE_WAIT_WARN = 1.0
 
 
 def _is_bot_cookie_error(msg: str) -> bool:
@@ -53,6 +72,77 @@ def _is_sig_ejs_runtime(msg: str) -> bool:
     return False
 
 
+def _is_rate_limited_error(msg: str) -> bool:
+    """True si le message indique un HTTP 429 (Too Many Requests)."""
+    return "HTTP Error 429" in msg or "Too Many Requests" in msg
+
+
+def _is_throttle_signal(msg: str) -> bool:
+    """True si le serveur freine les requêtes (bot-check ou 429) : à prendre en compte par le contrôleur adaptatif."""
+    return _is_bot_cookie_error(msg) or _is_rate_limited_error(msg)
+
+
+# Marqueurs (minuscules) des messages yt-dlp : vidéo inaccessible / incident réseau passager
+_UNAVAILABLE_MARKERS = (
+    "private video",
+    "video unavailable",
+    "has been removed",
+    "copyright",
+    "members-only",
+    "join this channel",
+    "premieres in",
+    "this live event will begin",
+    "age-restricted",
+)
+_TRANSIENT_MARKERS = (
+    "timed out",
+    "connection reset",
+    "connection aborted",
+    "connection refused",
+    "remote end closed",
+    "temporary failure",
+    "name resolution",
+    "network is unreachable",
+    "incompleteread",
+    "incomplete read",
+    "broken pipe",
+    "eof occurred in violation of protocol",
+    "unable to download video data",
+    "unable to download webpage",
+    "giving up after",
+)
+
+
+def _is_unavailable_error(msg: str) -> bool:
+    """True si la vidéo est inaccessible de façon durable (privée, supprimée, HTTP 4xx hors 429…)."""
+    if re.search(r"HTTP Error 4(?!29)\d\d", msg):
+        return True
+    low = msg.lower()
+    return any(marker in low for marker in _UNAVAILABLE_MARKERS)
+
+
+def _is_transient_error(msg: str) -> bool:
+    """True si l'échec est probablement passager (réseau, HTTP 5xx, 429) et vaut une nouvelle tentative."""
+    if _is_rate_limited_error(msg) or re.search(r"HTTP Error 5\d\d", msg):
+        return True
+    low = msg.lower()
+    return any(marker in low for marker in _TRANSIENT_MARKERS)
+
+
+def classify_error(msg: str) -> str:
+    """
+    Classe d'un échec pour les relances : BOT_COOKIE (bot-check, cookies expirés : attendre de nouveaux
+    cookies), TRANSIENT (réseau, 5xx, 429 : nouvelle tentative différée) ou PERMANENT (inutile de relancer).
+    """
+    if _is_bot_cookie_error(msg) or _is_cookies_invalid_error(msg):
+        return BOT_COOKIE
+    if _is_unavailable_error(msg):
+        return PERMANENT
+    if _is_transient_error(msg):
+        return TRANSIENT
+    return PERMANENT
+
+
 def _user_friendly_error(msg: str) -> str:
     """Retourne un message utilisateur en français pour les erreurs connues (bot, cookies, etc.)."""
     if not msg:
@@ -65,6 +155,8 @@ def _user_friendly_error(msg: str) -> str:
         return NO_TITLE_MSG
     if _is_sig_ejs_runtime(msg):
         return SIG_EJS_RUNTIME_MSG
+    if _is_rate_limited_error(msg):
+        return RATE_LIMITED_MSG
     return msg
 
 
@@ -83,6 +175,8 @@ def get_error_advice(error_msg: str) -> str:
         return "Conseil : souvent lié aux cookies. Mettez à jour cookies.txt ou utilisez « Importer depuis Firefox » (onglet Prérequis)."
     if _is_sig_ejs_runtime(error_msg) or error_msg.strip() == SIG_EJS_RUNTIME_MSG:
         return "Conseil : installez Deno (voir onglet Prérequis) et mettez à jour yt-dlp (pip install -U yt-dlp)."
+    if _is_rate_limited_error(error_msg) or error_msg.strip() == RATE_LIMITED_MSG:
+        return "Conseil : patientez quelques minutes, réduisez les téléchargements parallèles ou activez le mode adaptatif."
     return ""
 
 
@@ -93,6 +187,12 @@ class DownloadResult:
     skipped: int
     error: int
     last_error: str = ""
+    # Relances programmées par classe d'erreur (run_download(retry=True)) : {"transient": n, "bot_cookie": n}
+    retries: dict[str, int] = field(default_factory=dict)
+    # Octets lus + écrits évités par le post-traitement en une passe (run_download(single_pass=True))
+    io_saved: int = 0
+    # Emplacements de doublons entre sections remplis par lien / copie (run_download(dedup=True))
+    linked: int = 0
 
 
 def _video_base_key(fn: str | None) -> str | None:
@@ -171,61 +271,220 @@ def _short_display_name(fn: str | None, max_len: int = 55) -> str:
     return name
 
 
-def run_download(
-    urls: list[str],
-    *,
-    progress_callback: Callable[[str, float, str], None] | None = None,
-) -> DownloadResult:
+class _Session:
     """
-    Lance le téléchargement des URLs avec yt-dlp.
-    progress_callback(msg, percent, status) est appelé pour la progression (status = "downloading" | "finished" | "error").
-    Retourne DownloadResult(ok, skipped, error, last_error).
+    État partagé d'un run (compteurs, clés terminées, erreurs) entre les workers.
+    Toutes les mises à jour passent par le verrou : le callback est aussi sérialisé
+    pour que les lignes du journal (GUI / terminal) ne s'entremêlent pas.
     """
-    ensure_windows_path_in_env()
-    ensure_dirs()
-    counters: dict[str, Any] = {"ok": 0, "skipped": 0, "error": 0}
-    last_error: list[str] = []
-    finished_keys: set[str] = set()
-    pending_finished_key: str | None = None
-
-    # Messages utilisateur collectés depuis les logs yt-dlp (bot, cookies invalides, etc.)
-    collected_hints: list[str] = []
-
-    # Logger : compte "déjà en archive" + affiche dans le journal (comme en CLI) + "déjà sur disque" + collecte les erreurs
-    class _ArchiveCounter(logging.Handler):
-        def __init__(self, callback: Callable[[str, float, str], None] | None) -> None:
-            super().__init__()
-            self._callback = callback
-
-        def emit(self, record: logging.LogRecord) -> None:
-            msg = self.format(record)
-            if " has already been recorded in the archive" in msg:
-                counters["skipped"] += 1
-                label = _extract_already_in_archive(msg)
-                if label and self._callback:
-                    display = label if len(label) <= 55 else "..." + label[-52:]
-                    self._callback("⊙ Vidéo déjà en archive : " + display, 0.0, "already_in_archive")
-            friendly = _user_friendly_error(msg)
-            if friendly and friendly != msg and friendly not in collected_hints:
-                collected_hints.append(friendly)
-
-    class _AlreadyOnDiskHandler(logging.Handler):
-        """Affiche « ⊙ Vidéo déjà sur le disque : ... » dans la GUI (comme en CLI)."""
-
-        def __init__(self, callback: Callable[[str, float, str], None] | None) -> None:
-            super().__init__()
-            self._callback = callback
-
-        def emit(self, record: logging.LogRecord) -> None:
-            msg = self.format(record)
-            path = _extract_already_downloaded_path(msg)
-            if path and self._callback:
-                self._callback(
-                    "⊙ Vidéo déjà sur le disque : " + _short_display_name(path),
-                    0.0,
-                    "already_on_disk",
-                )
 
+    def __init__(
+        self,
+        progress_callback: Callable[[str, float, str], None] | None,
+        cancel_event: threading.Event | None = None,
+        limiter: RateLimiter | None = None,
+        priorities: dict[str, float] | None = None,
+    ) -> None:
+        self.callback = progress_callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.limiter = limiter
+        # Poids (priorité de débit) par URL demandée : s'applique à toutes les vidéos de la section
+        self.priorities = priorities or {}
+        # Contrôleur AIMD (run_download(adaptive=True)) : créneaux de jobs, alimenté en octets et en signaux
+        self.controller: AdaptiveConcurrency | None = None
+        # Réglage automatique fragments / blocs (run_download(auto_tune=True))
+        self.tuner: FragmentTuner | None = None
+        # Flux vidéo et audio d'un format fusionné téléchargés en parallèle (run_download(parallel_components=True))
+        self.parallel_components = False
+        # File de jobs persistante (run_download(resume=True)) : état de chaque vidéo, reprise après arrêt
+        self.store: JobStore | None = None
+        # Relances par classe d'erreur (run_download(retry=True))
+        self.retry: RetryScheduler | None = None
+        # Pool de post-traitement (run_download(postprocess_workers=N)) : vidéo comptée terminée après fusion
+        self.postproc: PostProcessPool | None = None
+        # Fusion + métadonnées + miniature en un seul ffmpeg (run_download(single_pass=True))
+        self.single_pass = False
+        self.io_saved = 0
+        # Format fusionné lu et multiplexé directement par ffmpeg (run_download(stream_remux=True))
+        self.stream_remux = False
+        # Dossier de travail local (run_download(scratch_dir=…)) : fichiers finis déplacés en arrière-plan
+        self.mover: FileMover | None = None
+        # Dédoublonnage inter-sections (run_download(dedup=True)) : doublons liés en fin de run
+        self.links: LinkPlanner | None = None
+        self.counters: dict[str, Any] = {"ok": 0, "skipped": 0, "error": 0}
+        self.finished_keys: set[str] = set()
+        self.last_error: list[str] = []
+        # Messages utilisateur collectés depuis les logs yt-dlp (bot, cookies invalides, etc.)
+        self.collected_hints: list[str] = []
+        self.lock = threading.RLock()
+        self._local = threading.local()
+
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancel(self) -> None:
+        """Lève DownloadCancelled (interrompt yt-dlp depuis le progress hook) si l'annulation est demandée."""
+        if self.cancel_event.is_set():
+            raise yt_dlp.utils.DownloadCancelled("Téléchargement annulé")
+
+    def job_weight(self, job: VideoJob) -> float:
+        return self.priorities.get(job.section_url) or self.priorities.get(job.url) or 1.0
+
+    @property
+    def counts_bytes(self) -> bool:
+        return self.controller is not None
+
+    def record_bytes(self, nbytes: int) -> None:
+        if self.controller is not None:
+            self.controller.record_bytes(nbytes)
+
+    def throttle_signal(self, reason: str) -> None:
+        if self.controller is not None:
+            self.controller.on_signal(reason)
+
+    def acquire_slot(self) -> bool:
+        """Créneau de job du contrôleur adaptatif (toujours accordé sans contrôleur) ; False si annulé."""
+        return self.controller.acquire() if self.controller is not None else not self.cancelled()
+
+    def release_slot(self) -> None:
+        if self.controller is not None:
+            self.controller.release()
+
+    def emit(self, msg: str, percent: float, status: str) -> None:
+        if self.callback:
+            with self.lock:
+                self.callback(msg, percent, status)
+
+    def video_done(self, key: str, fn: str) -> None:
+        """Compte une fois la vidéo (clé) comme terminée et affiche « ✔ Vidéo terminée »."""
+        with self.lock:
+            if key in self.finished_keys:
+                return
+            self.finished_keys.add(key)
+            self.counters["ok"] += 1
+            self.emit("✔ Vidéo terminée : " + _short_display_name(fn), 100.0, "video_done")
+
+    def skipped(self, count: int = 1) -> None:
+        with self.lock:
+            self.counters["skipped"] += count
+
+    def record_io_saved(self, fn: str, nbytes: int) -> None:
+        """E/S évitées par le post-traitement en une passe pour une vidéo (cumul dans DownloadResult.io_saved)."""
+        with self.lock:
+            self.io_saved += nbytes
+        self.emit(f"⚡ Une passe : {nbytes / (1024 * 1024):.1f} Mo d'E/S évités — {_short_display_name(fn)}", 100.0, "io_saved")
+
+    def record_final(self, info: dict[str, Any], path: str) -> None:
+        """
+        Fichier final d'une vidéo (dans OUTPUT_DIR une fois déplacé) : noté dans FILES_INDEX pour le
+        rapprochement de l'archive, et pour lier ses doublons en fin de run.
+        """
+        final = self.mover.final_path(path) if self.mover is not None else None
+        if info.get("id"):
+            try:
+                record_file(info["id"], final or path)
+            except OSError:
+                pass
+        if self.links is not None:
+            self.links.record(info, final or path)
+
+    def error(self, message: str) -> None:
+        with self.lock:
+            self.counters["error"] += 1
+            self.last_error.append(message)
+            self._local.job_error_counted = True
+        self.emit(message, -1.0, "error")
+
+    def hint(self, friendly: str) -> None:
+        with self.lock:
+            if friendly not in self.collected_hints:
+                self.collected_hints.append(friendly)
+
+    def job_failed(self, job: VideoJob | None, message: str) -> str:
+        """Échec d'un job : relance programmée ("retry", pas encore compté) ou échec compté (ERROR)."""
+        if self.retry is not None and job is not None and self.retry.schedule(job, classify_error(message), message):
+            return "retry"
+        self.error(message)
+        return ERROR
+
+    # Erreurs par job : yt-dlp (ignoreerrors) logue l'erreur dans le thread du job sans lever d'exception
+    def begin_job(self) -> None:
+        self._local.job_errors = []
+        self._local.job_error_counted = False
+
+    def note_log_error(self, message: str) -> None:
+        errors = getattr(self._local, "job_errors", None)
+        if errors is not None:
+            errors.append(message)
+
+    def end_job(self) -> list[str]:
+        """Retourne les erreurs loguées pendant le job (vide si aucun) ; ne les compte pas deux fois."""
+        errors = getattr(self._local, "job_errors", None) or []
+        counted = getattr(self._local, "job_error_counted", False)
+        self._local.job_errors = None
+        return [] if counted else errors
+
+    def result(self) -> DownloadResult:
+        # Message d'erreur utilisateur : priorité aux hints collectés (bot, cookies, etc.), sinon last_error normalisé
+        raw_error = self.last_error[-1] if self.last_error else ""
+        display_error = (self.collected_hints[0] if self.collected_hints else "") or _user_friendly_error(raw_error) or raw_error
+        return DownloadResult(
+            ok=self.counters["ok"],
+            skipped=self.counters["skipped"],
+            error=self.counters["error"],
+            last_error=display_error,
+            retries=dict(self.retry.retries) if self.retry is not None else {},
+            io_saved=self.io_saved,
+            linked=(self.links.linked + self.links.copied) if self.links is not None else 0,
+        )
+
+
+class _ArchiveCounter(logging.Handler):
+    """
+    Affiche « déjà en archive » dans le journal (comme en CLI) + collecte les erreurs. Le comptage se fait
+    au pré-filtre des jobs et dans _SessionYoutubeDL.in_download_archive, pas d'après ce message.
+    """
+
+    def __init__(self, session: _Session) -> None:
+        super().__init__()
+        self._session = session
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg = self.format(record)
+        if " has already been recorded in the archive" in msg:
+            label = _extract_already_in_archive(msg)
+            if label:
+                display = label if len(label) <= 55 else "..." + label[-52:]
+                self._session.emit("⊙ Vidéo déjà en archive : " + display, 0.0, "already_in_archive")
+        friendly = _user_friendly_error(msg)
+        if friendly and friendly != msg:
+            self._session.hint(friendly)
+        if _is_throttle_signal(msg):
+            self._session.throttle_signal(friendly)
+        if record.levelno >= logging.ERROR:
+            self._session.note_log_error(msg)
+
+
+class _AlreadyOnDiskHandler(logging.Handler):
+    """Affiche « ⊙ Vidéo déjà sur le disque : ... » dans la GUI (comme en CLI)."""
+
+    def __init__(self, session: _Session) -> None:
+        super().__init__()
+        self._session = session
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg = self.format(record)
+        path = _extract_already_downloaded_path(msg)
+        if path:
+            self._session.emit(
+                "⊙ Vidéo déjà sur le disque : " + _short_display_name(path),
+                0.0,
+                "already_on_disk",
+            )
+
+
+def _session_logger(session: _Session) -> logging.Logger:
+    """Logger yt-dlp de la session : fichier yt_session.log + handlers archive / déjà sur disque."""
     file_logger = logging.getLogger("yt_dlp_gui")
     file_logger.setLevel(logging.DEBUG)
     file_logger.handlers.clear()
@@ -235,11 +494,105 @@ def run_download(
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(logging.Formatter("%(message)s"))
     file_logger.addHandler(fh)
-    file_logger.addHandler(_ArchiveCounter(progress_callback))
-    file_logger.addHandler(_AlreadyOnDiskHandler(progress_callback))
+    file_logger.addHandler(_ArchiveCounter(session))
+    file_logger.addHandler(_AlreadyOnDiskHandler(session))
+    return file_logger
+
+
+class _ProgressTracker:
+    """
+    progress_hook yt-dlp d'un worker : regroupe fragments audio/vidéo + merge en une seule
+    « ✔ Vidéo terminée ». L'état « pending » est propre au worker (une instance YoutubeDL).
+    Avec session.parallel_components, les deux flux appellent le hook depuis deux threads :
+    l'état est sous verrou et la progression affichée est celle des deux flux cumulés.
+    """
+
+    def __init__(self, session: _Session) -> None:
+        self._session = session
+        self._lock = threading.Lock()
+        self.pending_finished_key: str | None = None
+        # downloaded_bytes déjà vus par fichier : le limiteur de débit consomme les écarts
+        self._seen_bytes: dict[str, int] = {}
+        # Flux de la vidéo en cours (fichier .fNNN → octets reçus, total) pour le pourcentage cumulé
+        self._components: dict[str, tuple[int, int]] = {}
+        # Job en cours (file persistante) et octets reçus pour ce job
+        self._job: VideoJob | None = None
+        self.job_bytes = 0
+
+    def begin_job(self, weight: float, job: VideoJob | None = None) -> None:
+        self._job = job if self._session.store is not None else None
+        self.job_bytes = 0
+        if self._session.limiter is not None:
+            self._session.limiter.begin_job(self, weight)
 
-    def progress_hook(d: dict[str, Any]) -> None:
-        nonlocal pending_finished_key
+    def end_job(self) -> None:
+        with self._lock:
+            self._seen_bytes.clear()
+            self._components.clear()
+        if self._session.limiter is not None:
+            self._session.limiter.end_job(self)
+
+    def _account_bytes(self, fn: str, d: dict[str, Any]) -> None:
+        """
+        Octets reçus depuis le dernier appel : octets du job (file persistante), débit mesuré pour le
+        contrôleur adaptatif, puis limiteur global (attente si le seau est vide).
+        """
+        session = self._session
+        limiter = session.limiter
+        downloaded = d.get("downloaded_bytes")
+        if downloaded is None or (limiter is None and not session.counts_bytes and self._job is None):
+            return
+        with self._lock:
+            previous = self._seen_bytes.get(fn)
+            self._seen_bytes[fn] = downloaded
+            if previous is None:
+                # Premier appel (éventuellement reprise d'un .part) : octets du job, pas encore de débit
+                self.job_bytes += downloaded
+            elif downloaded > previous:
+                self.job_bytes += downloaded - previous
+            job_bytes = self.job_bytes
+        if self._job is not None and session.store is not None:
+            session.store.progress(self._job, job_bytes)
+        if previous is None or downloaded <= previous:
+            return
+        session.record_bytes(downloaded - previous)
+        if limiter is None:
+            return
+        delay = limiter.consume(self, downloaded - previous, _short_display_name(fn, 30))
+        if limiter.report_due():
+            session.emit(limiter.summary(), 0.0, "rate")
+        if delay > 0:
+            # Attente interrompue dès l'annulation
+            session.cancel_event.wait(delay)
+            session.check_cancel()
+
+    def flush(self) -> None:
+        """Fin de job : la vidéo en attente (un seul fragment reçu) est comptée terminée."""
+        if self._session.postproc is not None:
+            # Comptée par le pool de post-traitement, une fois la fusion réussie
+            self.pending_finished_key = None
+        elif self.pending_finished_key is not None:
+            self._session.video_done(self.pending_finished_key, self.pending_finished_key)
+            self.pending_finished_key = None
+
+    def _combined_percent(self, fn: str, key: str | None, d: dict[str, Any], pct: float) -> tuple[float, str]:
+        """Flux parallèles : pourcentage sur le total des flux de la vidéo (appelé sous self._lock)."""
+        total = d.get("total_bytes") or d.get("total_bytes_estimate")
+        downloaded = d.get("downloaded_bytes")
+        if not total or downloaded is None:
+            return pct, fn
+        if any(_video_base_key(other) != key for other in self._components):
+            self._components.clear()
+        self._components[fn] = (downloaded, total)
+        if len(self._components) < 2:
+            return pct, fn
+        done = sum(c[0] for c in self._components.values())
+        size = sum(c[1] for c in self._components.values())
+        return min(100.0, 100.0 * done / size), f"{key} ({len(self._components)} flux)"
+
+    def __call__(self, d: dict[str, Any]) -> None:
+        session = self._session
+        session.check_cancel()
         status = d.get("status")
         fn = d.get("filename", "?")
         key = _video_base_key(fn)
@@ -260,102 +613,747 @@ def run_download(
             pct = 0.0
 
         if status == "downloading":
-            if pending_finished_key is not None and key != pending_finished_key:
-                if pending_finished_key not in finished_keys:
-                    finished_keys.add(pending_finished_key)
-                    counters["ok"] += 1
-                    if progress_callback:
-                        progress_callback(
-                            "✔ Vidéo terminée : " + _short_display_name(pending_finished_key),
-                            100.0,
-                            "video_done",
-                        )
-                pending_finished_key = None
-            if progress_callback:
-                percent_str = f"{pct:.1f}%"
-                msg = f"  {percent_str} — {fn}"
-                progress_callback(msg, pct, "downloading")
+            with self._lock:
+                if self.pending_finished_key is not None and key != self.pending_finished_key:
+                    session.video_done(self.pending_finished_key, self.pending_finished_key)
+                    self.pending_finished_key = None
+                label = fn
+                if session.parallel_components and _is_fragment_path(fn):
+                    pct, label = self._combined_percent(fn, key, d, pct)
+            percent_str = f"{pct:.1f}%"
+            session.emit(f"  {percent_str} — {label}", pct, "downloading")
+            self._account_bytes(fn, d)
 
         elif status == "finished":
-            if key is None or key in finished_keys:
-                return
-            if not _is_video_output_path(fn):
-                return
-            if _is_fragment_path(fn):
-                if pending_finished_key == key:
-                    finished_keys.add(key)
-                    counters["ok"] += 1
-                    if progress_callback:
-                        progress_callback(
-                            "✔ Vidéo terminée : " + _short_display_name(fn),
-                            100.0,
-                            "video_done",
-                        )
-                    pending_finished_key = None
-                else:
-                    pending_finished_key = key
-            else:
-                # Fichier final (.mp4 etc.) : si pending a la même clé, c'est le fragment de cette vidéo → ne compter qu'une fois
-                if pending_finished_key is not None:
-                    if pending_finished_key == key:
-                        # Même vidéo (fragment audio/vidéo + merge) : ne pas compter le pending, seulement le fichier final
-                        pending_finished_key = None
-                    else:
-                        if pending_finished_key not in finished_keys:
-                            finished_keys.add(pending_finished_key)
-                            counters["ok"] += 1
-                            if progress_callback:
-                                progress_callback(
-                                    "✔ Vidéo terminée : " + _short_display_name(pending_finished_key),
-                                    100.0,
-                                    "video_done",
-                                )
-                        pending_finished_key = None
-                finished_keys.add(key)
-                counters["ok"] += 1
-                if progress_callback:
-                    progress_callback(
-                        "✔ Vidéo terminée : " + _short_display_name(fn),
-                        100.0,
-                        "video_done",
-                    )
-            if progress_callback:
-                progress_callback(fn, 100.0, "finished")
+            with self._lock:
+                self._seen_bytes.pop(fn, None)
+            if session.tuner is not None:
+                session.tuner.observe(d)
+            with self._lock:
+                self._on_finished(fn, key)
 
         elif status == "error":
-            counters["error"] += 1
-            last_error.append(str(d.get("message", fn)))
-            if progress_callback:
-                progress_callback(str(d.get("message", fn)), -1.0, "error")
+            session.error(str(d.get("message", fn)))
+
+    def _on_finished(self, fn: str, key: str | None) -> None:
+        """Fichier terminé : fragment en attente de son jumeau, ou vidéo terminée (appelé sous self._lock)."""
+        session = self._session
+        if key is None or key in session.finished_keys:
+            return
+        if not _is_video_output_path(fn):
+            return
+        if session.postproc is not None:
+            # « ✔ Vidéo terminée » seulement après le post-traitement (PostProcessPool)
+            session.emit(fn, 100.0, "finished")
+            return
+        if _is_fragment_path(fn):
+            if self.pending_finished_key == key:
+                session.video_done(key, fn)
+                self.pending_finished_key = None
+            else:
+                self.pending_finished_key = key
+        else:
+            # Fichier final (.mp4 etc.) : si pending a la même clé, c'est le fragment de cette vidéo → ne compter qu'une fois
+            if self.pending_finished_key is not None:
+                if self.pending_finished_key == key:
+                    # Même vidéo (fragment audio/vidéo + merge) : ne pas compter le pending, seulement le fichier final
+                    self.pending_finished_key = None
+                else:
+                    session.video_done(self.pending_finished_key, self.pending_finished_key)
+                    self.pending_finished_key = None
+            session.video_done(key, fn)
+        session.emit(fn, 100.0, "finished")
+
+
+def _execute_job(
+    session: _Session,
+    tracker: _ProgressTracker,
+    action: Callable[[], Any],
+    weight: float = 1.0,
+    job: VideoJob | None = None,
+) -> tuple[str, str]:
+    """
+    Exécute un job (une vidéo) dans le thread courant et en tire le bilan : vidéo terminée,
+    erreur (loguée par yt-dlp ou exception), ou rien si le run est annulé.
+    weight : priorité du job dans le partage du débit (limiteur global).
+    job : ligne de la file persistante mise à jour (session.store) ; retourne (état, dernière erreur),
+    état = "done" | "error" | "retry" (relance programmée, session.retry) | "cancelled".
+    """
+    if session.cancelled():
+        return "cancelled", ""
+    store = session.store if job is not None else None
+    if store is not None:
+        store.claim(job)  # type: ignore[arg-type]
+    session.begin_job()
+    tracker.begin_job(weight, job)
+    try:
+        action()
+    except yt_dlp.utils.DownloadCancelled:
+        pass
+    except Exception as e:
+        session.note_log_error(str(e))
+    finally:
+        tracker.end_job()
+    errors = session.end_job()
+    if session.cancelled():
+        tracker.pending_finished_key = None
+        outcome = "cancelled", ""
+    elif errors:
+        # Vidéo en échec : ne pas la compter comme terminée au prochain job de ce worker
+        tracker.pending_finished_key = None
+        outcome = session.job_failed(job, errors[-1]), errors[-1]
+    else:
+        tracker.flush()
+        outcome = DONE, ""
+    if store is not None:
+        _record_outcome(store, job, outcome, tracker.job_bytes)  # type: ignore[arg-type]
+    return outcome
 
+
+def _record_outcome(store: JobStore, job: VideoJob, outcome: tuple[str, str], bytes_done: int | None = None) -> None:
+    """Bilan d'un job dans la file persistante (annulé = de nouveau en attente, relance = en échec repris)."""
+    state, error = outcome
+    if state == "cancelled":
+        store.release(job)
+    else:
+        store.finish(job, ERROR if state == "retry" else state, error, bytes_done)
+
+
+def _base_ydl_opts(file_logger: logging.Logger, tracker: _ProgressTracker) -> dict[str, Any]:
+    """Options yt-dlp communes (identiques en séquentiel et pour chaque worker)."""
     ydl_opts: dict[str, Any] = {
         "outtmpl": (OUTPUT_DIR / OUTPUT_TEMPLATE).as_posix(),
         "remote_components": REMOTE_COMPONENTS,
-        "progress_hooks": [progress_hook],
+        "progress_hooks": [tracker],
         "yes_playlist": True,
         "ignoreerrors": True,
         "continuedl": True,
-        "download_archive": str(ARCHIVE_FILE),
-        "embed_metadata": True,
-        "embed_thumbnail": True,
+        # Index partagé (appartenance en O(1), ajouts en fin de fichier) au lieu du chemin relu par chaque instance
+        "download_archive": get_archive(),
         "merge_output_format": "mp4",
         "quiet": True,
         "logger": file_logger,
     }
+    if _ffmpeg_found():
+        # Métadonnées (titre, date, description, chapitres, URL) et miniature intégrées, comme --embed-metadata /
+        # --embed-thumbnail : les clés embed_* ne sont lues que par la ligne de commande yt-dlp
+        ydl_opts["writethumbnail"] = True
+        ydl_opts["postprocessors"] = [
+            {"key": "FFmpegMetadata", "add_metadata": True, "add_chapters": True},
+            {"key": "EmbedThumbnail", "already_have_thumbnail": False},
+        ]
     cookiefile_path = get_cookiefile_path()
     if cookiefile_path:
         ydl_opts["cookiefile"] = cookiefile_path
+    return ydl_opts
+
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download(urls)
+@functools.cache
+def _ffmpeg_found() -> bool:
+    """ffmpeg présent (PATH) : sans lui, métadonnées et miniature feraient échouer chaque vidéo."""
+    return ffmpeg_available(None)
 
-    # Message d'erreur utilisateur : priorité aux hints collectés (bot, cookies, etc.), sinon last_error normalisé
-    raw_error = last_error[-1] if last_error else ""
-    display_error = (collected_hints[0] if collected_hints else "") or _user_friendly_error(raw_error) or raw_error
 
-    return DownloadResult(
-        ok=counters["ok"],
-        skipped=counters["skipped"],
-        error=counters["error"],
-        last_error=display_error,
+class _ComponentDownload(threading.Thread):
+    """Transfert d'un flux (vidéo ou audio) d'un format fusionné, en arrière-plan : résultat ou exception."""
+
+    def __init__(self, download: Callable[[], Any], name: str) -> None:
+        super().__init__(name=name, daemon=True)
+        self._download = download
+        self.outcome: Any = None
+        self.exception: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            self.outcome = self._download()
+        except BaseException as e:
+            self.exception = e
+
+
+class _SessionYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    YoutubeDL d'un worker, relié à la session : réglage des fragments par format au moment du téléchargement,
+    flux vidéo / audio d'un format fusionné lancés ensemble (session.parallel_components) puis attendus
+    avant le post-traitement, donc avant la fusion, post-traitement confié au pool (session.postproc) et
+    fusion / métadonnées / miniature en une passe (session.single_pass), et remux en flux sans fichiers
+    .fNNN (session.stream_remux), avec repli sur le téléchargement des flux sur disque. Avec session.mover,
+    tout s'écrit dans le dossier de travail et seul le fichier final part vers OUTPUT_DIR.
+    """
+
+    def __init__(self, params: dict[str, Any], session: _Session) -> None:
+        if session.mover is not None:
+            params = {**params, "outtmpl": (session.mover.scratch / OUTPUT_TEMPLATE).as_posix()}
+        super().__init__(params)
+        if self.params.get("writethumbnail"):
+            # Comme --embed-thumbnail : miniature des vidéos seulement, pas celle de la playlist
+            self.params["outtmpl"].setdefault("pl_thumbnail", "")
+        self._session = session
+        # Une passe : seulement pour les FFmpegMetadata / EmbedThumbnail configurés (postprocessors)
+        self._single_pass = session.single_pass and ffmpeg_available(self) and bool(detach_embed_pps(self))
+        self._stream_remux = session.stream_remux and ffmpeg_available(self)
+        self._components: list[_ComponentDownload] = []
+        # Archive différée (pool de post-traitement) : l'enregistrement normal de yt-dlp est sauté une fois
+        self._pp_archive_ids: set[str] = set()
+
+    def dl(self, name: str, info: dict[str, Any], subtitle: bool = False, test: bool = False) -> Any:
+        if self._stream_remux and not subtitle and not test and info.get("requested_formats"):
+            return self._dl_streamed(name, info)
+        tuner = self._session.tuner
+        if tuner is not None and not subtitle and not test and info.get("url"):
+            choice = tuner.choose(info)
+            # Instance propre au worker : réglage valable pour ce format seulement (les deux flux
+            # parallèles d'une vidéo sont de même protocole et même hôte, donc même réglage)
+            self.params["concurrent_fragment_downloads"] = choice.fragments
+            info["downloader_options"] = {**(info.get("downloader_options") or {}), "http_chunk_size": choice.chunk_size}
+        if self._session.parallel_components and not subtitle and not test and self._is_component(name, info):
+            # Flux .fNNN d'un format fusionné : yt-dlp passe au flux suivant sans attendre, la fusion attend les deux
+            parent_dl = super().dl
+            component = _ComponentDownload(lambda: parent_dl(name, info), f"{threading.current_thread().name}-f{info['format_id']}")
+            self._components.append(component)
+            component.start()
+            return True, True
+        return super().dl(name, info, subtitle=subtitle, test=test)
+
+    def _dl_streamed(self, name: str, info: dict[str, Any]) -> tuple[bool, bool]:
+        """Format fusionné en un seul ffmpeg ; s'il échoue, flux téléchargés puis fusionnés comme d'habitude."""
+        try:
+            stream_remux(self, name, info, self._session.cancel_event)
+            return True, True
+        except StreamRemuxError as e:
+            self.report_warning(f"Remux en flux interrompu ({e}) : téléchargement des flux sur disque")
+        # Repli : même découpage que process_info (fichiers .fNNN puis FFmpegMerger)
+        self.params.pop("external_downloader", None)
+        downloaded: list[str] = []
+        success = True
+        for fmt in info["requested_formats"]:
+            new_info = {k: v for k, v in info.items() if k != "requested_formats"}
+            new_info.update(fmt)
+            fname = yt_dlp.utils.prepend_extension(
+                f"{os.path.splitext(name)[0]}.{new_info['ext']}", f"f{fmt['format_id']}", new_info["ext"]
+            )
+            fmt["filepath"] = fname
+            downloaded.append(fname)
+            partial_success, _real = self.dl(fname, new_info)
+            success = success and partial_success
+        info["__postprocessors"].append(yt_dlp.postprocessor.FFmpegMergerPP(self))
+        info["__files_to_merge"] = downloaded
+        return success, True
+
+    @staticmethod
+    def _is_component(name: str, info: dict[str, Any]) -> bool:
+        """Fichier temporaire d'un flux à fusionner : <nom>.f<format_id>.<ext> (cf. process_info)."""
+        format_id = info.get("format_id")
+        return bool(format_id) and f".f{format_id}." in pathlib.Path(name).name
+
+    def _join_components(self) -> None:
+        """Attend les flux lancés ; annulation relayée telle quelle, échec d'un flux = échec de la vidéo."""
+        components, self._components = self._components, []
+        for component in components:
+            component.join()
+        for component in components:
+            if isinstance(component.exception, yt_dlp.utils.DownloadCancelled):
+                raise component.exception
+        for component in components:
+            if component.exception is not None:
+                raise yt_dlp.utils.PostProcessingError(f"unable to download video data: {component.exception}")
+            if not component.outcome or not component.outcome[0]:
+                raise yt_dlp.utils.PostProcessingError("unable to download video data: flux incomplet")
+
+    def post_process(self, filename: str, info: dict[str, Any], files_to_move: dict[str, Any] | None = None) -> Any:
+        # Fusion (FFmpegMerger dans __postprocessors) seulement une fois les deux flux reçus
+        self._join_components()
+        if self._single_pass:
+            use_single_pass(self, info)
+        mover = self._session.mover
+        if mover is not None and mover.final_path(filename) is None:
+            # Fichier déjà dans OUTPUT_DIR (existing_file) : laissé en place
+            info["__finaldir"] = os.path.dirname(os.path.abspath(filename))
+        pool = self._session.postproc
+        if pool is None:
+            info = super().post_process(filename, info, files_to_move)
+            if info.get("__io_saved"):
+                self._session.record_io_saved(info["filepath"], info.pop("__io_saved"))
+            self._session.record_final(info, info["filepath"])
+            if mover is not None:
+                mover.submit(info["filepath"])
+            return info
+        # Post-traitement confié au pool : le worker enchaîne sur la vidéo suivante
+        session = self._session
+        key = _video_base_key(filename) or filename
+        archive_id = self._make_archive_id(info)
+        # Copie : yt-dlp retire ensuite de info les champs communs à la vidéo (id, extractor_key…)
+        archive_info = dict(info)
+
+        def on_done(ok: bool, detail: str, io_saved: int) -> None:
+            if not ok:
+                session.error(f"Post-traitement : {detail}")
+                return
+            if archive_id:
+                yt_dlp.YoutubeDL.record_download_archive(self, archive_info)
+            if io_saved:
+                session.record_io_saved(detail, io_saved)
+            session.record_final(archive_info, detail)
+            if session.mover is not None:
+                session.mover.submit(detail)
+            session.video_done(key, detail)
+
+        if not pool.submit(self, filename, info, files_to_move, on_done):
+            raise yt_dlp.utils.DownloadCancelled("Téléchargement annulé")
+        if archive_id:
+            self._pp_archive_ids.add(archive_id)
+        info["filepath"] = filename
+        return info
+
+    def existing_file(self, filepaths: Any, *, default_overwrite: bool = True) -> str | None:
+        mover = self._session.mover
+        if mover is not None and not self.params.get("overwrites", default_overwrite):
+            # Vidéo déjà déplacée vers OUTPUT_DIR par un run précédent
+            for path in filepaths:
+                final = mover.final_path(path)
+                if final is not None and final.exists():
+                    return str(final)
+        return super().existing_file(filepaths, default_overwrite=default_overwrite)
+
+    def in_download_archive(self, info_dict: dict[str, Any]) -> bool:
+        # Vidéo écartée par yt-dlp (appelé une fois par entrée ignorée : l'entrée n'est plus traitée ensuite)
+        archived = super().in_download_archive(info_dict)
+        if archived:
+            self._session.skipped()
+        return archived
+
+    def record_download_archive(self, info_dict: dict[str, Any]) -> None:
+        archive_id = self._make_archive_id(info_dict)
+        if archive_id in self._pp_archive_ids:
+            # Enregistré par le pool de post-traitement, seulement si la fusion réussit
+            self._pp_archive_ids.discard(archive_id)
+            return
+        super().record_download_archive(info_dict)
+
+    def process_info(self, info_dict: dict[str, Any]) -> Any:
+        if self._session.mover is not None and not self._session.mover.wait_room():
+            raise yt_dlp.utils.DownloadCancelled("Téléchargement annulé")
+        if self._stream_remux and can_stream(info_dict):
+            # yt-dlp choisit alors FFmpegFD pour le format fusionné : dl() reçoit les flux en un seul appel
+            self.params["external_downloader"] = {"default": "ffmpeg"}
+        try:
+            return super().process_info(info_dict)
+        finally:
+            self.params.pop("external_downloader", None)
+            # Vidéo abandonnée avant le post-traitement : aucun flux ne survit au job
+            components, self._components = self._components, []
+            for component in components:
+                component.join()
+
+
+def _new_ydl(session: _Session, file_logger: logging.Logger, tracker: _ProgressTracker) -> Any:
+    """Instance YoutubeDL de téléchargement (options communes) reliée à la session."""
+    return _SessionYoutubeDL(_base_ydl_opts(file_logger, tracker), session)
+
+
+@dataclass
+class VideoJob:
+    """Une vidéo à télécharger, issue de l'expansion à plat d'une section (onglet / playlist)."""
+    url: str
+    video_id: str | None = None
+    section_url: str = ""
+    # Contexte playlist (playlist, playlist_index…) : même nommage que si yt-dlp parcourait la section
+    extra_info: dict[str, Any] = field(default_factory=dict)
+
+
+def _playlist_extra_info(info: dict[str, Any], index: int, n_entries: int) -> dict[str, Any]:
+    """Champs playlist_* ajoutés par yt-dlp aux entrées d'une playlist (cf. OUTPUT_TEMPLATE)."""
+    return {
+        "playlist_count": info.get("playlist_count") or n_entries,
+        "playlist": info.get("title") or info.get("id"),
+        "playlist_id": info.get("id"),
+        "playlist_title": info.get("title"),
+        "playlist_uploader": info.get("uploader"),
+        "playlist_uploader_id": info.get("uploader_id"),
+        "playlist_channel": info.get("channel"),
+        "playlist_channel_id": info.get("channel_id"),
+        "playlist_webpage_url": info.get("webpage_url"),
+        "n_entries": n_entries,
+        "playlist_index": index,
+        "playlist_autonumber": index,
+    }
+
+
+def _entry_url(entry: dict[str, Any]) -> str | None:
+    """URL d'une entrée à plat (url, sinon id → URL watch)."""
+    url = entry.get("url") or entry.get("webpage_url")
+    if isinstance(url, str) and url.startswith("http"):
+        return url
+    video_id = entry.get("id") or url
+    if not video_id:
+        return None
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def expand_jobs(urls: list[str], file_logger: logging.Logger | None = None) -> list[VideoJob]:
+    """
+    Expansion à plat des sections sélectionnées : une VideoJob par vidéo, dans l'ordre des sections.
+    Une URL de vidéo seule donne une VideoJob sans contexte playlist.
+    """
+    opts: dict[str, Any] = {
+        "extract_flat": "entries",
+        "quiet": True,
+        "no_warnings": True,
+        "remote_components": REMOTE_COMPONENTS,
+    }
+    if file_logger is not None:
+        opts["logger"] = file_logger
+    cookiefile_path = get_cookiefile_path()
+    if cookiefile_path:
+        opts["cookiefile"] = cookiefile_path
+
+    jobs: list[VideoJob] = []
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        for url in urls:
+            try:
+                info = ydl.extract_info(url, download=False, process=False)
+            except Exception:
+                info = None
+            entries = info.get("entries") if info else None
+            if entries is None:
+                jobs.append(VideoJob(url=url, video_id=(info or {}).get("id"), section_url=url))
+                continue
+            entries = [e for e in entries if e and isinstance(e, dict)]
+            for i, entry in enumerate(entries, start=1):
+                entry_url = _entry_url(entry)
+                if not entry_url:
+                    continue
+                jobs.append(
+                    VideoJob(
+                        url=entry_url,
+                        video_id=entry.get("id"),
+                        section_url=url,
+                        extra_info=_playlist_extra_info(info, i, len(entries)),
+                    )
+                )
+    return jobs
+
+
+def _session_jobs(urls: list[str], session: _Session, file_logger: logging.Logger) -> list[VideoJob]:
+    """
+    Jobs du run : expansion à plat, ou, avec la file persistante, les vidéos restantes des sections
+    interrompues (sans nouvelle extraction de la section) ; les autres sections sont expansées et enregistrées.
+    """
+    store = session.store
+    if store is None:
+        return _dedup(_skip_archived(expand_jobs(urls, file_logger), session), session)
+    recovered = store.recover(urls)
+    if recovered:
+        file_logger.info("File de jobs : %d job(s) interrompu(s) remis en attente", recovered)
+    resumed = {url: store.unfinished(url) for url in urls}
+    to_expand = [url for url in urls if not resumed[url]]
+    expanded: dict[str, list[VideoJob]] = {url: [] for url in to_expand}
+    for job in expand_jobs(to_expand, file_logger) if to_expand else []:
+        expanded[job.section_url].append(job)
+    jobs: list[VideoJob] = []
+    for url in urls:
+        if resumed[url]:
+            session.emit(f"Reprise : {len(resumed[url])} vidéo(s) restante(s) — {url}", 0.0, "info")
+            jobs.extend(resumed[url])
+        else:
+            store.replace_section(url, expanded[url])
+            jobs.extend(expanded[url])
+    return _dedup(_skip_archived(jobs, session), session)
+
+
+def _skip_archived(jobs: list[VideoJob], session: _Session) -> list[VideoJob]:
+    """
+    Pré-filtre : vidéos dont l'ID est dans archive.txt écartées avant d'être confiées à YoutubeDL
+    (aucune extraction), comptées « déjà en archive ». Avant le dédoublonnage : une vidéo en archive
+    présente dans plusieurs sections ne reçoit pas de lien dans les autres (signalé dans le journal).
+    """
+    index = get_archive()
+    if not len(index):
+        return jobs
+    kept: list[VideoJob] = []
+    archived = 0
+    archived_ids: set[str] = set()
+    shared: set[str] = set()
+    for job in jobs:
+        if job.video_id and is_youtube_video_url(job.url) and index.has_video(job.video_id):
+            archived += 1
+            if job.video_id in archived_ids:
+                shared.add(job.video_id)
+            archived_ids.add(job.video_id)
+            if session.store is not None:
+                session.store.finish(job, DONE, "")
+            continue
+        kept.append(job)
+    if archived:
+        session.skipped(archived)
+        session.emit(f"⊙ {archived} vidéo(s) déjà en archive, écartée(s) avant extraction", 0.0, "already_in_archive")
+    if shared and session.links is not None:
+        # Liens créés d'après le fichier téléchargé pendant le run : rien à lier pour une vidéo déjà en archive
+        session.emit(
+            f"⊙ {len(shared)} vidéo(s) en archive présente(s) dans plusieurs sections : autres emplacements non liés",
+            0.0,
+            "info",
+        )
+    return kept
+
+
+def _dedup(jobs: list[VideoJob], session: _Session) -> list[VideoJob]:
+    """Une vidéo présente dans plusieurs sections n'est téléchargée qu'une fois (session.links)."""
+    if session.links is None:
+        return jobs
+    kept, duplicates = dedup_jobs(jobs)
+    if not duplicates:
+        return jobs
+    n_duplicates = len(jobs) - len(kept)
+    session.links.duplicates.update(duplicates)
+    if session.store is not None:
+        # Doublons terminés d'emblée dans la file : un run repris ne les télécharge pas non plus
+        for dups in duplicates.values():
+            for job in dups:
+                session.store.finish(job, DONE, "")
+    session.emit(
+        f"Dédoublonnage : {n_duplicates} doublon(s) entre sections ({len(duplicates)} vidéo(s)), liés en fin de run.",
+        0.0,
+        "info",
     )
+    return kept
+
+
+def _run_parallel(
+    urls: list[str],
+    session: _Session,
+    file_logger: logging.Logger,
+    max_workers: int,
+) -> None:
+    """Expansion à plat (archive pré-filtrée) puis N instances YoutubeDL indépendantes (une par worker) sur les vidéos."""
+    jobs = _session_jobs(urls, session, file_logger)
+    if max_workers > 1:
+        session.emit(f"{len(jobs)} vidéo(s) à traiter — {max_workers} téléchargement(s) en parallèle.", 0.0, "info")
+    else:
+        session.emit(f"{len(jobs)} vidéo(s) à traiter.", 0.0, "info")
+
+    local = threading.local()
+    instances: list[Any] = []
+    instances_lock = threading.Lock()
+
+    def worker_ydl() -> tuple[Any, _ProgressTracker]:
+        generation = session.retry.cookie_generation if session.retry is not None else 0
+        if getattr(local, "ydl", None) is not None and local.generation != generation:
+            # Cookies modifiés depuis la création de l'instance : nouvelle instance (nouveau cookiefile)
+            local.ydl = None
+        if getattr(local, "ydl", None) is None:
+            tracker = _ProgressTracker(session)
+            ydl = _new_ydl(session, file_logger, tracker)
+            local.ydl, local.tracker, local.generation = ydl, tracker, generation
+            with instances_lock:
+                instances.append(ydl)
+        return local.ydl, local.tracker
+
+    def run_job(job: VideoJob) -> None:
+        if not session.acquire_slot():
+            return
+        try:
+            ydl, tracker = worker_ydl()
+            _execute_job(
+                session,
+                tracker,
+                lambda: ydl.extract_info(job.url, download=True, extra_info=dict(job.extra_info)),
+                weight=session.job_weight(job),
+                job=job,
+            )
+        finally:
+            session.release_slot()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yt-dl") as pool:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            if session.retry is None:
+                for future in futures:
+                    future.result()
+            else:
+                # Relances soumises dès qu'elles sont dues, en parallèle des vidéos restantes
+                running = set(futures)
+                while running or session.retry.pending():
+                    done, running = wait(running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                    running |= {pool.submit(run_job, job) for job in session.retry.due(idle=not running)}
+    finally:
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+
+def run_download(
+    urls: list[str],
+    *,
+    progress_callback: Callable[[str, float, str], None] | None = None,
+    max_workers: int = 1,
+    extract_workers: int = 0,
+    queue_depth: int = 4,
+    backend: str = "thread",
+    cancel_event: threading.Event | None = None,
+    rate_limit: float | RateLimiter | None = None,
+    priorities: dict[str, float] | None = None,
+    adaptive: bool = False,
+    auto_tune: bool = False,
+    parallel_components: bool = False,
+    resume: bool = False,
+    retry: bool = False,
+    postprocess_workers: int = 0,
+    single_pass: bool = False,
+    stream_remux: bool = False,
+    scratch_dir: str | pathlib.Path | None = None,
+    dedup: bool = False,
+) -> DownloadResult:
+    """
+    Lance le téléchargement des URLs avec yt-dlp.
+    progress_callback(msg, percent, status) est appelé pour la progression (status = "downloading" | "finished" | "error").
+    max_workers > 1 : les sections sont expansées à plat et les vidéos réparties sur max_workers
+    instances YoutubeDL en parallèle (1 = une seule instance, vidéo par vidéo) ; les vidéos déjà archivées sont
+    écartées d'après les IDs de l'expansion, avant tout appel à yt-dlp.
+    extract_workers > 0 : pipeline à deux étages (extract_workers extractions → file de queue_depth
+    infos résolues → max_workers téléchargements) ; occupation / attentes en status "pipeline_stats".
+    backend="process" : chaque job YoutubeDL tourne dans un processus worker (max_workers processus),
+    la progression revient par une file IPC vers le même progress_callback.
+    cancel_event : une fois positionné, les téléchargements en cours sont interrompus et les jobs
+    restants ignorés ; le résultat partiel est retourné.
+    rate_limit : débit global en octets/s partagé par tous les téléchargements du run, ou un RateLimiter
+    (modifiable en cours de route via set_rate, partageable entre processus) ; priorities : poids par URL
+    demandée (part du débit). Débits effectifs (total et par job) en status "rate".
+    adaptive=True : max_workers devient un plafond ; le contrôleur AIMD part d'un job, en ajoute tant que
+    le débit agrégé progresse et divise par deux (avec pause) sur bot-check / HTTP 429 ; décisions dans
+    logs/yt_session.log et en status "concurrency" quand la limite change.
+    auto_tune=True : fragments parallèles (DASH/HLS) et taille des blocs HTTP choisis par format d'après
+    le débit par connexion mesuré, mémorisé par classe d'hôte dans fragment_stats.json ; choix et
+    mesures dans logs/yt_session.log.
+    parallel_components=True : les flux vidéo et audio d'un format fusionné (.fNNN) sont téléchargés en
+    même temps, la progression affichée est celle des deux flux cumulés et la fusion démarre dès que
+    les deux sont reçus.
+    resume=True : file de jobs persistante (jobs.sqlite3, une ligne par vidéo : état, tentatives, octets
+    reçus, dernière erreur) ; après un crash ou une fermeture, les sections interrompues reprennent aux
+    vidéos restantes sans nouvelle extraction.
+    retry=True : chaque échec est classé (classify_error) ; transitoire → nouvelle tentative avec backoff
+    exponentiel et jitter, bot / cookies → attente d'un changement de cookies.txt / cookies.enc, permanent →
+    échec compté aussitôt. Relances par classe dans DownloadResult.retries (backends thread et pipeline).
+    postprocess_workers > 0 : fusion / fixups / déplacement final dans un pool de processus dédié ; le worker
+    passe à la vidéo suivante sans attendre. « ✔ Vidéo terminée » et l'entrée d'archive n'arrivent qu'après
+    un post-traitement réussi ; run_download attend la fin du pool (backends thread et pipeline).
+    single_pass=True : fusion, métadonnées et miniature (post-processeurs FFmpegMetadata / EmbedThumbnail de
+    _base_ydl_opts, présents si ffmpeg est trouvé) en un seul appel ffmpeg au lieu d'une réécriture du mp4 par
+    étape. E/S évitées par vidéo en status "io_saved" et au total dans DownloadResult.io_saved.
+    stream_remux=True : les flux http(s) d'un format fusionné sont lus par un seul ffmpeg qui écrit le mp4
+    final (aucun fichier .fNNN) ; progression d'après la taille écrite. Si ffmpeg échoue, la vidéo repasse
+    par le téléchargement des flux sur disque puis la fusion. Débit max et réglage fragments ne s'appliquent
+    pas au flux lu par ffmpeg.
+    scratch_dir : dossier de travail (disque local rapide, tmpfs) où s'écrivent .part, flux et fusion ;
+    chaque fichier final est déplacé vers OUTPUT_DIR par un thread dédié (renommage, sinon copie),
+    file bornée (les workers attendent avant une nouvelle vidéo), vidée avant le retour de run_download.
+    Ignoré avec backend="process".
+    dedup=True : les entrées de toutes les sections sont réunies par ID vidéo avant le téléchargement ;
+    chaque vidéo est téléchargée une fois (première section) et ses autres emplacements (playlists…)
+    reçoivent un lien physique en fin de run, ou une copie si le lien est impossible.
+    Retourne DownloadResult(ok, skipped, error, last_error, retries, io_saved, linked).
+    """
+    ensure_windows_path_in_env()
+    ensure_dirs()
+    limiter = rate_limit if isinstance(rate_limit, RateLimiter) else RateLimiter(rate_limit) if rate_limit else None
+    session = _Session(progress_callback, cancel_event, limiter, priorities)
+    file_logger = _session_logger(session)
+    archive = get_archive()
+    archive.reset_stats()
+    if adaptive and max_workers > 1:
+
+        def log_decision(msg: str, changed: bool) -> None:
+            file_logger.info(msg)
+            if changed:
+                session.emit(msg, 0.0, "concurrency")
+
+        session.controller = AdaptiveConcurrency(max_workers, log=log_decision, cancel_event=session.cancel_event)
+    if auto_tune:
+        session.tuner = FragmentTuner(file_logger)
+    session.parallel_components = parallel_components
+    session.single_pass = single_pass
+    session.stream_remux = stream_remux
+    if resume:
+        session.store = JobStore()
+    if retry and backend != "process":
+
+        def give_up(job: VideoJob, message: str) -> None:
+            session.error(message)
+            if session.store is not None:
+                _record_outcome(session.store, job, (ERROR, message))
+
+        def log_retry(msg: str) -> None:
+            file_logger.info(msg)
+            session.emit(msg, 0.0, "retry")
+
+        session.retry = RetryScheduler(session.cancel_event, give_up=give_up, log=log_retry)
+    if postprocess_workers > 0 and backend != "process":
+        session.postproc = PostProcessPool(postprocess_workers, session.cancel_event)
+    if scratch_dir and backend != "process":
+
+        def log_move(msg: str) -> None:
+            file_logger.info(msg)
+            session.emit(msg, 0.0, "move")
+
+        session.mover = FileMover(pathlib.Path(scratch_dir), OUTPUT_DIR, session.cancel_event, log=log_move)
+    if dedup:
+
+        def log_links(msg: str) -> None:
+            file_logger.info(msg)
+            session.emit(msg, 0.0, "links")
+
+        session.links = LinkPlanner({}, (OUTPUT_DIR / OUTPUT_TEMPLATE).as_posix(), log=log_links)
+
+    try:
+        if backend == "process":
+            # Import local : procpool réutilise les helpers de ce module
+            from .procpool import run_process_pool
+
+            if limiter is not None and not limiter.shared:
+                # Les workers processus partagent le seau par le fichier d'état commun
+                limiter.make_shared()
+            run_process_pool(urls, session, file_logger, max_workers=max(1, max_workers), cancel_event=session.cancel_event)
+        elif extract_workers > 0:
+            # Import local : pipeline réutilise les helpers de ce module
+            from .pipeline import run_pipeline
+
+            run_pipeline(
+                urls,
+                session,
+                file_logger,
+                extract_workers=extract_workers,
+                download_workers=max(1, max_workers),
+                queue_depth=queue_depth,
+            )
+        else:
+            # Séquentiel compris (un worker, une instance) : vidéos archivées écartées avant yt-dlp
+            _run_parallel(urls, session, file_logger, max(1, max_workers))
+    finally:
+        if session.postproc is not None:
+            session.postproc.close()
+        if session.mover is not None:
+            session.mover.close()
+        if session.links is not None:
+            # Après le déplacement : les fichiers finaux sont dans OUTPUT_DIR
+            session.links.link_all()
+        try:
+            archive.flush()
+        except OSError as e:
+            file_logger.warning("Écriture de l'archive impossible : %s", e)
+        if archive.writes:
+            file_logger.info(archive.stats_summary())
+            if archive.lock_wait_max >= ARCHIVE_WAIT_WARN:
+                session.emit(f"⚠ {archive.stats_summary()}", 0.0, "archive")
+        if session.retry is not None:
+            session.retry.abandon()
+        if session.tuner is not None:
+            session.tuner.save()
+        if session.store is not None:
+            if not session.cancelled():
+                session.store.purge_finished(urls)
+            session.store.close()
+
+    return session.result()
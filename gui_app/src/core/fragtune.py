@@ -0,0 +1,129 @@
+"""Réglage automatique des fragments parallèles (DASH/HLS) et de la taille des blocs HTTP, par classe d'hôte."""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+from .locking import locked_file
+from .paths import SCRIPT_DIR
+
+# Débit / connexion mémorisé par classe d'hôte (moyenne glissante), relu au run suivant
+STATS_FILE = SCRIPT_DIR / "fragment_stats.json"
+# Débit total visé pour un format fragmenté : autant de connexions que nécessaire pour l'atteindre
+TARGET_RATE = 16 * 1024 * 1024
+MAX_FRAGMENTS = 8
+DEFAULT_FRAGMENTS = 4
+# Bloc HTTP (requêtes Range) ≈ CHUNK_SECONDS de transfert à la vitesse d'une connexion
+CHUNK_SECONDS = 8.0
+MIN_CHUNK = 1 << 20
+MAX_CHUNK = 64 << 20
+DEFAULT_CHUNK = 10 << 20
+# Poids d'une nouvelle mesure dans la moyenne glissante ; transferts plus petits ignorés (trop bruités)
+EWMA_ALPHA = 0.3
+MIN_SAMPLE_BYTES = 2 << 20
+
+_FRAGMENTED = ("http_dash_segments", "m3u8_native", "m3u8", "ism", "f4m")
+_INFO_KEY = "_fragment_tuning"
+
+
+def host_class(info: dict[str, Any]) -> str:
+    """Classe d'hôte : domaine (2 derniers labels, sans shard rrN---sn-xxx) + protocole du format."""
+    url = info.get("fragment_base_url") or info.get("manifest_url") or info.get("url") or ""
+    host = urlparse(url).hostname or "?"
+    domain = ".".join(host.split(".")[-2:])
+    return f"{domain}/{info.get('protocol') or 'https'}"
+
+
+@dataclass
+class TuneChoice:
+    """Réglage appliqué à un format : fragments parallèles, taille de bloc, mesure de référence (octets/s)."""
+    host_class: str
+    fragments: int
+    chunk_size: int
+    measured: float | None
+
+
+class FragmentTuner:
+    """Choisit les réglages par format à partir du débit par connexion observé, et l'apprend au fil des téléchargements."""
+
+    def __init__(self, file_logger: logging.Logger | None = None) -> None:
+        self._log = file_logger
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+        self._dirty: set[str] = set()
+        try:
+            data = json.loads(STATS_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                self._stats = {k: v for k, v in data.items() if isinstance(v, dict)}
+        except (OSError, ValueError):
+            pass
+
+    def choose(self, info: dict[str, Any]) -> TuneChoice:
+        """Réglage pour ce format (info = format résolu passé au downloader), mémorisé dans info pour observe()."""
+        cls = host_class(info)
+        with self._lock:
+            speed = self._stats.get(cls, {}).get("speed")
+        fragmented = str(info.get("protocol") or "").startswith(_FRAGMENTED)
+        if speed and speed > 0:
+            fragments = min(MAX_FRAGMENTS, max(1, math.ceil(TARGET_RATE / speed))) if fragmented else 1
+            chunk = int(min(MAX_CHUNK, max(MIN_CHUNK, speed * CHUNK_SECONDS))) >> 20 << 20
+        else:
+            fragments = DEFAULT_FRAGMENTS if fragmented else 1
+            chunk = DEFAULT_CHUNK
+        choice = TuneChoice(cls, fragments, chunk, speed)
+        info[_INFO_KEY] = choice
+        if self._log:
+            measured = f"{speed / (1024 * 1024):.2f} Mo/s par connexion" if speed else "pas encore de mesure"
+            self._log.info(
+                "Réglage fragments : format %s (%s) → %d fragment(s) en parallèle, blocs de %d Mo (%s)",
+                info.get("format_id", "?"), cls, fragments, chunk >> 20, measured,
+            )
+        return choice
+
+    def observe(self, d: dict[str, Any]) -> None:
+        """progress_hook « finished » : débit moyen du transfert ramené à une connexion."""
+        info = d.get("info_dict") or {}
+        choice = info.get(_INFO_KEY)
+        elapsed = d.get("elapsed")
+        total = d.get("total_bytes") or d.get("downloaded_bytes")
+        if not isinstance(choice, TuneChoice) or not elapsed or not total or total < MIN_SAMPLE_BYTES:
+            return
+        per_connection = total / elapsed / max(1, choice.fragments)
+        with self._lock:
+            entry = self._stats.setdefault(choice.host_class, {})
+            previous = entry.get("speed")
+            entry["speed"] = per_connection if not previous else previous + EWMA_ALPHA * (per_connection - previous)
+            entry["samples"] = entry.get("samples", 0) + 1
+            self._dirty.add(choice.host_class)
+            speed = entry["speed"]
+        if self._log:
+            self._log.info(
+                "Mesure fragments : %s %.2f Mo/s par connexion (%d fragment(s)) → moyenne %.2f Mo/s",
+                choice.host_class, per_connection / (1024 * 1024), choice.fragments, speed / (1024 * 1024),
+            )
+
+    def save(self) -> None:
+        """Écrit les classes mesurées pendant ce run (fusion avec le fichier : autres processus)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            updates = {k: dict(self._stats[k]) for k in self._dirty}
+            self._dirty.clear()
+        try:
+            with locked_file(STATS_FILE.with_suffix(".lock")):
+                try:
+                    data = json.loads(STATS_FILE.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    data = {}
+                if not isinstance(data, dict):
+                    data = {}
+                data.update(updates)
+                STATS_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        except OSError as e:
+            if self._log:
+                self._log.warning("Statistiques fragments non enregistrées : %s", e)
@@ -0,0 +1,168 @@
+"""File de jobs persistante (SQLite) : une ligne par vidéo, reprise exacte après un arrêt brutal."""
+from __future__ import annotations
+
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .paths import SCRIPT_DIR
+
+if TYPE_CHECKING:
+    from .download import VideoJob
+
+# Base des jobs (une ligne par vidéo et par section demandée)
+JOBS_DB = SCRIPT_DIR / "jobs.sqlite3"
+# Tentatives au-delà desquelles une vidéo en échec n'est plus reprise automatiquement
+MAX_ATTEMPTS = 3
+# Intervalle minimal (s) entre deux écritures des octets reçus d'un même job
+PROGRESS_FLUSH_INTERVAL = 2.0
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    section_url TEXT NOT NULL,
+    url TEXT NOT NULL,
+    video_id TEXT,
+    position INTEGER NOT NULL,
+    extra_info TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    bytes_done INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT '',
+    updated REAL NOT NULL,
+    PRIMARY KEY (section_url, url)
+)
+"""
+
+
+class JobStore:
+    """
+    Jobs d'un run en base : enqueue (section expansée) → claim (running) → finish (done / error) ou
+    release (annulé, repris tel quel). Les lignes « running » d'un run interrompu redeviennent « pending »
+    au run suivant (recover) ; une section sans job restant est purgée (purge_finished).
+    Connexion unique partagée par les threads du run, sous verrou.
+    """
+
+    def __init__(self, path: pathlib.Path | None = None) -> None:
+        self.path = path or JOBS_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._last_flush: dict[tuple[str, str], float] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _key(job: VideoJob) -> tuple[str, str]:
+        return job.section_url, job.url
+
+    def recover(self, section_urls: list[str]) -> int:
+        """Jobs « running » laissés par un run interrompu (crash, fermeture) → « pending » ; retourne leur nombre."""
+        with self._lock:
+            cur = self._db.executemany(
+                "UPDATE jobs SET state = ?, updated = ? WHERE section_url = ? AND state = ?",
+                [(PENDING, time.time(), url, RUNNING) for url in section_urls],
+            )
+            return cur.rowcount
+
+    def unfinished(self, section_url: str) -> list[VideoJob]:
+        """Jobs restants de la section (en attente, ou en échec sous MAX_ATTEMPTS), dans l'ordre d'origine."""
+        from .download import VideoJob
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, video_id, extra_info FROM jobs WHERE section_url = ? "
+                "AND (state = ? OR (state = ? AND attempts < ?)) ORDER BY position",
+                (section_url, PENDING, ERROR, MAX_ATTEMPTS),
+            ).fetchall()
+        return [
+            VideoJob(url=url, video_id=video_id, section_url=section_url, extra_info=json.loads(extra or "{}"))
+            for url, video_id, extra in rows
+        ]
+
+    def replace_section(self, section_url: str, jobs: list[VideoJob]) -> None:
+        """Nouvelle expansion de la section : remplace ses lignes (toutes terminées) par les jobs donnés."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DELETE FROM jobs WHERE section_url = ?", (section_url,))
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO jobs (section_url, url, video_id, position, extra_info, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (section_url, job.url, job.video_id, i, json.dumps(job.extra_info, default=str), now)
+                        for i, job in enumerate(jobs)
+                    ],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def claim(self, job: VideoJob) -> None:
+        """Job pris en charge (une tentative de plus, sauf s'il l'était déjà : extraction puis téléchargement)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET attempts = attempts + (state != ?), state = ?, updated = ? "
+                "WHERE section_url = ? AND url = ?",
+                (RUNNING, RUNNING, time.time(), *self._key(job)),
+            )
+
+    def progress(self, job: VideoJob, bytes_done: int) -> None:
+        """Octets reçus pour le job (écriture au plus toutes les PROGRESS_FLUSH_INTERVAL s)."""
+        key = self._key(job)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_flush.get(key, 0.0) < PROGRESS_FLUSH_INTERVAL:
+                return
+            self._last_flush[key] = now
+            self._db.execute(
+                "UPDATE jobs SET bytes_done = ?, updated = ? WHERE section_url = ? AND url = ?",
+                (bytes_done, time.time(), *key),
+            )
+
+    def finish(self, job: VideoJob, state: str, error: str = "", bytes_done: int | None = None) -> None:
+        """Fin du job : DONE ou ERROR (avec le dernier message d'erreur)."""
+        key = self._key(job)
+        with self._lock:
+            self._last_flush.pop(key, None)
+            self._db.execute(
+                "UPDATE jobs SET state = ?, last_error = ?, bytes_done = COALESCE(?, bytes_done), updated = ? "
+                "WHERE section_url = ? AND url = ?",
+                (state, error, bytes_done, time.time(), *key),
+            )
+
+    def release(self, job: VideoJob) -> None:
+        """Job interrompu par l'annulation : de nouveau en attente, tentative non comptée."""
+        key = self._key(job)
+        with self._lock:
+            self._last_flush.pop(key, None)
+            self._db.execute(
+                "UPDATE jobs SET state = ?, attempts = MAX(0, attempts - 1), updated = ? "
+                "WHERE section_url = ? AND url = ? AND state = ?",
+                (PENDING, time.time(), *key, RUNNING),
+            )
+
+    def purge_finished(self, section_urls: list[str]) -> None:
+        """Supprime les sections sans job restant : le run suivant les expanse à nouveau (nouvelles vidéos)."""
+        with self._lock:
+            for url in section_urls:
+                remaining = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE section_url = ? "
+                    "AND (state IN (?, ?) OR (state = ? AND attempts < ?))",
+                    (url, PENDING, RUNNING, ERROR, MAX_ATTEMPTS),
+                ).fetchone()[0]
+                if not remaining:
+                    self._db.execute("DELETE FROM jobs WHERE section_url = ?", (url,))
@@ -0,0 +1,55 @@
+"""Verrou de fichier inter-processus (fcntl sous Unix, msvcrt sous Windows)."""
+from __future__ import annotations
+
+import errno
+import pathlib
+import sys
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+# Windows : attente max (s) du verrou avant abandon (LK_LOCK fait 10 essais d'1 s par appel)
+LOCK_TIMEOUT = 60.0
+# Erreurs de LK_LOCK signalant un verrou toujours détenu ailleurs (les autres sont propagées)
+_LOCK_BUSY_ERRNOS = frozenset({errno.EACCES, getattr(errno, "EDEADLOCK", errno.EDEADLK)})
+
+
+@contextmanager
+def locked_file(path: pathlib.Path) -> Iterator[IO[bytes]]:
+    """
+    Ouvre path en lecture/écriture (créé au besoin) sous verrou exclusif, partagé par tous les
+    processus de la machine. Le fichier est ouvert en ajout : réécrire via seek(0) + truncate().
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            # Verrou sur le premier octet (autorisé au-delà de la fin du fichier) ; LK_LOCK réessaie 10 s puis
+            # lève EDEADLOCK : nouvel essai jusqu'à LOCK_TIMEOUT
+            f.seek(0)
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    if e.errno not in _LOCK_BUSY_ERRNOS:
+                        raise
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Verrou {path} non obtenu après {LOCK_TIMEOUT:.0f} s") from e
+            try:
+                yield f
+            finally:
+                f.flush()
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                f.flush()
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,157 @@
+"""Dossier de travail (disque local rapide) : fichiers finis déplacés en arrière-plan vers OUTPUT_DIR."""
+from __future__ import annotations
+
+import os
+import pathlib
+import queue
+import shutil
+import threading
+from typing import Callable
+
+# File de déplacement : au-delà, les workers attendent avant de commencer une nouvelle vidéo
+MAX_PENDING_FILES = 8
+MAX_PENDING_BYTES = 8 * 1024**3
+# Taille des blocs de copie quand le renommage est impossible (autre volume)
+COPY_CHUNK = 64 * 1024 * 1024
+
+
+class FileMover:
+    """
+    Arborescence de téléchargement miroir dans scratch : yt-dlp y écrit .part, flux .fNNN et fusion ;
+    submit() confie le fichier final au thread de déplacement (renommage si même volume, sinon
+    copy_file_range / copie, puis suppression). wait_room() bloque tant que la file dépasse
+    max_files / max_bytes, ce qui borne l'espace occupé sur le disque de travail.
+    """
+
+    def __init__(
+        self,
+        scratch: pathlib.Path,
+        dest: pathlib.Path,
+        cancel_event: threading.Event,
+        *,
+        log: Callable[[str], None] | None = None,
+        max_files: int = MAX_PENDING_FILES,
+        max_bytes: int = MAX_PENDING_BYTES,
+    ) -> None:
+        self.scratch = scratch.resolve()
+        self.dest = dest
+        self._cancel = cancel_event
+        self._log = log or (lambda _msg: None)
+        self._max_files = max(1, max_files)
+        self._max_bytes = max_bytes
+        self._queue: queue.Queue[pathlib.Path | None] = queue.Queue()
+        self._room = threading.Condition()
+        self._pending_files = 0
+        self._pending_bytes = 0
+        self.moved = 0
+        self.renamed = 0
+        self.moved_bytes = 0
+        self.failed: list[str] = []
+        self.scratch.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="yt-mover", daemon=True)
+        self._thread.start()
+
+    def final_path(self, path: str | pathlib.Path) -> pathlib.Path | None:
+        """Chemin dans OUTPUT_DIR d'un fichier du dossier de travail (None s'il est ailleurs)."""
+        try:
+            relative = pathlib.Path(path).resolve().relative_to(self.scratch)
+        except ValueError:
+            return None
+        return self.dest / relative
+
+    def wait_room(self) -> bool:
+        """Attend que la file repasse sous les limites ; False si le run est annulé entre-temps."""
+        with self._room:
+            while self._pending_files >= self._max_files or (
+                self._pending_files and self._pending_bytes >= self._max_bytes
+            ):
+                if self._cancel.is_set():
+                    return False
+                self._room.wait(0.5)
+        return not self._cancel.is_set()
+
+    def submit(self, path: str | pathlib.Path) -> None:
+        """Fichier final à déplacer (ignoré s'il n'est pas dans le dossier de travail) ; ne bloque pas."""
+        src = pathlib.Path(path).resolve()
+        if self.final_path(src) is None or not src.is_file():
+            return
+        with self._room:
+            self._pending_files += 1
+            self._pending_bytes += src.stat().st_size
+        self._queue.put(src)
+
+    def close(self) -> None:
+        """Termine les déplacements en attente (même après annulation : les fichiers sont complets)."""
+        self._queue.put(None)
+        self._thread.join()
+        if self.moved or self.failed:
+            self._log(
+                f"Déplacement vers {self.dest} : {self.moved} fichier(s), {self.moved_bytes / (1024 * 1024):.1f} Mo "
+                f"({self.renamed} renommé(s), {self.moved - self.renamed} copié(s)), {len(self.failed)} échec(s)"
+            )
+
+    def _run(self) -> None:
+        while True:
+            src = self._queue.get()
+            if src is None:
+                return
+            size = 0
+            try:
+                size = src.stat().st_size
+                renamed = self._move(src, self.final_path(src))  # type: ignore[arg-type]
+                self.moved += 1
+                self.renamed += renamed
+                self.moved_bytes += size
+                self._prune(src.parent)
+            except OSError as e:
+                self.failed.append(str(src))
+                self._log(f"⚠ Déplacement impossible, fichier laissé dans le dossier de travail : {src} ({e})")
+            finally:
+                with self._room:
+                    self._pending_files -= 1
+                    self._pending_bytes = max(0, self._pending_bytes - size)
+                    self._room.notify_all()
+
+    @staticmethod
+    def _move(src: pathlib.Path, dst: pathlib.Path) -> bool:
+        """True si renommé (même volume), False si copié puis supprimé."""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(src, dst)
+            return True
+        except OSError:
+            pass
+        # Autre volume : copie sous un nom temporaire, le fichier n'apparaît dans OUTPUT_DIR qu'une fois complet
+        tmp = dst.with_name(dst.name + ".moving")
+        try:
+            _copy(src, tmp)
+            shutil.copystat(src, tmp)
+            os.replace(tmp, dst)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        src.unlink()
+        return False
+
+    def _prune(self, directory: pathlib.Path) -> None:
+        """Supprime les dossiers vidés du dossier de travail (sans remonter au-delà de sa racine)."""
+        while directory != self.scratch and self.scratch in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+
+
+def _copy(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """copy_file_range (copie côté noyau / serveur) si disponible, sinon shutil.copyfile."""
+    if hasattr(os, "copy_file_range"):
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            try:
+                while os.copy_file_range(fin.fileno(), fout.fileno(), COPY_CHUNK):
+                    pass
+                return
+            except OSError:
+                # Non supporté entre ces systèmes de fichiers : copie classique
+                pass
+    shutil.copyfile(src, dst)
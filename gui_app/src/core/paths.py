@@ -13,6 +13,8 @@ else:
 LOG_DIR = SCRIPT_DIR / "logs"
 OUTPUT_DIR = SCRIPT_DIR / "downloads"
 ARCHIVE_FILE = SCRIPT_DIR / "archive.txt"
+# Fichier final de chaque vidéo téléchargée (« ID<TAB>chemin relatif à OUTPUT_DIR »), lu par le rapprochement de l'archive
+FILES_INDEX = SCRIPT_DIR / "archive_files.txt"
 COOKIE_FILE = SCRIPT_DIR / "cookies.txt"
 COOKIE_FILE_ENCRYPTED = SCRIPT_DIR / "cookies.enc"
 
@@ -0,0 +1,255 @@
+"""Pipeline à deux étages : extraction (infos résolues) → file bornée → téléchargement."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import yt_dlp  # type: ignore[import-untyped]
+
+from .download import VideoJob, _ProgressTracker, _Session, _execute_job, _new_ydl, _record_outcome, _session_jobs
+from .jobstore import DONE
+
+# Intervalle (s) entre deux rapports d'occupation des étages
+STATS_INTERVAL = 5.0
+
+# Marqueur de fin de file (un par worker de téléchargement)
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Occupation et attentes d'un étage du pipeline (cumulées sur le run)."""
+    name: str
+    size: int
+    started: float = field(default_factory=time.monotonic)
+    busy: int = 0
+    items: int = 0
+    busy_time: float = 0.0
+    wait_time: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def begin(self) -> float:
+        with self._lock:
+            self.busy += 1
+        return time.monotonic()
+
+    def end(self, t0: float) -> None:
+        with self._lock:
+            self.busy -= 1
+            self.items += 1
+            self.busy_time += time.monotonic() - t0
+
+    def waited(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_time += seconds
+
+    def occupancy(self) -> float:
+        """Part du temps où les workers de l'étage ont travaillé (0..1)."""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return min(1.0, self.busy_time / (elapsed * max(self.size, 1)))
+
+    def summary(self) -> str:
+        return (
+            f"{self.name} {self.busy}/{self.size} actifs, occupation {self.occupancy():.0%}, "
+            f"{self.items} traité(s), attente file {self.wait_time:.1f}s"
+        )
+
+
+def _report(session: _Session, stats: list[StageStats], q: queue.Queue, file_logger: logging.Logger) -> None:
+    msg = "Pipeline : " + " | ".join(s.summary() for s in stats) + f" | file {q.qsize()}/{q.maxsize}"
+    file_logger.info(msg)
+    session.emit(msg, 0.0, "pipeline_stats")
+
+
+def run_pipeline(
+    urls: list[str],
+    session: _Session,
+    file_logger: logging.Logger,
+    *,
+    extract_workers: int,
+    download_workers: int,
+    queue_depth: int,
+) -> None:
+    """
+    Étage 1 : extract_workers instances YoutubeDL résolvent les vidéos (page, player JS, challenge EJS)
+    et déposent les infos dans une file bornée (queue_depth). Étage 2 : download_workers instances
+    consomment la file et téléchargent. L'extraction de la vidéo suivante chevauche le transfert en cours.
+    """
+    jobs = _session_jobs(urls, session, file_logger)
+    session.emit(
+        f"{len(jobs)} vidéo(s) à traiter — extraction ×{extract_workers}, téléchargement ×{download_workers}, "
+        f"file {queue_depth}.",
+        0.0,
+        "info",
+    )
+    while jobs:
+        _pipeline_pass(
+            jobs,
+            session,
+            file_logger,
+            extract_workers=extract_workers,
+            download_workers=download_workers,
+            queue_depth=queue_depth,
+        )
+        # Relances (session.retry) : nouveau passage dans les deux étages dès qu'elles sont dues
+        jobs = session.retry.wait_due() if session.retry is not None else []
+
+
+def _release_ready(ready: queue.Queue[Any], session: _Session) -> None:
+    """Vide la file des infos résolues sans les télécharger ; leurs jobs sont rendus (file persistante)."""
+    while True:
+        try:
+            item = ready.get_nowait()
+        except queue.Empty:
+            return
+        if item is not _DONE and session.store is not None:
+            session.store.release(item[0])
+
+
+def _pipeline_pass(
+    jobs: list[VideoJob],
+    session: _Session,
+    file_logger: logging.Logger,
+    *,
+    extract_workers: int,
+    download_workers: int,
+    queue_depth: int,
+) -> None:
+    """Un passage des jobs dans les deux étages (extraction → file bornée → téléchargement)."""
+    todo: queue.Queue[VideoJob | None] = queue.Queue()
+    for job in jobs:
+        todo.put(job)
+    ready: queue.Queue[Any] = queue.Queue(maxsize=max(1, queue_depth))
+    extract_stats = StageStats("Extraction", extract_workers)
+    download_stats = StageStats("Téléchargement", download_workers)
+    instances: list[Any] = []
+    instances_lock = threading.Lock()
+    stop_stats = threading.Event()
+
+    def new_ydl(tracker: _ProgressTracker) -> Any:
+        ydl = _new_ydl(session, file_logger, tracker)
+        with instances_lock:
+            instances.append(ydl)
+        return ydl
+
+    def extractor() -> None:
+        ydl = new_ydl(_ProgressTracker(session))
+        while True:
+            if session.cancelled():
+                return
+            try:
+                job = todo.get_nowait()
+            except queue.Empty:
+                return
+            t0 = extract_stats.begin()
+            if session.store is not None:
+                session.store.claim(job)
+            session.begin_job()
+            info = None
+            try:
+                info = ydl.extract_info(job.url, download=False, extra_info=dict(job.extra_info))
+            except Exception as e:
+                session.note_log_error(str(e))
+            errors = session.end_job()
+            extract_stats.end(t0)
+            if errors:
+                outcome = session.job_failed(job, errors[-1]), errors[-1]
+                if session.store is not None:
+                    _record_outcome(session.store, job, outcome)
+                continue
+            if not info:
+                # Déjà en archive (compté par le logger) ou rien à télécharger
+                if session.store is not None:
+                    _record_outcome(session.store, job, ("cancelled", "") if session.cancelled() else (DONE, ""))
+                continue
+            t_wait = time.monotonic()
+            item = (job, ydl.sanitize_info(info, remove_private_keys=True))
+            # put avec délai : un extracteur bloqué sur une file pleine voit aussi l'annulation
+            while not session.cancelled():
+                try:
+                    ready.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                # Annulé avant la mise en file : job rendu, comme côté téléchargement
+                if session.store is not None:
+                    session.store.release(job)
+            extract_stats.waited(time.monotonic() - t_wait)
+
+    def downloader() -> None:
+        tracker = _ProgressTracker(session)
+        ydl = new_ydl(tracker)
+        while True:
+            t_wait = time.monotonic()
+            item = ready.get()
+            download_stats.waited(time.monotonic() - t_wait)
+            if item is _DONE:
+                return
+            job, info = item
+            if not session.acquire_slot():
+                # Annulé : on continue de vider la file jusqu'au marqueur de fin
+                if session.store is not None:
+                    session.store.release(job)
+                continue
+            t0 = download_stats.begin()
+
+            def download(job: VideoJob = job, info: dict[str, Any] = info) -> None:
+                try:
+                    ydl.process_ie_result(info, download=True)
+                except yt_dlp.utils.DownloadCancelled:
+                    raise
+                except Exception as e:
+                    # URLs de format expirées, etc. : nouvelle extraction complète depuis l'URL de la vidéo
+                    file_logger.warning("Infos résolues inutilisables (%s), nouvelle extraction : %s", job.url, e)
+                    ydl.extract_info(job.url, download=True, extra_info=dict(job.extra_info))
+
+            try:
+                _execute_job(session, tracker, download, weight=session.job_weight(job), job=job)
+            finally:
+                session.release_slot()
+            download_stats.end(t0)
+
+    def monitor() -> None:
+        while not stop_stats.wait(STATS_INTERVAL):
+            _report(session, [extract_stats, download_stats], ready, file_logger)
+
+    extract_threads = [
+        threading.Thread(target=extractor, name=f"yt-extract-{i}", daemon=True) for i in range(extract_workers)
+    ]
+    download_threads = [
+        threading.Thread(target=downloader, name=f"yt-download-{i}", daemon=True) for i in range(download_workers)
+    ]
+    monitor_thread = threading.Thread(target=monitor, name="yt-pipeline-stats", daemon=True)
+    try:
+        for t in extract_threads + download_threads:
+            t.start()
+        monitor_thread.start()
+        for t in extract_threads:
+            t.join()
+        if session.cancelled():
+            _release_ready(ready, session)
+        for _ in download_threads:
+            # put avec délai : si tous les téléchargeurs sont morts (exception), plus personne ne vide la file
+            while any(t.is_alive() for t in download_threads):
+                try:
+                    ready.put(_DONE, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+        for t in download_threads:
+            t.join()
+        # Infos laissées par des téléchargeurs morts : jobs rendus à la file persistante
+        _release_ready(ready, session)
+    finally:
+        stop_stats.set()
+        _report(session, [extract_stats, download_stats], ready, file_logger)
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception:
+                pass
@@ -0,0 +1,142 @@
+"""Post-traitement (fusion, fixups, déplacement final) dans un pool de processus, hors des workers réseau."""
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable
+
+import yt_dlp  # type: ignore[import-untyped]
+import yt_dlp.postprocessor  # type: ignore[import-untyped]
+
+from .paths import LOG_DIR
+from .singlepass import SinglePassPP, detach_embed_pps
+
+# Options yt-dlp utiles au post-traitement (recopiées dans l'instance YoutubeDL du processus)
+_PP_PARAMS = (
+    "outtmpl",
+    "paths",
+    "merge_output_format",
+    "final_ext",
+    "keepvideo",
+    "ffmpeg_location",
+    "postprocessors",
+    "postprocessor_args",
+    "overwrites",
+    "nopart",
+    "windowsfilenames",
+    "restrictfilenames",
+)
+# Vidéos en attente de post-traitement par worker : au-delà, le téléchargement suivant attend
+PENDING_PER_WORKER = 2
+
+_child_ydls: dict[str, Any] = {}
+
+
+def _child_ydl(params: dict[str, Any], single_pass: bool = False) -> Any:
+    """
+    Une instance YoutubeDL par jeu d'options dans le processus, logs dans yt_session.log ; single_pass :
+    FFmpegMetadata / EmbedThumbnail retirés de la chaîne, exécutés par SinglePassPP.
+    """
+    key = json.dumps([params, single_pass], sort_keys=True, default=str)
+    ydl = _child_ydls.get(key)
+    if ydl is None:
+        logger = logging.getLogger("yt_dlp_pp")
+        if not logger.handlers:
+            logger.setLevel(logging.DEBUG)
+            logger.propagate = False
+            LOG_DIR.mkdir(exist_ok=True)
+            handler = logging.FileHandler(LOG_DIR / "yt_session.log", mode="a", encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        ydl = _child_ydls[key] = yt_dlp.YoutubeDL({**params, "quiet": True, "logger": logger})
+        if single_pass:
+            detach_embed_pps(ydl)
+    return ydl
+
+
+def _child_post_process(
+    params: dict[str, Any],
+    filename: str,
+    info: dict[str, Any],
+    files_to_move: dict[str, Any] | None,
+    pp_names: list[str],
+) -> tuple[bool, str, int]:
+    """
+    Exécuté dans le processus : post_process yt-dlp complet ; retourne (succès, fichier final ou erreur,
+    E/S évitées par SinglePassPP).
+    """
+    ydl = _child_ydl(params, SinglePassPP.__name__ in pp_names)
+    info["__postprocessors"] = [_pp_class(name)(ydl) for name in pp_names]
+    try:
+        info = ydl.post_process(filename, info, files_to_move)
+    except Exception as e:
+        return False, str(e), 0
+    return True, str(info.get("filepath") or filename), int(info.get("__io_saved") or 0)
+
+
+def _pp_class(name: str) -> Any:
+    """Classe de post-processeur d'après son nom : yt-dlp, ou SinglePassPP (post-traitement en une passe)."""
+    return SinglePassPP if name == SinglePassPP.__name__ else getattr(yt_dlp.postprocessor, name)
+
+
+class PostProcessPool:
+    """
+    Pool de processus de post-traitement partagé par les workers d'un run. submit() confie le fichier
+    téléchargé (infos + post-processeurs de la vidéo) et rend la main aussitôt ; on_done(succès, fichier
+    ou erreur, E/S évitées) est appelé à la fin, depuis un thread du pool. Au plus workers × PENDING_PER_WORKER vidéos
+    en attente (les workers réseau patientent au-delà, l'annulation les libère).
+    """
+
+    def __init__(self, workers: int, cancel_event: threading.Event) -> None:
+        self.workers = max(1, workers)
+        self._cancel = cancel_event
+        self._slots = threading.Semaphore(self.workers * PENDING_PER_WORKER)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._lock = threading.Lock()
+        self._futures: set[Future] = set()
+
+    def submit(
+        self,
+        ydl: Any,
+        filename: str,
+        info: dict[str, Any],
+        files_to_move: dict[str, Any] | None,
+        on_done: Callable[[bool, str, int], None],
+    ) -> bool:
+        """False si le run a été annulé pendant l'attente d'une place (rien n'est soumis)."""
+        while not self._slots.acquire(timeout=0.5):
+            if self._cancel.is_set():
+                return False
+        params = {k: ydl.params[k] for k in _PP_PARAMS if k in ydl.params}
+        pp_names = [type(pp).__name__ for pp in info.get("__postprocessors") or []]
+        payload = {k: v for k, v in info.items() if k != "__postprocessors"}
+        try:
+            future = self._pool.submit(_child_post_process, params, filename, payload, files_to_move, pp_names)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+
+        def done(f: Future) -> None:
+            with self._lock:
+                self._futures.discard(f)
+            self._slots.release()
+            if f.cancelled():
+                return
+            try:
+                ok, detail, io_saved = f.result()
+            except Exception as e:
+                # Processus tombé (BrokenProcessPool…) : la vidéo compte en échec
+                ok, detail, io_saved = False, str(e), 0
+            on_done(ok, detail, io_saved)
+
+        future.add_done_callback(done)
+        return True
+
+    def close(self) -> None:
+        """Attend la fin des post-traitements (ceux pas encore commencés sont abandonnés si le run est annulé)."""
+        self._pool.shutdown(wait=True, cancel_futures=self._cancel.is_set())
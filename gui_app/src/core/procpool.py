@@ -0,0 +1,272 @@
+"""Backend processus : chaque job YoutubeDL tourne dans un processus worker (pas de contention GIL)."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import pathlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from .archive import get_archive
+from .cookies import get_cookiefile_path
+from .download import (
+    _ProgressTracker,
+    _Session,
+    _SessionYoutubeDL,
+    _base_ydl_opts,
+    _execute_job,
+    _record_outcome,
+    _session_jobs,
+    _session_logger,
+)
+from .dedup import link_fields
+from .fragtune import FragmentTuner
+from .jobstore import ERROR
+from .ratelimit import RateLimiter
+
+# Progression "downloading" renvoyée au parent au plus toutes les PROGRESS_MIN_INTERVAL s (ou à chaque % entier)
+PROGRESS_MIN_INTERVAL = 0.5
+
+# Canal IPC : tuples courts (code, ...) — "p" progression, "d" vidéo terminée, "s" déjà en archive,
+# "e" erreur, "h" message utilisateur (bot/cookies…), "b" octets reçus, "t" signal bot / 429,
+# "w" E/S évitées, "f" fichier final (liens des doublons), "a" statistiques d'écriture de l'archive
+_child_events: Any = None
+_child_cancel: Any = None
+_child_cookiefile: str | None = None
+_child_rate_file: str | None = None
+_child_auto_tune = False
+_child_parallel_components = False
+_child_single_pass = False
+_child_stream_remux = False
+_child_ydl: Any = None
+_child_tracker: _ProgressTracker | None = None
+_child_session: _RemoteSession | None = None
+
+
+class _RemoteSession(_Session):
+    """Session côté worker : mêmes appels que _Session, relayés au parent par la file d'événements."""
+
+    def __init__(self, events: Any, cancel_event: Any, limiter: RateLimiter | None) -> None:
+        super().__init__(None, cancel_event, limiter)
+        self._events = events
+        self._last_pct = -1
+        self._last_sent = 0.0
+        self._pending_bytes = 0
+        self._bytes_sent = 0.0
+
+    @property
+    def counts_bytes(self) -> bool:
+        return True
+
+    def record_bytes(self, nbytes: int) -> None:
+        # Regroupés : au plus un événement par PROGRESS_MIN_INTERVAL
+        self._pending_bytes += nbytes
+        now = time.monotonic()
+        if now - self._bytes_sent >= PROGRESS_MIN_INTERVAL:
+            self._events.put(("b", self._pending_bytes))
+            self._pending_bytes, self._bytes_sent = 0, now
+
+    def throttle_signal(self, reason: str) -> None:
+        self._events.put(("t", reason))
+
+    def emit(self, msg: str, percent: float, status: str) -> None:
+        if status == "downloading":
+            now = time.monotonic()
+            if int(percent) == self._last_pct and now - self._last_sent < PROGRESS_MIN_INTERVAL:
+                return
+            self._last_pct, self._last_sent = int(percent), now
+        self._events.put(("p", msg, percent, status))
+
+    def video_done(self, key: str, fn: str) -> None:
+        if key in self.finished_keys:
+            return
+        self.finished_keys.add(key)
+        self._events.put(("d", key, fn))
+
+    def skipped(self, count: int = 1) -> None:
+        self._events.put(("s", count))
+
+    def record_io_saved(self, fn: str, nbytes: int) -> None:
+        self._events.put(("w", fn, nbytes))
+
+    def record_final(self, info: dict[str, Any], path: str) -> None:
+        self._events.put(("f", link_fields(info), path))
+
+    def error(self, message: str) -> None:
+        self._local.job_error_counted = True
+        self._events.put(("e", message))
+
+    def hint(self, friendly: str) -> None:
+        if friendly not in self.collected_hints:
+            self.collected_hints.append(friendly)
+            self._events.put(("h", friendly))
+
+
+def _child_init(
+    events: Any,
+    cancel_event: Any,
+    cookiefile: str | None,
+    rate_file: str | None,
+    auto_tune: bool,
+    parallel_components: bool,
+    single_pass: bool,
+    stream_remux: bool,
+) -> None:
+    """
+    Initialisation d'un processus worker (file d'événements, annulation, cookies déjà résolus par le parent,
+    fichier d'état du limiteur de débit partagé s'il y en a un, réglage automatique des fragments,
+    flux vidéo / audio en parallèle, post-traitement en une passe, remux en flux).
+    """
+    global _child_events, _child_cancel, _child_cookiefile, _child_rate_file, _child_auto_tune
+    global _child_parallel_components, _child_single_pass, _child_stream_remux
+    _child_events = events
+    _child_cancel = cancel_event
+    _child_cookiefile = cookiefile
+    _child_rate_file = rate_file
+    _child_auto_tune = auto_tune
+    _child_parallel_components = parallel_components
+    _child_single_pass = single_pass
+    _child_stream_remux = stream_remux
+
+
+def _child_ydl_instance() -> tuple[Any, _ProgressTracker, _RemoteSession]:
+    """Une instance YoutubeDL par processus, réutilisée d'un job à l'autre."""
+    global _child_ydl, _child_tracker, _child_session
+    if _child_ydl is None:
+        limiter = RateLimiter(shared=True, state_file=pathlib.Path(_child_rate_file)) if _child_rate_file else None
+        _child_session = _RemoteSession(_child_events, _child_cancel, limiter)
+        file_logger = _session_logger(_child_session)
+        if _child_auto_tune:
+            _child_session.tuner = FragmentTuner(file_logger)
+        _child_session.parallel_components = _child_parallel_components
+        _child_session.single_pass = _child_single_pass
+        _child_session.stream_remux = _child_stream_remux
+        _child_tracker = _ProgressTracker(_child_session)
+        opts = _base_ydl_opts(file_logger, _child_tracker)
+        opts.pop("cookiefile", None)
+        if _child_cookiefile:
+            opts["cookiefile"] = _child_cookiefile
+        _child_ydl = _SessionYoutubeDL(opts, _child_session)
+    return _child_ydl, _child_tracker, _child_session  # type: ignore[return-value]
+
+
+def _child_run_job(url: str, extra_info: dict[str, Any], weight: float) -> tuple[str, str]:
+    """Exécuté dans le worker : extraction + téléchargement d'une vidéo ; retourne (état, dernière erreur)."""
+    ydl, tracker, session = _child_ydl_instance()
+    outcome = _execute_job(
+        session,
+        tracker,
+        lambda: ydl.extract_info(url, download=True, extra_info=dict(extra_info)),
+        weight=weight,
+    )
+    if session.tuner is not None:
+        # Mesures fusionnées au fichier à chaque job : le processus peut être arrêté à tout moment
+        session.tuner.save()
+    # Entrées d'archive écrites avant de rendre la main : le processus peut être arrêté sans atexit
+    archive = get_archive()
+    archive.flush()
+    if archive.writes:
+        _child_events.put(("a", archive.take_stats()))
+    return outcome
+
+
+def _apply_events(events: Any, session: _Session) -> None:
+    """Thread du parent : applique les événements des workers à la session (contrat progress_callback inchangé)."""
+    while True:
+        event = events.get()
+        if event is None:
+            return
+        code = event[0]
+        if code == "p":
+            session.emit(event[1], event[2], event[3])
+        elif code == "d":
+            session.video_done(event[1], event[2])
+        elif code == "s":
+            session.skipped(event[1])
+        elif code == "w":
+            session.record_io_saved(event[1], event[2])
+        elif code == "f":
+            session.record_final(event[1], event[2])
+        elif code == "a":
+            get_archive().merge_stats(event[1])
+        elif code == "e":
+            session.error(event[1])
+        elif code == "h":
+            session.hint(event[1])
+        elif code == "b":
+            session.record_bytes(event[1])
+        elif code == "t":
+            session.throttle_signal(event[1])
+
+
+def run_process_pool(
+    urls: list[str],
+    session: _Session,
+    file_logger: logging.Logger,
+    *,
+    max_workers: int,
+    cancel_event: threading.Event,
+) -> None:
+    """Expansion à plat puis un job par vidéo sur un pool de max_workers processus."""
+    jobs = _session_jobs(urls, session, file_logger)
+    session.emit(f"{len(jobs)} vidéo(s) à traiter — {max_workers} processus worker(s).", 0.0, "info")
+    # spawn : même comportement sous Windows (seule plateforme de la GUI) et ailleurs
+    ctx = multiprocessing.get_context("spawn")
+    events = ctx.Queue()
+    # Event multiprocessing (partagé avec les workers), recopié depuis l'Event du parent
+    child_cancel = ctx.Event()
+    stop_watch = threading.Event()
+
+    def watch_cancel() -> None:
+        while not stop_watch.wait(0.2):
+            if cancel_event.is_set():
+                child_cancel.set()
+                return
+
+    watcher = threading.Thread(target=watch_cancel, name="yt-proc-cancel", daemon=True)
+    watcher.start()
+    rate_file = str(session.limiter.state_file) if session.limiter is not None and session.limiter.shared else None
+    reader = threading.Thread(target=_apply_events, args=(events, session), name="yt-proc-events", daemon=True)
+    reader.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=ctx,
+            initializer=_child_init,
+            initargs=(
+                events,
+                child_cancel,
+                get_cookiefile_path(),
+                rate_file,
+                session.tuner is not None,
+                session.parallel_components,
+                session.single_pass,
+                session.stream_remux,
+            ),
+        ) as pool:
+            # Soumission au fil des créneaux (contrôleur adaptatif) ; sans contrôleur, tout part d'emblée
+            futures = []
+            for job in jobs:
+                if not session.acquire_slot():
+                    break
+                if session.store is not None:
+                    session.store.claim(job)
+                future = pool.submit(_child_run_job, job.url, job.extra_info, session.job_weight(job))
+                future.add_done_callback(lambda _f: session.release_slot())
+                futures.append(future)
+            for future, job in zip(futures, jobs):
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # Processus worker tombé (BrokenProcessPool, etc.) : la vidéo compte en échec
+                    session.error(f"{job.url} : {e}")
+                    outcome = ERROR, str(e)
+                if session.store is not None:
+                    _record_outcome(session.store, job, outcome)
+    finally:
+        stop_watch.set()
+        # Les workers ont vidé leur file en se terminant : le sentinel passe après tous leurs événements
+        events.put(None)
+        reader.join()
@@ -0,0 +1,240 @@
+"""Limiteur de débit global (token bucket) partagé par les téléchargements en cours."""
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+from .locking import locked_file
+
+# État commun à tous les processus de la machine (GUI, CLI, backend processus) : même chemin dans cli_app
+SHARED_STATE_FILE = pathlib.Path(tempfile.gettempdir()) / "yt_dlp_ratelimit.json"
+# Réserve du seau, en secondes de débit (rafale tolérée après une pause)
+BURST_SECONDS = 1.0
+# Un processus sans activité depuis PEER_TIMEOUT s ne compte plus dans le partage des poids
+PEER_TIMEOUT = 30.0
+# Mode partagé : débit retiré d'un coup du seau commun (s de débit), puis dépensé localement sans fichier
+RESERVE_SECONDS = 0.1
+# Mode partagé : relecture du fichier d'état au moins toutes les SYNC_INTERVAL s (débit, poids, mesures)
+SYNC_INTERVAL = 0.5
+# Fenêtre (s) de mesure des débits effectifs et intervalle entre deux rapports
+RATE_WINDOW = 3.0
+REPORT_INTERVAL = 2.0
+
+
+def format_rate(rate: float) -> str:
+    """Débit lisible (octets/s → ko/s ou Mo/s)."""
+    if rate >= 1024 * 1024:
+        return f"{rate / (1024 * 1024):.1f} Mo/s"
+    return f"{rate / 1024:.0f} ko/s"
+
+
+def _read_state(f: IO[bytes]) -> dict[str, Any]:
+    f.seek(0)
+    raw = f.read()
+    try:
+        state = json.loads(raw.decode("utf-8")) if raw else {}
+    except (ValueError, UnicodeDecodeError):
+        state = {}
+    return state if isinstance(state, dict) else {}
+
+
+def _write_state(f: IO[bytes], state: dict[str, Any]) -> None:
+    f.seek(0)
+    f.truncate()
+    f.write(json.dumps(state).encode("utf-8"))
+
+
+@dataclass
+class _JobState:
+    """Un job actif : poids (priorité), seau propre (part du débit global) et mesures."""
+    weight: float
+    label: str = ""
+    tokens: float = 0.0
+    ts: float = field(default_factory=time.monotonic)
+    samples: deque = field(default_factory=deque)
+
+
+class RateLimiter:
+    """
+    Token bucket global en octets/s (rate ≤ 0 = illimité, seules les mesures sont faites).
+    Chaque worker consomme les octets reçus (consume) et dort le délai retourné si le seau est à découvert.
+    Les jobs actifs se partagent le débit au prorata de leur poids (begin_job(key, weight)).
+    shared=True : seau, débit et poids synchronisés entre processus via SHARED_STATE_FILE ;
+    set_rate() y est visible par tous les participants (GUI, CLI, workers processus).
+    """
+
+    def __init__(self, rate: float | None = None, *, shared: bool = False, state_file: pathlib.Path | None = None) -> None:
+        self._lock = threading.Lock()
+        self._rate = float(rate or 0)
+        self._tokens = 0.0
+        self._ts = time.monotonic()
+        self._jobs: dict[Any, _JobState] = {}
+        self._samples: deque[tuple[float, int]] = deque()
+        self._peer_weight = 0.0
+        self._peer_rate = 0.0
+        # Octets déjà retirés du seau commun, non encore reçus ; dernière synchronisation (monotonic)
+        self._reserve = 0.0
+        self._synced = 0.0
+        self._last_report = 0.0
+        self.state_file: pathlib.Path | None = None
+        if shared:
+            self.make_shared(state_file, keep_rate=rate is not None)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def shared(self) -> bool:
+        return self.state_file is not None
+
+    def make_shared(self, state_file: pathlib.Path | None = None, *, keep_rate: bool = True) -> None:
+        """Passe en mode inter-processus ; keep_rate : impose le débit courant, sinon adopte celui du fichier."""
+        self.state_file = state_file or SHARED_STATE_FILE
+        if keep_rate:
+            self.set_rate(self._rate)
+        else:
+            with locked_file(self.state_file) as f:
+                self._rate = float(_read_state(f).get("rate") or 0)
+
+    def set_rate(self, rate: float | None) -> None:
+        """Change le débit global en cours de route (None ou 0 = illimité)."""
+        with self._lock:
+            self._rate = float(rate or 0)
+            self._reserve = 0.0
+            if self.state_file is not None:
+                with locked_file(self.state_file) as f:
+                    state = _read_state(f)
+                    state["rate"] = self._rate
+                    state["tokens"] = min(float(state.get("tokens") or 0), self._rate * BURST_SECONDS)
+                    _write_state(f, state)
+
+    def begin_job(self, key: Any, weight: float = 1.0, label: str = "") -> None:
+        with self._lock:
+            self._jobs[key] = _JobState(weight=max(weight, 0.01), label=label)
+
+    def end_job(self, key: Any) -> None:
+        with self._lock:
+            self._jobs.pop(key, None)
+            if self.state_file is not None:
+                # Poids publié à jour : les autres processus récupèrent aussitôt la part libérée
+                with locked_file(self.state_file) as f:
+                    state = _read_state(f)
+                    peers = state.get("peers")
+                    entry = peers.get(str(os.getpid())) if isinstance(peers, dict) else None
+                    if isinstance(entry, list) and len(entry) == 3:
+                        entry[0] = sum(j.weight for j in self._jobs.values())
+                        _write_state(f, state)
+
+    def consume(self, key: Any, nbytes: int, label: str = "") -> float:
+        """Comptabilise nbytes reçus par le job key ; retourne le délai (s) à respecter avant de continuer."""
+        now = time.monotonic()
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = _JobState(weight=1.0)
+            if label:
+                job.label = label
+            job.samples.append((now, nbytes))
+            self._samples.append((now, nbytes))
+            self._trim(now)
+            if self.state_file is not None:
+                global_delay = self._consume_shared(nbytes)
+            else:
+                global_delay = self._consume_local(now, nbytes)
+            rate = self._rate
+            if rate <= 0:
+                return 0.0
+            # Part du job : débit global × poids / somme des poids actifs (ce processus + les autres)
+            total_weight = sum(j.weight for j in self._jobs.values()) + self._peer_weight
+            job_rate = rate * job.weight / max(total_weight, job.weight)
+            job.tokens = min(job_rate * BURST_SECONDS, job.tokens + job_rate * (now - job.ts)) - nbytes
+            job.ts = now
+            job_delay = -job.tokens / job_rate if job.tokens < 0 else 0.0
+            return max(global_delay, job_delay)
+
+    def _consume_local(self, now: float, nbytes: int) -> float:
+        rate = self._rate
+        if rate <= 0:
+            return 0.0
+        self._tokens = min(rate * BURST_SECONDS, self._tokens + rate * (now - self._ts)) - nbytes
+        self._ts = now
+        return -self._tokens / rate if self._tokens < 0 else 0.0
+
+    def _consume_shared(self, nbytes: int) -> float:
+        """
+        Seau commun dans le fichier d'état (horloge murale, seule commune aux processus). Les octets sont
+        pris dans la réserve locale ; le fichier n'est verrouillé et réécrit que lorsqu'elle est épuisée
+        (RESERVE_SECONDS de débit retirées d'un coup) ou après SYNC_INTERVAL s.
+        """
+        mono = time.monotonic()
+        if nbytes <= self._reserve and mono - self._synced < SYNC_INTERVAL:
+            self._reserve -= nbytes
+            return 0.0
+        self._synced = mono
+        now = time.time()
+        pid = str(os.getpid())
+        assert self.state_file is not None
+        with locked_file(self.state_file) as f:
+            state = _read_state(f)
+            rate = self._rate = float(state.get("rate") or 0)
+            peers = state.get("peers") if isinstance(state.get("peers"), dict) else {}
+            peers = {p: v for p, v in peers.items() if isinstance(v, list) and len(v) == 3 and now - v[1] < PEER_TIMEOUT}
+            peers[pid] = [sum(j.weight for j in self._jobs.values()), now, self._measured_rate()]
+            self._peer_weight = sum(v[0] for p, v in peers.items() if p != pid)
+            self._peer_rate = sum(v[2] for p, v in peers.items() if p != pid)
+            delay = 0.0
+            if rate > 0:
+                # Retrait : octets non couverts par la réserve, plus de quoi la remettre à RESERVE_SECONDS
+                take = max(0.0, nbytes + rate * RESERVE_SECONDS - self._reserve)
+                self._reserve += take - nbytes
+                last = float(state.get("ts") or now)
+                tokens = float(state.get("tokens") or 0)
+                tokens = min(rate * BURST_SECONDS, tokens + rate * max(0.0, now - last)) - take
+                state["tokens"], state["ts"] = tokens, now
+                delay = -tokens / rate if tokens < 0 else 0.0
+            else:
+                self._reserve = 0.0
+            state["rate"], state["peers"] = rate, peers
+            _write_state(f, state)
+        return delay
+
+    def _trim(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > RATE_WINDOW:
+            self._samples.popleft()
+        for job in self._jobs.values():
+            while job.samples and now - job.samples[0][0] > RATE_WINDOW:
+                job.samples.popleft()
+
+    def _measured_rate(self, samples: deque | None = None) -> float:
+        samples = self._samples if samples is None else samples
+        return sum(n for _, n in samples) / RATE_WINDOW
+
+    def report_due(self) -> bool:
+        """True au plus une fois par REPORT_INTERVAL (tous workers confondus)."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_report < REPORT_INTERVAL:
+                return False
+            self._last_report = now
+            return True
+
+    def summary(self) -> str:
+        """Débit effectif agrégé (et limite), puis débit et poids de chaque job actif."""
+        with self._lock:
+            self._trim(time.monotonic())
+            total = self._measured_rate()
+            limit = f" / limite {format_rate(self._rate)}" if self._rate > 0 else " (illimité)"
+            parts = [f"Débit : {format_rate(total)}{limit}"]
+            if self.state_file is not None and self._peer_rate > 0:
+                parts[0] += f", machine {format_rate(total + self._peer_rate)}"
+            for job in self._jobs.values():
+                parts.append(f"{job.label or '?'} {format_rate(self._measured_rate(job.samples))} ×{job.weight:g}")
+            return " | ".join(parts)
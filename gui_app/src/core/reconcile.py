@@ -0,0 +1,173 @@
+"""Maintenance de l'archive : compactage (doublons) et rapprochement avec les fichiers de OUTPUT_DIR."""
+from __future__ import annotations
+
+import datetime
+import os
+import pathlib
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .archive import YOUTUBE_EXTRACTOR, ArchiveStore, get_archive
+from .paths import FILES_INDEX, LOG_DIR, OUTPUT_DIR
+
+# Extensions des fichiers finaux cherchés dans OUTPUT_DIR (.part, .fNNN, miniatures ignorés)
+MEDIA_EXTENSIONS = frozenset({".mp4", ".mkv", ".webm", ".mov", ".m4a", ".mp3", ".opus", ".ogg", ".flac"})
+# Octets lus en début et en fin de fichier pour y trouver l'URL de la vidéo (purl / comment écrits par le
+# post-processeur FFmpegMetadata quand ffmpeg est trouvé ; atome moov en tête avec faststart, sinon en fin)
+TAG_SCAN_BYTES = 1024 * 1024
+
+_URL_ID = re.compile(rb"(?:youtube\.com/(?:watch\?v=|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})")
+# ID entre crochets dans le nom (modèles de sortie « … [%(id)s].%(ext)s »)
+_NAME_ID = re.compile(r"\[([A-Za-z0-9_-]{11})\]")
+_YOUTUBE_PREFIX = YOUTUBE_EXTRACTOR + " "
+# Ajouts à FILES_INDEX depuis les workers (threads) d'un même run
+_index_lock = threading.Lock()
+
+
+@dataclass
+class ReconcileReport:
+    """Résultat de reconcile_archive()."""
+    kept: int = 0
+    duplicates: int = 0
+    # Entrées YouTube sans fichier dans OUTPUT_DIR (retirées si drop_missing)
+    missing: int = 0
+    dropped: int = 0
+    files: int = 0
+    # Fichiers dont la vidéo n'est pas dans l'archive (chemins)
+    untracked: list[str] = field(default_factory=list)
+    # Fichiers sans ID lisible (ni dans FILES_INDEX, ni dans le nom, ni dans les métadonnées)
+    unidentified: int = 0
+    # drop_missing demandé mais refusé : aucun fichier identifié, ou des fichiers sans ID
+    drop_refused: bool = False
+    report_path: pathlib.Path | None = None
+
+
+def _relative_key(path: str | os.PathLike[str], root: pathlib.Path) -> str:
+    """Chemin relatif à root (absolu s'il est ailleurs), séparateurs « / » : clé de FILES_INDEX."""
+    path = os.path.abspath(path)
+    try:
+        return pathlib.Path(path).relative_to(os.path.abspath(root)).as_posix()
+    except ValueError:
+        return pathlib.Path(path).as_posix()
+
+
+def record_file(video_id: str, path: str | os.PathLike[str], root: pathlib.Path = OUTPUT_DIR) -> None:
+    """Note le fichier final d'une vidéo dans FILES_INDEX (appelé une fois le post-traitement terminé)."""
+    line = f"{video_id}\t{_relative_key(path, root)}\n"
+    with _index_lock:
+        with open(FILES_INDEX, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _load_files_index(root: pathlib.Path) -> dict[str, str]:
+    """{chemin relatif: ID} d'après FILES_INDEX ; la dernière ligne d'un chemin l'emporte."""
+    index: dict[str, str] = {}
+    try:
+        with open(FILES_INDEX, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                video_id, sep, path = line.rstrip("\n").partition("\t")
+                if sep and video_id and path:
+                    index[path] = video_id
+    except FileNotFoundError:
+        pass
+    return index
+
+
+def file_video_id(path: pathlib.Path) -> str | None:
+    """ID YouTube d'un fichier : [ID] dans le nom, sinon URL de la vidéo dans les métadonnées (début / fin)."""
+    match = _NAME_ID.search(path.stem)
+    if match:
+        return match.group(1)
+    try:
+        with open(path, "rb") as f:
+            head = f.read(TAG_SCAN_BYTES)
+            match = _URL_ID.search(head)
+            if match is None:
+                size = f.seek(0, os.SEEK_END)
+                if size > TAG_SCAN_BYTES:
+                    f.seek(max(TAG_SCAN_BYTES, size - TAG_SCAN_BYTES))
+                    match = _URL_ID.search(f.read())
+    except OSError:
+        return None
+    return match.group(1).decode("ascii") if match else None
+
+
+def index_output_dir(
+    root: pathlib.Path,
+    progress: Callable[[int], None] | None = None,
+) -> tuple[dict[str, str], list[str]]:
+    """
+    Fichiers médias de root : {ID: premier chemin trouvé} et chemins sans ID lisible. ID pris dans
+    FILES_INDEX (noté au téléchargement), sinon dans le nom ou les métadonnées du fichier.
+    Mémoire proportionnelle au nombre de fichiers sur le disque, pas à la taille de l'archive.
+    """
+    recorded = _load_files_index(root)
+    files: dict[str, str] = {}
+    unidentified: list[str] = []
+    count = 0
+    for directory, _dirs, names in os.walk(root):
+        for name in names:
+            path = pathlib.Path(directory, name)
+            if path.suffix.lower() not in MEDIA_EXTENSIONS:
+                continue
+            video_id = recorded.get(_relative_key(path, root)) or file_video_id(path)
+            if video_id is None:
+                unidentified.append(str(path))
+            else:
+                files.setdefault(video_id, str(path))
+            count += 1
+            if progress is not None and count % 100 == 0:
+                progress(count)
+    return files, unidentified
+
+
+def reconcile_archive(
+    store: ArchiveStore | None = None,
+    output_dir: pathlib.Path = OUTPUT_DIR,
+    *,
+    drop_missing: bool = False,
+    progress: Callable[[str], None] | None = None,
+) -> ReconcileReport:
+    """
+    Indexe les fichiers de output_dir, puis réécrit l'archive sans doublons (ArchiveStore.compact) en
+    notant les entrées sans fichier (retirées si drop_missing) ; liste ensuite les fichiers absents de
+    l'archive. Détail écrit au fil de l'eau dans LOG_DIR/archive_reconcile_<date>.txt.
+    Retrait refusé (drop_refused) si aucun fichier n'est identifié ou si certains n'ont pas d'ID : une
+    entrée « sans fichier » pourrait alors être celle d'un fichier présent.
+    """
+    store = store if store is not None else get_archive()
+    say = progress or (lambda _msg: None)
+    say("Analyse des fichiers téléchargés…")
+    files, unidentified = index_output_dir(output_dir, lambda n: say(f"Analyse des fichiers téléchargés… {n}"))
+    report = ReconcileReport(files=len(files) + len(unidentified), unidentified=len(unidentified))
+    if drop_missing and (not files or unidentified):
+        report.drop_refused = True
+        drop_missing = False
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    report.report_path = LOG_DIR / f"archive_reconcile_{datetime.datetime.now():%Y%m%d_%H%M%S}.txt"
+    with open(report.report_path, "w", encoding="utf-8") as out:
+        out.write(f"Archive : {store.path}\nFichiers : {output_dir}\n\n")
+
+        def drop(entry: str) -> bool:
+            if not entry.startswith(_YOUTUBE_PREFIX) or entry[len(_YOUTUBE_PREFIX):] in files:
+                return False
+            report.missing += 1
+            out.write(f"SANS FICHIER\t{entry}\n")
+            return drop_missing
+
+        say("Compactage de l'archive…")
+        report.kept, report.duplicates, report.dropped = store.compact(drop)
+        for video_id, path in files.items():
+            if not store.has_video(video_id):
+                report.untracked.append(path)
+                out.write(f"HORS ARCHIVE\t{path}\n")
+        for path in unidentified:
+            out.write(f"SANS ID\t{path}\n")
+        out.write(
+            f"\n{report.kept} entrée(s) conservée(s), {report.duplicates} doublon(s) retiré(s), "
+            f"{report.missing} sans fichier ({report.dropped} retirée(s)), {len(report.untracked)} fichier(s) "
+            f"hors archive, {report.unidentified} fichier(s) sans ID\n"
+        )
+    return report
@@ -0,0 +1,146 @@
+"""Relances des vidéos en échec selon la classe d'erreur : backoff exponentiel, attente de nouveaux cookies."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from .cookies import cookies_signature
+
+if TYPE_CHECKING:
+    from .download import VideoJob
+
+# Classes d'erreur (classify_error dans download.py)
+TRANSIENT = "transient"
+BOT_COOKIE = "bot_cookie"
+PERMANENT = "permanent"
+
+# Échec transitoire (réseau, 5xx, 429) : relance après BACKOFF_BASE × 2^(n-1) s (plafonné), tiré entre 50 et 100 %
+BACKOFF_BASE = 15.0
+BACKOFF_MAX = 600.0
+MAX_TRANSIENT_RETRIES = 4
+# Bot-check / cookies : la vidéo attend un changement de cookies.txt / cookies.enc ; une fois le reste du run
+# terminé, l'attente dure au plus COOKIE_WAIT s
+COOKIE_WAIT = 300.0
+MAX_COOKIE_RETRIES = 2
+# Intervalle (s) de vérification des relances dues quand rien d'autre ne tourne
+POLL_INTERVAL = 0.5
+
+
+@dataclass
+class _Waiting:
+    """Vidéo en attente de relance : échéance (transitoire) ou changement de cookies (bot / cookies)."""
+    job: VideoJob
+    message: str
+    due: float = 0.0
+
+
+class RetryScheduler:
+    """
+    File des relances d'un run. schedule() accepte ou refuse la relance d'un échec selon sa classe ;
+    due() rend les vidéos à relancer (échéance passée, ou cookies modifiés depuis l'échec).
+    Une vidéo abandonnée (plus de relance, attente des cookies écoulée, annulation) passe par give_up(job, message),
+    qui la compte en échec. retries : relances programmées par classe (résumé du run).
+    """
+
+    def __init__(
+        self,
+        cancel_event: threading.Event,
+        *,
+        give_up: Callable[[VideoJob, str], None],
+        log: Callable[[str], None] | None = None,
+    ) -> None:
+        self._cancel = cancel_event
+        self._give_up = give_up
+        self._log = log or (lambda _msg: None)
+        self._lock = threading.Lock()
+        self._waiting: list[_Waiting] = []
+        self._deferred: list[_Waiting] = []
+        self._attempts: dict[tuple[str, str, str], int] = {}
+        self._cookie_sig = cookies_signature()
+        self._idle_since: float | None = None
+        # Incrémenté à chaque changement de cookies : les workers recréent leur instance YoutubeDL
+        self.cookie_generation = 0
+        self.retries: dict[str, int] = {TRANSIENT: 0, BOT_COOKIE: 0}
+
+    def schedule(self, job: VideoJob, error_class: str, message: str) -> bool:
+        """True si la vidéo sera relancée (l'échec n'est pas encore compté)."""
+        if error_class == PERMANENT or self._cancel.is_set():
+            return False
+        key = (job.section_url, job.url, error_class)
+        limit = MAX_TRANSIENT_RETRIES if error_class == TRANSIENT else MAX_COOKIE_RETRIES
+        with self._lock:
+            attempt = self._attempts.get(key, 0) + 1
+            if attempt > limit:
+                return False
+            self._attempts[key] = attempt
+            self.retries[error_class] += 1
+            if error_class == TRANSIENT:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                self._waiting.append(_Waiting(job, message, time.monotonic() + delay))
+                self._log(f"↻ Nouvelle tentative dans {delay:.0f}s ({attempt}/{limit}) : {job.url}")
+            else:
+                self._deferred.append(_Waiting(job, message))
+                self._log(f"↻ En attente de nouveaux cookies ({attempt}/{limit}) : {job.url}")
+        return True
+
+    def pending(self) -> bool:
+        with self._lock:
+            return bool(self._waiting or self._deferred) and not self._cancel.is_set()
+
+    def due(self, idle: bool) -> list[VideoJob]:
+        """
+        Vidéos à relancer maintenant. idle : plus aucun job en cours ni en attente d'exécution ; le délai
+        COOKIE_WAIT ne court que dans cet état (les autres vidéos peuvent encore passer sans cookies neufs).
+        """
+        if self._cancel.is_set():
+            return []
+        now = time.monotonic()
+        expired: list[_Waiting] = []
+        with self._lock:
+            ready = [w for w in self._waiting if w.due <= now]
+            self._waiting = [w for w in self._waiting if w.due > now]
+            if self._deferred:
+                sig = cookies_signature()
+                if sig != self._cookie_sig:
+                    self._cookie_sig = sig
+                    self.cookie_generation += 1
+                    self._log(f"↻ Cookies modifiés : {len(self._deferred)} vidéo(s) relancée(s)")
+                    ready.extend(self._deferred)
+                    self._deferred = []
+                    self._idle_since = None
+                elif idle and not self._waiting and not ready:
+                    if self._idle_since is None:
+                        self._idle_since = now
+                        self._log(
+                            f"En attente de nouveaux cookies pour {len(self._deferred)} vidéo(s) "
+                            f"(mettez à jour cookies.txt ; abandon dans {COOKIE_WAIT / 60:.0f} min)"
+                        )
+                    elif now - self._idle_since >= COOKIE_WAIT:
+                        expired, self._deferred = self._deferred, []
+                        self._idle_since = None
+                else:
+                    self._idle_since = None
+        for w in expired:
+            self._give_up(w.job, w.message)
+        return [w.job for w in ready]
+
+    def wait_due(self) -> list[VideoJob]:
+        """Bloque jusqu'à la prochaine relance due ; [] s'il n'y a plus rien à relancer (ou run annulé)."""
+        while True:
+            ready = self.due(idle=True)
+            if ready:
+                return ready
+            if not self.pending():
+                return []
+            self._cancel.wait(POLL_INTERVAL)
+
+    def abandon(self) -> None:
+        """Fin du run : les vidéos encore en attente de relance comptent en échec."""
+        with self._lock:
+            remaining = self._waiting + self._deferred
+            self._waiting, self._deferred = [], []
+        for w in remaining:
+            self._give_up(w.job, w.message)
@@ -0,0 +1,178 @@
+"""Post-traitement en une passe : fusion des flux, métadonnées et miniature dans un seul appel ffmpeg."""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from yt_dlp.postprocessor import EmbedThumbnailPP, FFmpegMergerPP, FFmpegMetadataPP  # type: ignore[import-untyped]
+from yt_dlp.postprocessor.ffmpeg import (  # type: ignore[import-untyped]
+    FFmpegPostProcessor,
+    FFmpegThumbnailsConvertorPP,
+)
+from yt_dlp.utils import prepend_extension, replace_extension, traverse_obj  # type: ignore[import-untyped]
+
+# Conteneurs où la miniature s'intègre comme flux attached_pic (méthode ffmpeg d'EmbedThumbnail)
+SINGLE_PASS_EXTS = ("mp4", "m4a", "m4v", "mov")
+# Post-processeurs configurés (option postprocessors, add_post_processor) que SinglePassPP prend en charge
+_EMBED_PPS = (FFmpegMetadataPP, EmbedThumbnailPP)
+
+
+def detach_embed_pps(ydl: Any) -> list[Any]:
+    """
+    Retire de la chaîne post_process de ydl les FFmpegMetadata / EmbedThumbnail configurés et les garde
+    pour SinglePassPP (ydl._single_pass_pps). Rien n'est retiré si la chaîne contient d'autres
+    post-processeurs (leur ordre serait changé). Sans effet au second appel.
+    """
+    if not hasattr(ydl, "_single_pass_pps"):
+        chain = ydl._pps["post_process"]
+        embed = [pp for pp in chain if isinstance(pp, _EMBED_PPS)]
+        if len(embed) != len(chain):
+            embed = []
+        chain[:] = [pp for pp in chain if pp not in embed]
+        ydl._single_pass_pps = embed
+    return ydl._single_pass_pps
+
+
+class SinglePassPP(FFmpegPostProcessor):
+    """
+    Remplace la chaîne FFmpegMerger → FFmpegMetadata → EmbedThumbnail, où chaque étape réécrit le mp4 :
+    flux à fusionner (ou fichier unique), miniature et chapitres sont les entrées d'un seul ffmpeg, mêmes
+    options que la chaîne. Seules les étapes configurées sur le YoutubeDL (detach_embed_pps) sont faites.
+    Autres conteneurs : la chaîne est exécutée telle quelle.
+    info["__io_saved"] : octets lus + écrits évités par rapport à la chaîne.
+    """
+
+    def run(self, info: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+        embed = detach_embed_pps(self._downloader)
+        metadata_pp = next((pp for pp in embed if isinstance(pp, FFmpegMetadataPP)), None)
+        thumbnail_pp = next((pp for pp in embed if isinstance(pp, EmbedThumbnailPP)), None)
+        if info.get("ext") not in SINGLE_PASS_EXTS:
+            return self._run_chain(info, embed)
+        if not self.available:
+            self.report_warning("ffmpeg introuvable : métadonnées et miniature non intégrées")
+            return [], info
+        filename = info["filepath"]
+        merge = list(info.get("__files_to_merge") or [])
+        thumbnail_idx = self._thumbnail_index(info) if thumbnail_pp is not None else None
+        # Passes de la chaîne configurée : fusion, métadonnées (au moins -write_id3v1), miniature
+        metadata = metadata_pp is not None and bool(
+            metadata_pp._add_metadata or (metadata_pp._add_chapters and info.get("chapters"))
+        )
+        passes = bool(merge) + metadata + (thumbnail_idx is not None)
+        if passes <= 1:
+            # Une seule réécriture du fichier : rien à regrouper
+            return self._run_chain(info, embed)
+        inputs = merge or [filename]
+        mtime = None if merge else os.stat(filename).st_mtime
+        options, n_streams = self._stream_opts(info, merge, filename)
+        thumbnail = self._thumbnail(info, thumbnail_idx) if thumbnail_idx is not None else None
+        if thumbnail is not None:
+            options.extend(["-map", str(len(inputs)), f"-disposition:{n_streams}", "attached_pic"])
+            inputs = [*inputs, thumbnail[0]]
+        metadata_filename = None
+        if metadata:
+            metadata_pp._fixup_chapters(info)  # type: ignore[union-attr]
+            if metadata_pp._add_chapters and info.get("chapters"):
+                metadata_filename = replace_extension(filename, "meta")
+                # Écrit le fichier de chapitres ; l'index d'entrée est celui de la commande unique
+                for _ in metadata_pp._get_chapter_opts(info["chapters"], metadata_filename):
+                    pass
+                options.extend(["-map_metadata", str(len(inputs))])
+                inputs = [*inputs, metadata_filename]
+            if metadata_pp._add_metadata:
+                for opts in metadata_pp._get_metadata_opts(info):
+                    options.extend(opts)
+
+        temp_filename = prepend_extension(filename, "temp")
+        steps = [name for name, done in (("fusion", merge), ("métadonnées", metadata), ("miniature", thumbnail)) if done]
+        self.to_screen(f'{", ".join(steps).capitalize()} en une passe : "{filename}"')
+        self.run_ffmpeg_multiple_files(inputs, temp_filename, options)
+        os.replace(temp_filename, filename)
+        if mtime is not None:
+            self.try_utime(filename, mtime, mtime)
+        self._delete_downloaded_files(metadata_filename)
+        if thumbnail is not None:
+            # Comme EmbedThumbnail : miniature d'origine gardée avec already_have_thumbnail (--write-thumbnail)
+            converted = thumbnail[0] != thumbnail[1]
+            keep = thumbnail_pp._already_have_thumbnail  # type: ignore[union-attr]
+            self._delete_downloaded_files(
+                thumbnail[0] if converted or not keep else None,
+                thumbnail[1] if converted and not keep else None,
+                info=info,
+            )
+
+        # Chaque passe évitée aurait relu et réécrit le fichier final en entier
+        saved = 2 * (passes - 1) * os.path.getsize(filename)
+        info["__io_saved"] = saved
+        self.to_screen(f"E/S évitées : {saved / (1024 * 1024):.1f} Mo ({passes - 1} réécriture(s) du fichier)")
+        return merge, info
+
+    def _stream_opts(self, info: dict[str, Any], merge: list[str], filename: str) -> tuple[list[str], int]:
+        """Options de copie des flux (comme FFmpegMerger, sinon FFmpegMetadata) et nombre de flux en sortie."""
+        if merge:
+            options = ["-c", "copy"]
+            audio_streams = 0
+            for i, fmt in enumerate(info["requested_formats"]):
+                if fmt.get("acodec") != "none":
+                    options.extend(["-map", f"{i}:a:0"])
+                    if fmt["protocol"].startswith("m3u8") and self.get_audio_codec(fmt["filepath"]) == "aac":
+                        options.extend([f"-bsf:a:{audio_streams}", "aac_adtstoasc"])
+                    audio_streams += 1
+                if fmt.get("vcodec") != "none":
+                    options.extend(["-map", f"{i}:v:0"])
+            return options, options.count("-map")
+        options = list(self.stream_copy_opts(ext=info["ext"]))
+        n_streams = 0
+        for i, stream in enumerate(self.get_metadata_object(filename)["streams"]):
+            if traverse_obj(stream, ("disposition", "attached_pic")) == 1:
+                # Ancienne pochette remplacée, comme EmbedThumbnail
+                options.extend(["-map", f"-0:{i}"])
+            elif stream.get("codec_type") != "data":
+                n_streams += 1
+        return options, n_streams
+
+    @staticmethod
+    def _thumbnail_index(info: dict[str, Any]) -> int | None:
+        """Index (négatif) de la dernière miniature écrite sur disque, comme EmbedThumbnail ; None sinon."""
+        thumbnails = info.get("thumbnails") or []
+        idx = next((-i for i, t in enumerate(thumbnails[::-1], 1) if t.get("filepath")), None)
+        if idx is None or not os.path.exists(thumbnails[idx]["filepath"]):
+            return None
+        return idx
+
+    def _thumbnail(self, info: dict[str, Any], idx: int) -> tuple[str, str]:
+        """(miniature jpg / png à intégrer, fichier d'origine)."""
+        convertor = FFmpegThumbnailsConvertorPP(self._downloader)
+        convertor.fixup_webp(info, idx)
+        original = thumbnail = info["thumbnails"][idx]["filepath"]
+        if os.path.splitext(thumbnail)[1][1:] not in ("jpg", "jpeg", "png"):
+            thumbnail = convertor.convert_thumbnail(thumbnail, "png")
+        return thumbnail, original
+
+    def _run_chain(self, info: dict[str, Any], embed: list[Any]) -> tuple[list[str], dict[str, Any]]:
+        """Chaîne configurée telle quelle : fusion s'il y a lieu, puis métadonnées / miniature, une passe chacune."""
+        files: list[str] = []
+        pps = [FFmpegMergerPP(self._downloader)] if info.get("__files_to_merge") else []
+        for pp in [*pps, *embed]:
+            deleted, info = pp.run(info)
+            files.extend(deleted)
+        return files, info
+
+
+def use_single_pass(ydl: Any, info: dict[str, Any]) -> None:
+    """
+    Met SinglePassPP à la place de FFmpegMerger dans les post-processeurs de la vidéo (en fin de liste
+    sinon). Sans effet si ydl n'a ni FFmpegMetadata ni EmbedThumbnail configuré : rien à regrouper.
+    """
+    if not detach_embed_pps(ydl):
+        return
+    pps = info.setdefault("__postprocessors", [])
+    merger = next((i for i, pp in enumerate(pps) if isinstance(pp, FFmpegMergerPP)), None)
+    if merger is not None:
+        pps[merger] = SinglePassPP(ydl)
+    else:
+        pps.append(SinglePassPP(ydl))
+
+
+def ffmpeg_available(ydl: Any) -> bool:
+    return FFmpegPostProcessor(ydl).available
@@ -0,0 +1,120 @@
+"""Remux en flux : ffmpeg lit directement les flux d'un format fusionné et écrit le mp4 final, sans fichiers .fNNN."""
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+import time
+from typing import Any
+
+from yt_dlp.postprocessor.ffmpeg import EXT_TO_OUT_FORMATS, FFmpegPostProcessor  # type: ignore[import-untyped]
+from yt_dlp.utils import DownloadCancelled, Popen  # type: ignore[import-untyped]
+
+# Protocoles lus directement par ffmpeg (flux DASH YouTube : URLs https simples, pas de manifeste)
+STREAM_PROTOCOLS = ("http", "https")
+# Intervalle (s) de relevé de la taille écrite : progression et prise en compte de l'annulation
+POLL_INTERVAL = 0.5
+
+
+class StreamRemuxError(Exception):
+    """ffmpeg s'est arrêté avant la fin (connexion coupée, flux refusé…) : rien n'a été conservé."""
+
+
+def can_stream(info: dict[str, Any]) -> bool:
+    """Format fusionné dont tous les flux sont des URLs http(s) directes."""
+    formats = info.get("requested_formats") or []
+    return len(formats) > 1 and all(f.get("url") and f.get("protocol") in STREAM_PROTOCOLS for f in formats)
+
+
+def _ffmpeg_args(ydl: Any, info: dict[str, Any], output: str) -> list[str]:
+    """Une entrée par flux (cookies et en-têtes de la session yt-dlp), copie des flux comme FFmpegMerger."""
+    ffpp = FFmpegPostProcessor(ydl)
+    args = [ffpp.executable, "-y", "-nostdin", "-hide_banner", "-loglevel", "error"]
+    maps: list[str] = []
+    for i, fmt in enumerate(info["requested_formats"]):
+        url = fmt["url"]
+        cookies = ydl.cookiejar.get_cookies_for_url(url)
+        if cookies:
+            args.extend(["-cookies", "".join(
+                f"{c.name}={c.value}; path={c.path}; domain={c.domain};\r\n" for c in cookies
+            )])
+        headers = fmt.get("http_headers") or info.get("http_headers")
+        if headers:
+            args.extend(["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())])
+        args.extend(["-i", url])
+        if fmt.get("acodec") != "none":
+            maps.extend(["-map", f"{i}:a:0"])
+        if fmt.get("vcodec") != "none":
+            maps.extend(["-map", f"{i}:v:0"])
+    if info["ext"] in ("mp4", "mov", "m4a"):
+        # Index en tête de fichier, comme les fichiers fusionnés par FFmpegMerger
+        maps.extend(["-movflags", "+faststart"])
+    out_format = EXT_TO_OUT_FORMATS.get(info["ext"], info["ext"])
+    return [*args, "-c", "copy", *maps, "-f", out_format, ffpp._ffmpeg_filename_argument(output)]
+
+
+def _hook(ydl: Any, status: dict[str, Any]) -> None:
+    for ph in ydl._progress_hooks:
+        ph(status)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def stream_remux(ydl: Any, filename: str, info: dict[str, Any], cancel_event: threading.Event) -> int:
+    """
+    Flux du format fusionné lus et multiplexés par un seul ffmpeg vers filename (via filename.part) ;
+    progression par les progress hooks de ydl (taille écrite). Retourne la taille finale.
+    Lève StreamRemuxError si ffmpeg échoue, DownloadCancelled à l'annulation (ffmpeg arrêté, .part supprimé).
+    """
+    part = f"{filename}.part"
+    total = sum(f.get("filesize") or f.get("filesize_approx") or 0 for f in info["requested_formats"]) or None
+    started = time.monotonic()
+    proc = Popen(
+        _ffmpeg_args(ydl, info, part),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    errors: list[str] = []
+    reader = threading.Thread(target=lambda: errors.extend(proc.stderr), name="ffmpeg-stderr", daemon=True)
+    reader.start()
+    try:
+        while proc.poll() is None:
+            if cancel_event.is_set():
+                raise DownloadCancelled("Téléchargement annulé")
+            written = os.path.getsize(part) if os.path.exists(part) else 0
+            _hook(ydl, {
+                "status": "downloading",
+                "filename": filename,
+                "downloaded_bytes": written,
+                "total_bytes_estimate": total,
+                "elapsed": time.monotonic() - started,
+                "info_dict": info,
+            })
+            cancel_event.wait(POLL_INTERVAL)
+    except BaseException:
+        proc.kill(timeout=None)
+        _remove(part)
+        raise
+    reader.join()
+    if proc.returncode != 0:
+        _remove(part)
+        detail = next((line.strip() for line in reversed(errors) if line.strip()), "")
+        raise StreamRemuxError(detail or f"ffmpeg a quitté avec le code {proc.returncode}")
+    os.replace(part, filename)
+    size = os.path.getsize(filename)
+    _hook(ydl, {
+        "status": "finished",
+        "filename": filename,
+        "downloaded_bytes": size,
+        "total_bytes": size,
+        "elapsed": time.monotonic() - started,
+        "info_dict": info,
+    })
+    return size
@@ -21,20 +21,25 @@ from PySide6.QtWidgets import (
     QListWidget,
     QListWidgetItem,
     QCheckBox,
+    QSpinBox,
+    QDoubleSpinBox,
     QProgressBar,
     QTextEdit,
     QMessageBox,
     QFrame,
     QScrollArea,
+    QFileDialog,
 )
-from PySide6.QtCore import Qt, QThread, Signal, Slot
+from PySide6.QtCore import QSettings, Qt, QThread, Signal, Slot
 from PySide6.QtGui import QFont, QPalette, QColor
 
 from src.core.paths import LOG_DIR, OUTPUT_DIR, ARCHIVE_FILE
 from src.gui.styles import get_effective_theme, get_theme_preference, get_theme_colors
+from src.core.archive import get_archive
 from src.core.urls import normalize_channel_url, is_youtube_video_url
-from src.core.channel import get_channel_sections
+from src.core.channel import CACHE_TTL, iter_channel_sections, load_cached_sections
 from src.core.download import run_download, DownloadResult, get_error_advice
+from src.core.ratelimit import RateLimiter
 
 # Codes ANSI à retirer pour l'affichage (au cas où)
 _ANSI_RE = re.compile(r"\033\[[0-9;]+m|\x1b\[[0-9;]+m|\[[0-9;]+m")
@@ -50,18 +55,47 @@ def _is_progress_line(text: str) -> bool:
     return bool(t and re.match(r"^\s*[\d.,]+\s*%?\s*[—\-]\s*", t))
 
 
+def _format_age(seconds: float) -> str:
+    """Âge lisible d'une analyse en cache (« 5 min », « 3 h », « 2 j »)."""
+    if seconds < 3600:
+        return f"{max(1, int(seconds // 60))} min"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h"
+    return f"{int(seconds // 86400)} j"
+
+
+def _section_count_text(section: dict) -> str:
+    """
+    « N vidéo(s) », « ≈ N vidéo(s) » si le nombre est annoncé par YouTube plutôt que compté,
+    « K nouvelle(s) / N » si comparé à l'archive, « ? » si erreur.
+    """
+    if section["count"] < 0:
+        return "?"
+    prefix = "" if section.get("exact", True) else "≈ "
+    if section.get("new") is not None:
+        return f"{section['new']} nouvelle(s) / {prefix}{section['count']}"
+    return f"{prefix}{section['count']} vidéo(s)"
+
+
 class AnalyzeWorker(QThread):
-    """Thread pour analyser la chaîne sans bloquer la GUI."""
-    finished_signal = Signal(list, str)  # sections, error_message (vide si ok)
+    """Thread pour analyser la chaîne sans bloquer la GUI ; chaque section est signalée dès qu'elle est comptée."""
+    section_signal = Signal(dict)  # section (dans l'ordre d'achèvement)
+    finished_signal = Signal(list, str)  # sections dans l'ordre du menu, error_message (vide si ok)
 
-    def __init__(self, channel_base: str, parent: QWidget | None = None) -> None:
+    def __init__(self, channel_base: str, count_new: bool = False, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._channel_base = channel_base
+        self._count_new = count_new
 
     def run(self) -> None:
         try:
-            sections = get_channel_sections(self._channel_base)
-            self.finished_signal.emit(sections, "")
+            # Par URL : une playlist est produite deux fois avec le décompte des nouvelles vidéos
+            sections: dict[str, dict[str, Any]] = {}
+            archive = get_archive() if self._count_new else None
+            for section in iter_channel_sections(self._channel_base, archive):
+                sections[section["url"]] = section
+                self.section_signal.emit(section)
+            self.finished_signal.emit(sorted(sections.values(), key=lambda s: s["position"]), "")
         except Exception as e:
             self.finished_signal.emit([], str(e))
 
@@ -75,15 +109,64 @@ class DownloadWorker(QThread):
         self,
         urls: list[str],
         parent: QWidget | None = None,
+        *,
+        max_workers: int = 1,
+        extract_workers: int = 0,
+        queue_depth: int = 4,
+        backend: str = "thread",
+        rate_limiter: RateLimiter | None = None,
+        adaptive: bool = False,
+        auto_tune: bool = False,
+        parallel_components: bool = False,
+        resume: bool = False,
+        retry: bool = False,
+        postprocess_workers: int = 0,
+        single_pass: bool = False,
+        stream_remux: bool = False,
+        scratch_dir: str = "",
+        dedup: bool = False,
     ) -> None:
         super().__init__(parent)
         self._urls = urls
+        self._rate_limiter = rate_limiter
+        self._adaptive = adaptive
+        self._auto_tune = auto_tune
+        self._parallel_components = parallel_components
+        self._resume = resume
+        self._retry = retry
+        self._postprocess_workers = postprocess_workers
+        self._single_pass = single_pass
+        self._stream_remux = stream_remux
+        self._scratch_dir = scratch_dir
+        self._dedup = dedup
+        self._max_workers = max_workers
+        self._extract_workers = extract_workers
+        self._queue_depth = queue_depth
+        self._backend = backend
 
     def run(self) -> None:
         def callback(msg: str, pct: float, status: str) -> None:
             self.progress_signal.emit(msg, pct, status)
 
-        result = run_download(self._urls, progress_callback=callback)
+        result = run_download(
+            self._urls,
+            progress_callback=callback,
+            max_workers=self._max_workers,
+            extract_workers=self._extract_workers,
+            queue_depth=self._queue_depth,
+            backend=self._backend,
+            rate_limit=self._rate_limiter,
+            adaptive=self._adaptive,
+            auto_tune=self._auto_tune,
+            parallel_components=self._parallel_components,
+            resume=self._resume,
+            retry=self._retry,
+            postprocess_workers=self._postprocess_workers,
+            single_pass=self._single_pass,
+            stream_remux=self._stream_remux,
+            scratch_dir=self._scratch_dir or None,
+            dedup=self._dedup,
+        )
         self.finished_signal.emit(result)
 
     @property
@@ -97,7 +180,11 @@ class DownloadViewWidget(QWidget):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._sections: list[dict[str, Any]] = []
+        # Chaîne dont les sections sont affichées (actualisation en place si on réanalyse la même)
+        self._sections_channel = ""
+        self._previous_sections: list[dict[str, Any]] = []
         self._worker: DownloadWorker | None = None
+        self._rate_limiter: RateLimiter | None = None
         self._analyze_worker: AnalyzeWorker | None = None
         self._build_ui()
 
@@ -138,11 +225,38 @@ class DownloadViewWidget(QWidget):
         self._edit_channel.setPlaceholderText("https://www.youtube.com/@... ou @NomDeLaChaîne")
         self._btn_analyze = QPushButton("Analyser la chaîne")
         self._btn_analyze.setProperty("class", "primary")
-        self._btn_analyze.clicked.connect(self._on_analyze)
+        self._btn_analyze.clicked.connect(lambda: self._on_analyze(False))
+        self._btn_refresh = QPushButton("Forcer l'actualisation")
+        self._btn_refresh.setToolTip("Réanalyse la chaîne sans passer par le cache ; les nombres sont mis à jour dans la liste.")
+        self._btn_refresh.clicked.connect(lambda: self._on_analyze(True))
         row_channel.addWidget(lbl_channel)
         row_channel.addWidget(self._edit_channel, 1)
         row_channel.addWidget(self._btn_analyze)
+        row_channel.addWidget(self._btn_refresh)
         ly_channel.addLayout(row_channel)
+        row_cache = QHBoxLayout()
+        row_cache.addWidget(QLabel("Analyse en cache valable :"))
+        self._spin_cache_ttl = QSpinBox()
+        self._spin_cache_ttl.setRange(0, 168)
+        self._spin_cache_ttl.setSuffix(" h")
+        self._spin_cache_ttl.setValue(int(QSettings().value("channel_cache_ttl_hours", CACHE_TTL // 3600)))
+        self._spin_cache_ttl.setToolTip(
+            "Sections d'une chaîne déjà analysée affichées tout de suite depuis le cache ; au-delà de cette durée, "
+            "elles sont réanalysées en arrière-plan et mises à jour dans la liste. 0 = toujours réanalyser."
+        )
+        self._spin_cache_ttl.valueChanged.connect(lambda v: QSettings().setValue("channel_cache_ttl_hours", v))
+        row_cache.addWidget(self._spin_cache_ttl)
+        row_cache.addSpacing(20)
+        self._chk_count_new = QCheckBox("Compter les nouvelles vidéos (archive)")
+        self._chk_count_new.setChecked(QSettings().value("count_new_videos", False, type=bool))
+        self._chk_count_new.setToolTip(
+            "Compare les vidéos de chaque section à l'archive et affiche « nouvelles / total ». Les nombres "
+            "annoncés s'affichent d'abord ; les pages des playlists sont ensuite parcourues en arrière-plan."
+        )
+        self._chk_count_new.toggled.connect(lambda v: QSettings().setValue("count_new_videos", v))
+        row_cache.addWidget(self._chk_count_new)
+        row_cache.addStretch()
+        ly_channel.addLayout(row_cache)
         layout.addWidget(gb_channel)
 
         # Bloc vidéo (URL seule)
@@ -181,23 +295,159 @@ class DownloadViewWidget(QWidget):
         self._btn_select_all.clicked.connect(self._select_all_sections)
         self._btn_deselect_all = QPushButton("Tout désélectionner")
         self._btn_deselect_all.clicked.connect(self._deselect_all_sections)
+        self._btn_select_new = QPushButton("Sélectionner les nouveautés")
+        self._btn_select_new.setToolTip(
+            "Coche les sections contenant des vidéos absentes de l'archive (selon la dernière analyse) "
+            "et décoche les autres."
+        )
+        self._btn_select_new.clicked.connect(self._select_new_sections)
         ly_sel.addWidget(self._btn_select_all)
         ly_sel.addWidget(self._btn_deselect_all)
+        ly_sel.addWidget(self._btn_select_new)
         ly_sel.addStretch()
+        self._chk_dedup = QCheckBox("Dédoublonner entre sections")
+        # Décoché par défaut ; choix mémorisé
+        self._chk_dedup.setChecked(QSettings().value("dedup_sections", False, type=bool))
+        self._chk_dedup.toggled.connect(lambda v: QSettings().setValue("dedup_sections", v))
+        self._chk_dedup.setToolTip(
+            "Une vidéo présente dans plusieurs onglets / playlists n'est téléchargée qu'une fois ; "
+            "ses autres dossiers reçoivent un lien vers le fichier (copie si le lien est impossible)."
+        )
+        ly_sel.addWidget(self._chk_dedup)
         ly_content.addLayout(ly_sel)
         layout.addWidget(gb_content)
 
         # —— Bouton principal Télécharger ——
         ly_dl = QHBoxLayout()
         ly_dl.addStretch()
+        ly_dl.addWidget(QLabel("Téléchargements parallèles :"))
+        self._spin_workers = QSpinBox()
+        self._spin_workers.setRange(1, 8)
+        self._spin_workers.setValue(1)
+        self._spin_workers.setToolTip("Nombre de vidéos téléchargées en même temps (1 = une à la fois).")
+        ly_dl.addWidget(self._spin_workers)
+        self._chk_adaptive = QCheckBox("Adaptatif")
+        self._chk_adaptive.setToolTip(
+            "Part d'un téléchargement et en ajoute (jusqu'au nombre choisi) tant que le débit total progresse ; "
+            "réduit et marque une pause en cas de blocage (bot, HTTP 429)."
+        )
+        ly_dl.addWidget(self._chk_adaptive)
+        ly_dl.addSpacing(16)
+        ly_dl.addWidget(QLabel("Extractions anticipées :"))
+        self._spin_extract = QSpinBox()
+        self._spin_extract.setRange(0, 4)
+        self._spin_extract.setValue(0)
+        self._spin_extract.setToolTip(
+            "Pipeline : nombre d'extractions (page, player, challenge) menées pendant les téléchargements (0 = désactivé)."
+        )
+        ly_dl.addWidget(self._spin_extract)
+        ly_dl.addWidget(QLabel("File :"))
+        self._spin_queue = QSpinBox()
+        self._spin_queue.setRange(1, 16)
+        self._spin_queue.setValue(4)
+        self._spin_queue.setToolTip("Nombre maximal de vidéos extraites en attente de téléchargement.")
+        ly_dl.addWidget(self._spin_queue)
+        ly_dl.addWidget(QLabel("Post-traitement :"))
+        self._spin_postproc = QSpinBox()
+        self._spin_postproc.setRange(0, 8)
+        self._spin_postproc.setValue(0)
+        self._spin_postproc.setSpecialValueText("Intégré")
+        self._spin_postproc.setToolTip(
+            "Processus dédiés à la fusion audio/vidéo : le téléchargement suivant démarre sans attendre la fusion "
+            "(Intégré = fusion dans le téléchargement)."
+        )
+        ly_dl.addWidget(self._spin_postproc)
+        self._chk_single_pass = QCheckBox("Une passe")
+        self._chk_single_pass.setToolTip(
+            "Fusion, métadonnées et miniature écrites par un seul appel ffmpeg (le mp4 n'est écrit qu'une fois)."
+        )
+        ly_dl.addWidget(self._chk_single_pass)
+        self._chk_stream_remux = QCheckBox("Remux en flux")
+        self._chk_stream_remux.setToolTip(
+            "ffmpeg lit directement les flux audio et vidéo et écrit le mp4 final, sans fichiers intermédiaires "
+            "(repli automatique sur le téléchargement classique en cas d'échec ; débit max non appliqué)."
+        )
+        ly_dl.addWidget(self._chk_stream_remux)
+        self._chk_process = QCheckBox("Processus séparés")
+        self._chk_process.setToolTip(
+            "Exécute chaque téléchargement dans un processus dédié (évite la contention du GIL avec plusieurs téléchargements)."
+        )
+        ly_dl.addWidget(self._chk_process)
+        ly_dl.addStretch()
+        layout.addLayout(ly_dl)
+
+        ly_rate = QHBoxLayout()
+        ly_rate.addStretch()
+        ly_rate.addWidget(QLabel("Débit max :"))
+        self._spin_rate = QDoubleSpinBox()
+        self._spin_rate.setRange(0.0, 1000.0)
+        self._spin_rate.setSingleStep(0.5)
+        self._spin_rate.setDecimals(1)
+        self._spin_rate.setSuffix(" Mo/s")
+        self._spin_rate.setSpecialValueText("Illimité")
+        self._spin_rate.setToolTip("Débit total de tous les téléchargements en cours (modifiable pendant le téléchargement).")
+        self._spin_rate.valueChanged.connect(self._on_rate_changed)
+        ly_rate.addWidget(self._spin_rate)
+        self._chk_rate_shared = QCheckBox("Commun à toute la machine")
+        self._chk_rate_shared.setToolTip(
+            "Partage la limite avec les autres instances (GUI, CLI) lancées sur ce poste."
+        )
+        ly_rate.addWidget(self._chk_rate_shared)
+        self._chk_auto_tune = QCheckBox("Réglage fragments")
+        self._chk_auto_tune.setToolTip(
+            "Choisit fragments parallèles et taille des blocs par format d'après les débits mesurés (voir logs/yt_session.log)."
+        )
+        ly_rate.addWidget(self._chk_auto_tune)
+        self._chk_parallel_components = QCheckBox("Audio + vidéo en parallèle")
+        self._chk_parallel_components.setToolTip(
+            "Télécharge en même temps les flux vidéo et audio de chaque vidéo (fusion dès que les deux sont reçus)."
+        )
+        ly_rate.addWidget(self._chk_parallel_components)
+        self._chk_resume = QCheckBox("Reprise après arrêt")
+        # Décoché par défaut ; choix mémorisé
+        self._chk_resume.setChecked(QSettings().value("resume_jobs", False, type=bool))
+        self._chk_resume.toggled.connect(lambda v: QSettings().setValue("resume_jobs", v))
+        self._chk_resume.setToolTip(
+            "Mémorise chaque vidéo (jobs.sqlite3) : après un plantage ou une fermeture, le téléchargement "
+            "des mêmes sections reprend aux vidéos restantes."
+        )
+        ly_rate.addWidget(self._chk_resume)
+        self._chk_retry = QCheckBox("Relances auto")
+        # Décoché par défaut ; choix mémorisé
+        self._chk_retry.setChecked(QSettings().value("auto_retry", False, type=bool))
+        self._chk_retry.toggled.connect(lambda v: QSettings().setValue("auto_retry", v))
+        self._chk_retry.setToolTip(
+            "Relance les vidéos en échec : erreur réseau → nouvel essai différé ; bot / cookies → "
+            "attente de nouveaux cookies (import Firefox ou cookies.txt mis à jour)."
+        )
+        ly_rate.addWidget(self._chk_retry)
+        ly_rate.addSpacing(16)
         self._btn_download = QPushButton("Télécharger la sélection")
         self._btn_download.setProperty("class", "success")
         self._btn_download.setMinimumHeight(40)
         self._btn_download.setMinimumWidth(220)
         self._btn_download.clicked.connect(self._on_download)
-        ly_dl.addWidget(self._btn_download)
-        ly_dl.addStretch()
-        layout.addLayout(ly_dl)
+        ly_rate.addWidget(self._btn_download)
+        ly_rate.addStretch()
+        layout.addLayout(ly_rate)
+
+        ly_scratch = QHBoxLayout()
+        ly_scratch.addStretch()
+        ly_scratch.addWidget(QLabel("Dossier de travail :"))
+        self._edit_scratch = QLineEdit(str(QSettings().value("scratch_dir", "") or ""))
+        self._edit_scratch.setPlaceholderText("Aucun (écriture directe dans downloads)")
+        self._edit_scratch.setMinimumWidth(320)
+        self._edit_scratch.setToolTip(
+            "Disque local rapide pour les fichiers en cours (.part, flux, fusion) ; chaque vidéo terminée est "
+            "ensuite déplacée en arrière-plan vers downloads. Ignoré avec « Processus séparés »."
+        )
+        self._edit_scratch.editingFinished.connect(self._on_scratch_changed)
+        ly_scratch.addWidget(self._edit_scratch)
+        btn_scratch = QPushButton("Parcourir…")
+        btn_scratch.clicked.connect(self._on_browse_scratch)
+        ly_scratch.addWidget(btn_scratch)
+        ly_scratch.addStretch()
+        layout.addLayout(ly_scratch)
 
         # —— Progression et log ——
         gb_progress = QGroupBox("Progression")
@@ -215,6 +465,18 @@ class DownloadViewWidget(QWidget):
         self._progress_bar.setValue(0)
         self._progress_bar.setFormat("%p%")
         ly_progress.addWidget(self._progress_bar)
+        self._lbl_stats = QLabel()
+        self._lbl_stats.setProperty("class", "muted")
+        self._lbl_stats.setStyleSheet("font-size: 11px;")
+        self._lbl_stats.setWordWrap(True)
+        self._lbl_stats.hide()
+        ly_progress.addWidget(self._lbl_stats)
+        self._lbl_rate = QLabel()
+        self._lbl_rate.setProperty("class", "muted")
+        self._lbl_rate.setStyleSheet("font-size: 11px;")
+        self._lbl_rate.setWordWrap(True)
+        self._lbl_rate.hide()
+        ly_progress.addWidget(self._lbl_rate)
         log_label = QLabel("Journal :")
         log_label.setProperty("class", "muted")
         log_label.setStyleSheet("font-size: 11px;")
@@ -287,7 +549,10 @@ class DownloadViewWidget(QWidget):
                 f"Impossible d'ouvrir le dossier : {e}",
             )
 
-    def _on_analyze(self) -> None:
+    def _on_analyze(self, force: bool = False) -> None:
+        """Sections en cache affichées tout de suite ; réanalyse en arrière-plan si périmées, absentes ou si force."""
+        if self._analyze_worker is not None:
+            return
         url_or_handle = self._edit_channel.text().strip()
         if not url_or_handle:
             QMessageBox.warning(
@@ -298,11 +563,29 @@ class DownloadViewWidget(QWidget):
             return
         channel_base = normalize_channel_url(url_or_handle)
         self._edit_channel.setText(channel_base)
-        self._log.append(f"Analyse de la chaîne : {channel_base}…")
+        if channel_base != self._sections_channel:
+            self._list_sections.clear()
+            self._sections = []
+            self._sections_channel = channel_base
+        ttl = self._spin_cache_ttl.value() * 3600
+        cached = load_cached_sections(channel_base) if not force and ttl > 0 else None
+        if cached is not None:
+            sections, age = cached
+            self._merge_sections(sections)
+            if age < ttl:
+                self._log.append(f"Sections en cache (analyse d'il y a {_format_age(age)}) : {len(sections)} section(s).")
+                return
+            self._log.append(
+                f"Sections en cache (analyse d'il y a {_format_age(age)}) : actualisation en arrière-plan…"
+            )
+        else:
+            self._log.append(f"Analyse de la chaîne : {channel_base}…")
         self._btn_analyze.setEnabled(False)
-        self._list_sections.clear()
-        self._sections = []
-        self._analyze_worker = AnalyzeWorker(channel_base, self)
+        self._btn_refresh.setEnabled(False)
+        # Sections affichées avant l'analyse (cache, analyse précédente) : remises si l'analyse échoue
+        self._previous_sections = list(self._sections)
+        self._analyze_worker = AnalyzeWorker(channel_base, self._chk_count_new.isChecked(), self)
+        self._analyze_worker.section_signal.connect(self._on_section_found)
         self._analyze_worker.finished_signal.connect(self._on_analyze_finished)
         self._analyze_worker.start()
 
@@ -310,28 +593,87 @@ class DownloadViewWidget(QWidget):
     def _on_analyze_finished(self, sections: list, error: str) -> None:
         self._analyze_worker = None
         self._btn_analyze.setEnabled(True)
+        self._btn_refresh.setEnabled(True)
         if error:
             self._log.append(f"Erreur : {error}")
-            QMessageBox.warning(self, "Analyse", f"Erreur lors de l'analyse : {error}")
+            if self._previous_sections:
+                self._merge_sections(self._previous_sections)
+            else:
+                QMessageBox.warning(self, "Analyse", f"Erreur lors de l'analyse : {error}")
             return
-        self._sections = sections
-        for s in self._sections:
-            count_str = f"{s['count']} vidéo(s)" if s["count"] >= 0 else "?"
-            item = QListWidgetItem(f"{s['label']} — {count_str}")
-            item.setData(Qt.ItemDataRole.UserRole, s)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self._list_sections.addItem(item)
-        self._log.append(f"Analyse terminée : {len(self._sections)} section(s).")
         # Avertissement comme dans la CLI : analyse échouée (ex. cookies invalides)
         if len(sections) >= 3 and all(s.get("count", 0) < 0 for s in sections[:3]):
             log_path = LOG_DIR / "extract_gui.log"
+            if self._previous_sections:
+                # Sections du cache / de l'analyse précédente gardées telles quelles
+                self._merge_sections(self._previous_sections)
+                self._log.append(f"⚠ Actualisation impossible (cookies invalides ? Deno ?). Détails : {log_path}")
+                return
+            self._merge_sections(sections)
             QMessageBox.warning(
                 self,
                 "Analyse",
                 "Problème lors de l'analyse (cookies invalides ? Deno ?).\n\n"
                 f"Détails : {log_path}",
             )
+            return
+        self._merge_sections(sections)
+        self._log.append(f"Analyse terminée : {len(self._sections)} section(s).")
+
+    @Slot(dict)
+    def _on_section_found(self, section: dict) -> None:
+        """Section comptée pendant l'analyse : ajoutée à son rang (ou mise à jour), cochable aussitôt."""
+        position = section["position"]
+        row = self._list_sections.count()
+        for i in range(self._list_sections.count()):
+            item = self._list_sections.item(i)
+            data = item.data(Qt.ItemDataRole.UserRole)
+            if data["url"] == section["url"]:
+                if section["count"] < 0:
+                    # Erreur de comptage : nombre déjà affiché (cache) conservé
+                    return
+                self._set_section_item(item, section)
+                self._sections = [section if s["url"] == section["url"] else s for s in self._sections]
+                return
+            if row == self._list_sections.count() and data.get("position", -1) > position:
+                row = i
+        item = QListWidgetItem()
+        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        item.setCheckState(Qt.CheckState.Unchecked)
+        self._set_section_item(item, section)
+        self._list_sections.insertItem(row, item)
+        self._sections.append(section)
+
+    def _merge_sections(self, sections: list[dict[str, Any]]) -> None:
+        """Met la liste à jour en place (par URL) : cases cochées conservées, sections nouvelles ajoutées à leur rang."""
+        current: dict[str, QListWidgetItem] = {}
+        for i in range(self._list_sections.count()):
+            item = self._list_sections.item(i)
+            current[item.data(Qt.ItemDataRole.UserRole)["url"]] = item
+        wanted = {s["url"] for s in sections}
+        for url, item in current.items():
+            if url not in wanted:
+                self._list_sections.takeItem(self._list_sections.row(item))
+        for index, s in enumerate(sections):
+            item = current.get(s["url"])
+            if item is None:
+                item = QListWidgetItem()
+                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                item.setCheckState(Qt.CheckState.Unchecked)
+                self._list_sections.insertItem(index, item)
+            elif self._list_sections.row(item) != index:
+                self._list_sections.insertItem(index, self._list_sections.takeItem(self._list_sections.row(item)))
+            self._set_section_item(item, s)
+        self._sections = list(sections)
+
+    @staticmethod
+    def _set_section_item(item: QListWidgetItem, section: dict[str, Any]) -> None:
+        item.setText(f"{section['label']} — {_section_count_text(section)}")
+        if not section.get("exact", True) and section["count"] >= 0:
+            item.setToolTip("Nombre annoncé par YouTube (vidéos masquées ou indisponibles comprises).")
+        else:
+            item.setToolTip("")
+        item.setData(Qt.ItemDataRole.UserRole, section)
 
     def _select_all_sections(self) -> None:
         for i in range(self._list_sections.count()):
@@ -341,6 +683,22 @@ class DownloadViewWidget(QWidget):
         for i in range(self._list_sections.count()):
             self._list_sections.item(i).setCheckState(Qt.CheckState.Unchecked)
 
+    def _select_new_sections(self) -> None:
+        """Coche les sections avec au moins une vidéo hors archive ; avertit si aucun décompte n'est disponible."""
+        counted = 0
+        for i in range(self._list_sections.count()):
+            item = self._list_sections.item(i)
+            new = item.data(Qt.ItemDataRole.UserRole).get("new")
+            counted += new is not None
+            item.setCheckState(Qt.CheckState.Checked if new else Qt.CheckState.Unchecked)
+        if not counted and self._list_sections.count():
+            QMessageBox.information(
+                self,
+                "Nouveautés",
+                "Aucun décompte des nouvelles vidéos : cochez « Compter les nouvelles vidéos (archive) » "
+                "puis forcez l'actualisation.",
+            )
+
     def _get_selected_urls(self) -> list[str]:
         urls: list[str] = []
         if self._rb_video.isChecked():
@@ -382,7 +740,31 @@ class DownloadViewWidget(QWidget):
         self._progress_bar.setValue(0)
         self._progress_bar.setRange(0, 0)  # mode indéterminé pendant le dl
         self._btn_download.setEnabled(False)
-        self._worker = DownloadWorker(urls, self)
+        self._lbl_stats.hide()
+        self._lbl_rate.hide()
+        self._rate_limiter = RateLimiter(
+            self._spin_rate.value() * 1024 * 1024,
+            shared=self._chk_rate_shared.isChecked(),
+        )
+        self._worker = DownloadWorker(
+            urls,
+            self,
+            max_workers=self._spin_workers.value(),
+            extract_workers=self._spin_extract.value(),
+            queue_depth=self._spin_queue.value(),
+            backend="process" if self._chk_process.isChecked() else "thread",
+            rate_limiter=self._rate_limiter,
+            adaptive=self._chk_adaptive.isChecked(),
+            auto_tune=self._chk_auto_tune.isChecked(),
+            parallel_components=self._chk_parallel_components.isChecked(),
+            resume=self._chk_resume.isChecked(),
+            retry=self._chk_retry.isChecked() and not self._chk_process.isChecked(),
+            postprocess_workers=self._spin_postproc.value(),
+            single_pass=self._chk_single_pass.isChecked(),
+            stream_remux=self._chk_stream_remux.isChecked(),
+            scratch_dir=self._edit_scratch.text().strip(),
+            dedup=self._chk_dedup.isChecked(),
+        )
         self._worker.progress_signal.connect(self._on_progress)
         self._worker.finished_signal.connect(self._on_download_finished)
         self._worker.start()
@@ -422,6 +804,16 @@ class DownloadViewWidget(QWidget):
             self._log.append(clean)
             QApplication.processEvents()
             return
+        if status == "pipeline_stats":
+            # Occupation des étages extraction / téléchargement : ligne dédiée, pas dans le journal
+            self._lbl_stats.setText(clean)
+            self._lbl_stats.show()
+            return
+        if status == "rate":
+            # Débits effectifs (total, par vidéo) : ligne dédiée
+            self._lbl_rate.setText(clean)
+            self._lbl_rate.show()
+            return
         if status == "error":
             # Erreur yt-dlp (échec d'une vidéo) : afficher dans le journal
             self._log.append("✖ Erreur : " + clean if clean else "✖ Erreur (voir résumé)")
@@ -429,6 +821,21 @@ class DownloadViewWidget(QWidget):
             return
         self._log.append(clean)
 
+    def _on_browse_scratch(self) -> None:
+        path = QFileDialog.getExistingDirectory(self, "Dossier de travail", self._edit_scratch.text().strip())
+        if path:
+            self._edit_scratch.setText(path)
+            self._on_scratch_changed()
+
+    def _on_scratch_changed(self) -> None:
+        """Dossier de travail mémorisé pour les prochains lancements."""
+        QSettings().setValue("scratch_dir", self._edit_scratch.text().strip())
+
+    def _on_rate_changed(self, value: float) -> None:
+        """Nouvelle limite appliquée immédiatement au téléchargement en cours."""
+        if self._worker and self._worker.isRunning() and self._rate_limiter is not None:
+            self._rate_limiter.set_rate(value * 1024 * 1024)
+
     def _replace_last_log_line(self, new_line: str) -> None:
         """Remplace la dernière ligne du log par la nouvelle ligne de progression."""
         doc = self._log.document()
@@ -466,10 +873,8 @@ class DownloadViewWidget(QWidget):
             if advice:
                 self._log.append(advice)
         try:
-            archive_count = sum(
-                1 for line in ARCHIVE_FILE.read_text(encoding="utf-8").splitlines()
-                if line.strip()
-            ) if ARCHIVE_FILE.exists() else 0
+            # Index partagé avec le run : pas de relecture complète de archive.txt sur le thread GUI
+            archive_count = get_archive().count()
         except Exception:
             archive_count = 0
         lines = [
@@ -478,6 +883,19 @@ class DownloadViewWidget(QWidget):
             f"✖ Échecs : {result.error}",
             f"En archive (total) : {archive_count}",
         ]
+        retries = getattr(result, "retries", None) or {}
+        if any(retries.values()):
+            lines.insert(
+                3,
+                f"↻ Relances : {retries.get('transient', 0)} transitoire(s), "
+                f"{retries.get('bot_cookie', 0)} bot/cookies",
+            )
+        io_saved = getattr(result, "io_saved", 0)
+        if io_saved:
+            lines.insert(3, f"⚡ E/S évitées (une passe) : {io_saved / (1024 * 1024):.1f} Mo")
+        linked = getattr(result, "linked", 0)
+        if linked:
+            lines.insert(1, f"🔗 Doublons liés (autres sections) : {linked}")
         if result.ok == 0 and result.error == 0 and result.skipped == 0 and last_error:
             lines.append("")
             lines.append(f"⚠ Erreur : {last_error}")
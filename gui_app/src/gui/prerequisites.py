@@ -25,6 +25,7 @@ from PySide6.QtWidgets import (
     QDialogButtonBox,
     QFormLayout,
     QMenu,
+    QFileDialog,
 )
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QFont
@@ -36,6 +37,8 @@ from src.core.paths import (
     COOKIE_FILE_ENCRYPTED,
     get_windows_system_path,
 )
+from src.core.archive import get_archive
+from src.core.reconcile import ReconcileReport, reconcile_archive
 from src.core.cookies import (
     has_cookies_source,
     has_cookies_enc_only,
@@ -152,6 +155,23 @@ class InstallWorker(QThread):
             self.finished_signal.emit(False, str(e))
 
 
+class ReconcileWorker(QThread):
+    """Thread pour compacter l'archive et la rapprocher de downloads/ sans bloquer la GUI."""
+    progress_signal = Signal(str)
+    finished_signal = Signal(object, str)  # ReconcileReport (None si erreur), message d'erreur
+
+    def __init__(self, drop_missing: bool, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._drop_missing = drop_missing
+
+    def run(self) -> None:
+        try:
+            report = reconcile_archive(drop_missing=self._drop_missing, progress=self.progress_signal.emit)
+            self.finished_signal.emit(report, "")
+        except Exception as e:
+            self.finished_signal.emit(None, str(e))
+
+
 def _status_badge(ok: bool) -> str:
     """Retourne un court libellé de statut pour affichage."""
     return "Installé" if ok else "Non trouvé"
@@ -164,6 +184,8 @@ class PrerequisitesWidget(QWidget):
         super().__init__(parent)
         self._worker: InstallWorker | None = None
         self._progress: QProgressDialog | None = None
+        self._reconcile_worker: ReconcileWorker | None = None
+        self._reconcile_progress: QProgressDialog | None = None
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -325,6 +347,24 @@ class PrerequisitesWidget(QWidget):
         row_archive.addWidget(self._lbl_archive_count)
         row_archive.addStretch()
         ly_archive.addLayout(row_archive)
+        row_archive_io = QHBoxLayout()
+        btn_import_archive = QPushButton("Importer une archive…")
+        btn_import_archive.setToolTip("Ajoute les entrées d'un fichier archive texte (yt-dlp --download-archive, autre poste).")
+        btn_import_archive.clicked.connect(self._on_import_archive)
+        row_archive_io.addWidget(btn_import_archive)
+        btn_export_archive = QPushButton("Exporter l'archive…")
+        btn_export_archive.setToolTip("Écrit les entrées distinctes de l'archive dans un fichier texte (format yt-dlp).")
+        btn_export_archive.clicked.connect(self._on_export_archive)
+        row_archive_io.addWidget(btn_export_archive)
+        btn_reconcile_archive = QPushButton("Compacter / vérifier…")
+        btn_reconcile_archive.setToolTip(
+            "Retire les doublons de archive.txt et compare l'archive aux fichiers de downloads/ "
+            "(entrées sans fichier, fichiers hors archive). Rapport dans logs/."
+        )
+        btn_reconcile_archive.clicked.connect(lambda: self._on_reconcile_archive(False))
+        row_archive_io.addWidget(btn_reconcile_archive)
+        row_archive_io.addStretch()
+        ly_archive.addLayout(row_archive_io)
         btn_delete_archive = QPushButton("Supprimer archive.txt")
         btn_delete_archive.setProperty("class", "warning")
         btn_delete_archive.setToolTip("Réinitialiser l'archive : les prochains téléchargements pourront retélécharger des vidéos déjà enregistrées.")
@@ -531,8 +571,8 @@ class PrerequisitesWidget(QWidget):
             return
         self._lbl_archive_count.setToolTip("")
         try:
-            text = ARCHIVE_FILE.read_text(encoding="utf-8")
-            count = sum(1 for line in text.splitlines() if line.strip())
+            # Index partagé : seules les lignes ajoutées depuis la dernière lecture sont lues
+            count = get_archive().count()
             self._lbl_archive_count.setToolTip("")
             self._lbl_archive_count.setText(f"{count} vidéo(s) en archive.")
         except Exception:
@@ -549,7 +589,7 @@ class PrerequisitesWidget(QWidget):
             )
             return
         try:
-            count = sum(1 for line in ARCHIVE_FILE.read_text(encoding="utf-8").splitlines() if line.strip())
+            count = get_archive().count()
         except Exception:
             count = 0
         msg = (
@@ -583,6 +623,85 @@ class PrerequisitesWidget(QWidget):
                 f"Impossible de supprimer le fichier : {e}",
             )
 
+    def _on_import_archive(self) -> None:
+        """Fusionne une archive texte choisie par l'utilisateur dans archive.txt (entrées absentes seulement)."""
+        path, _ = QFileDialog.getOpenFileName(self, "Importer une archive", str(SCRIPT_DIR), "Archive texte (*.txt);;Tous les fichiers (*)")
+        if not path:
+            return
+        try:
+            added = get_archive().import_text(pathlib.Path(path))
+        except Exception as e:
+            QMessageBox.warning(self, "Archive", f"Impossible d'importer le fichier : {e}")
+            return
+        self._refresh_archive()
+        QMessageBox.information(self, "Archive", f"{added} entrée(s) ajoutée(s) à l'archive.")
+
+    def _on_export_archive(self) -> None:
+        """Exporte les entrées distinctes de l'archive vers un fichier texte."""
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter l'archive", str(SCRIPT_DIR / "archive_export.txt"), "Archive texte (*.txt)")
+        if not path:
+            return
+        try:
+            count = get_archive().export_text(pathlib.Path(path))
+        except Exception as e:
+            QMessageBox.warning(self, "Archive", f"Impossible d'exporter l'archive : {e}")
+            return
+        QMessageBox.information(self, "Archive", f"{count} entrée(s) exportée(s) vers {path}.")
+
+    def _on_reconcile_archive(self, drop_missing: bool) -> None:
+        """Compacte l'archive en arrière-plan ; drop_missing retire aussi les entrées sans fichier."""
+        if self._reconcile_worker and self._reconcile_worker.isRunning():
+            return
+        if not ARCHIVE_FILE.exists():
+            QMessageBox.information(self, "Archive", "Le fichier archive.txt n'existe pas.")
+            return
+        self._reconcile_progress = QProgressDialog("Compactage de l'archive…", None, 0, 0, self)
+        self._reconcile_progress.setWindowTitle("Archive")
+        self._reconcile_progress.setMinimumDuration(0)
+        self._reconcile_progress.show()
+        self._reconcile_worker = ReconcileWorker(drop_missing, self)
+        self._reconcile_worker.progress_signal.connect(self._reconcile_progress.setLabelText)
+        self._reconcile_worker.finished_signal.connect(
+            lambda report, error: self._on_reconcile_finished(report, error, drop_missing)
+        )
+        self._reconcile_worker.start()
+
+    def _on_reconcile_finished(self, report: ReconcileReport | None, error: str, drop_missing: bool) -> None:
+        if self._reconcile_progress:
+            self._reconcile_progress.close()
+            self._reconcile_progress = None
+        self._reconcile_worker = None
+        self._refresh_archive()
+        if report is None:
+            QMessageBox.warning(self, "Archive", f"Impossible de compacter l'archive : {error}")
+            return
+        msg = (
+            f"{report.kept} entrée(s) conservée(s), {report.duplicates} doublon(s) retiré(s).\n"
+            f"{report.missing} entrée(s) sans fichier dans downloads/"
+            + (f" ({report.dropped} retirée(s))" if drop_missing else "")
+            + f".\n{len(report.untracked)} fichier(s) hors archive, {report.unidentified} fichier(s) sans ID lisible "
+            f"(sur {report.files}).\n\nDétail : {report.report_path}"
+        )
+        if report.drop_refused:
+            msg += (
+                "\n\nEntrées sans fichier conservées : aucun fichier identifié ou fichiers sans ID lisible, "
+                "une entrée « sans fichier » pourrait être celle d'un fichier présent."
+            )
+        # Retrait proposé seulement si chaque fichier de downloads/ a été identifié
+        if drop_missing or not report.missing or not report.files or report.unidentified:
+            QMessageBox.information(self, "Archive", msg)
+            return
+        reply = QMessageBox.question(
+            self,
+            "Archive",
+            msg + f"\n\nRetirer aussi les {report.missing} entrée(s) sans fichier ? "
+            "Ces vidéos pourront à nouveau être téléchargées.",
+            QMessageBox.StandardButton.No | QMessageBox.StandardButton.Yes,
+            QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self._on_reconcile_archive(True)
+
     def _install_deno(self) -> None:
         if self._worker and self._worker.isRunning():
             return
@@ -8,6 +8,7 @@ Windows uniquement.
 """
 from __future__ import annotations
 
+import multiprocessing
 import os
 import pathlib
 import subprocess
@@ -98,4 +99,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Exe PyInstaller : les processus workers (backend « process ») relancent l'exe, ne pas rouvrir la GUI
+    multiprocessing.freeze_support()
     main()